@@ -0,0 +1,180 @@
+"""
+bandwidth.py — Implements the 'bandwidth' CLI command for throughput tests and the bandwidth server.
+"""
+import json
+
+_BITRATE_SUFFIXES = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+
+
+def _parse_bitrate(value):
+    """Parses a bitrate such as '64k', '10M' or '1.5G' into bits per second."""
+    text = str(value).strip().lower()
+    scale = _BITRATE_SUFFIXES.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+
+def _udp_summary(result):
+    """Formats the loss and jitter figures of a UDP test, or '' for TCP."""
+    if "jitter_ms" not in result:
+        return ""
+    return (
+        f"\tjitter={result['jitter_ms']:.3f} ms\tlost={result['packets_lost']}/{result['packets_sent']}"
+        f" ({result['loss_percent']:.2f}%)\tout_of_order={result['out_of_order']}"
+    )
+
+
+def _interval_rows(result):
+    """Yields (time range, Mbps, TCP_INFO columns) for each interval sample."""
+    step = result.get("interval", 1.0)
+    info = result.get("tcp_info")
+    for i, mbps in enumerate(result["intervals"]):
+        span = f"{i * step:.2f}-{min((i + 1) * step, result['duration']):.2f}"
+        extra = []
+        if info:
+            extra = [f"{info['rtt_ms'][i]:.2f}", f"{info['cwnd'][i] / 1024:.0f}", f"{info['retransmits'][i]:.0f}"]
+        yield span, f"{mbps:.1f}", extra
+
+
+def _output_json(console, result, color):
+    """Outputs bandwidth results in JSON format (sample arrays as lists)."""
+    if color:
+        console.print_json(json.dumps(result, default=list))
+    else:
+        print(json.dumps(result, indent=2, default=list))
+
+
+def _output_plain(result):
+    """Outputs bandwidth results in plain text format, one line per interval."""
+    for span, mbps, extra in _interval_rows(result):
+        columns = f"\trtt={extra[0]} ms\tcwnd={extra[1]} KiB\tretr={extra[2]}" if extra else ""
+        print(f"{span} s\t{mbps} Mbps{columns}", flush=True)
+    print(
+        f"{result['direction']}\t{result['bandwidth_mbps']:.1f} Mbps\t{result['bytes_transferred']} bytes"
+        f"\t{result['duration']:.2f} s\tstreams={result.get('streams', 1)}{_udp_summary(result)}",
+        flush=True,
+    )
+
+
+def _output_table(console, result, host, color):
+    """Outputs bandwidth results as a table of intervals plus the total."""
+    from rich.table import Table
+    kind = "UDP" if "jitter_ms" in result else f"{result['streams']} streams"
+    table = Table(title=f"Bandwidth to {host} ({result['direction']}, {kind})", show_lines=True)
+    table.add_column("Interval (s)", style="cyan" if color else None)
+    table.add_column("Mbps", style="green" if color else None)
+    if result.get("tcp_info"):
+        for column in ["RTT (ms)", "Cwnd (KiB)", "Retr"]:
+            table.add_column(column, style="yellow" if color else None)
+    for span, mbps, extra in _interval_rows(result):
+        table.add_row(span, mbps, *extra)
+    table.add_row("total", f"{result['bandwidth_mbps']:.1f}")
+    if "jitter_ms" in result:
+        table.add_row("jitter (ms)", f"{result['jitter_ms']:.3f}")
+        table.add_row("lost", f"{result['packets_lost']}/{result['packets_sent']} ({result['loss_percent']:.2f}%)")
+        table.add_row("out of order", str(result["out_of_order"]))
+    console.print(table)
+
+
+def _serve(args, console, color):
+    """Runs 'gatenet bandwidth serve' until interrupted."""
+    from gatenet.diagnostics.bandwidth import BandwidthServer
+
+    server = BandwidthServer(host=getattr(args, "bind", "0.0.0.0"), port=getattr(args, "port", 5201))
+    server.start()
+    msg = f"[bandwidth] Server listening on {server.host}:{server.port}"
+    if color:
+        console.print(f"[bold blue]{msg}[/bold blue]")
+    else:
+        print(msg, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+def cmd_bandwidth(args):
+    """
+    Bandwidth test CLI command.
+
+    Measures TCP throughput to a host running the gatenet bandwidth server over one or more
+    parallel streams and prints per-interval and total throughput, with the RTT, congestion
+    window and retransmits of every interval on Linux. With ``--udp``, sends
+    paced datagrams at ``--bitrate`` instead and also reports loss, reordering and jitter.
+    With the host ``serve``, runs the bandwidth server instead.
+
+    Args:
+        args (argparse.Namespace):
+            host (str): Host to test against, or 'serve' to run the server.
+            output_format (str, optional): Output style. One of 'table', 'plain', or 'json'.
+            color (bool, optional): Enable colorized output. Default is True.
+            port (int, optional): Server port. Default is 5201.
+            duration (float, optional): Test length in seconds. Default is 5.0.
+            streams (int, optional): Parallel TCP streams. Default is 1.
+            direction (str, optional): 'download' or 'upload'. Default is 'download'.
+            sendfile (bool, optional): Upload with zero-copy sendfile. Default is False.
+            udp (bool, optional): Run a UDP test. Default is False.
+            bitrate (str or int, optional): Target UDP rate in bits/s, e.g. '64k' or '10M'. Default is '1M'.
+            datagram_size (int, optional): UDP payload size in bytes. Default is 1400.
+            interval (float, optional): Seconds per sample. Default is 1.0.
+            omit (float, optional): Warm-up seconds left out of the results (TCP). Default is 0.
+            bind (str, optional): Address the server listens on (serve). Default is 0.0.0.0.
+
+    Example:
+        .. code-block:: bash
+
+           gatenet bandwidth serve --port 5201
+           gatenet bandwidth 192.168.1.20 --streams 4 --duration 10
+           gatenet bandwidth 192.168.1.20 --direction upload --interval 0.1 --omit 2
+           gatenet bandwidth 192.168.1.20 --direction upload --sendfile --output json
+           gatenet bandwidth 192.168.1.20 --udp --bitrate 64k --datagram-size 160
+
+    Returns:
+        None
+    """
+    from rich.console import Console
+    color = getattr(args, "color", True)
+    output_format = getattr(args, "output_format", getattr(args, "output", "table"))
+    console = Console()
+    try:
+        if args.host == "serve":
+            _serve(args, console, color)
+            return
+        from gatenet.diagnostics.bandwidth import measure_bandwidth, measure_udp
+        if getattr(args, "udp", False):
+            result = measure_udp(
+                args.host,
+                port=getattr(args, "port", 5201),
+                duration=getattr(args, "duration", 5.0),
+                bitrate=_parse_bitrate(getattr(args, "bitrate", "1M")),
+                datagram_size=getattr(args, "datagram_size", 1400),
+                direction=getattr(args, "direction", "download"),
+                interval=getattr(args, "interval", 1.0),
+            )
+        else:
+            result = measure_bandwidth(
+                args.host,
+                port=getattr(args, "port", 5201),
+                duration=getattr(args, "duration", 5.0),
+                direction=getattr(args, "direction", "download"),
+                streams=getattr(args, "streams", 1),
+                sendfile=getattr(args, "sendfile", False),
+                interval=getattr(args, "interval", 1.0),
+                omit=getattr(args, "omit", 0.0),
+            )
+        if output_format == "json":
+            _output_json(console, result, color)
+        elif output_format == "plain" or not color:
+            _output_plain(result)
+        else:
+            _output_table(console, result, args.host, color)
+    except Exception as e:
+        err_msg = f"[bandwidth] Error: {e}"
+        if color:
+            console.print(f"[bold red]{err_msg}[/bold red]")
+        else:
+            print(err_msg)
+        raise SystemExit(1)
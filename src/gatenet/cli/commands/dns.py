@@ -1,6 +1,8 @@
 """
-dns.py — Implements the 'dns' CLI command for DNS lookups.
+dns.py — Implements the 'dns' CLI command for DNS lookups and resolver benchmarks.
 """
+BENCH_DEFAULT_SERVERS = ["1.1.1.1", "8.8.8.8", "9.9.9.9"]
+
 def _build_dns_results(query, dns_lookup, reverse_dns_lookup):
     ip = dns_lookup(query)
     if ip != "Unknown" and ip != "Invalid Hostname":
@@ -13,6 +15,32 @@ def _build_dns_results(query, dns_lookup, reverse_dns_lookup):
         else:
             return {"query": query, "error": "Could not resolve as hostname or IP."}
 
+def _build_dns_results_with_server(query, server, timeout=2.0):
+    """Resolves ``query`` forward and reverse against a specific server."""
+    import asyncio
+    import ipaddress
+    from gatenet.diagnostics.dns import DNSResolver
+    from gatenet.diagnostics.dns_bench import parse_server
+
+    address, port = parse_server(server)
+
+    async def lookup():
+        async with DNSResolver(address, port=port, timeout=timeout) as resolver:
+            try:
+                ipaddress.ip_address(query)
+            except ValueError:
+                ips = await resolver.resolve(query, "A")
+                if not ips:
+                    return {"query": query, "server": server, "error": "Could not resolve as hostname or IP."}
+                rev = await resolver.reverse(ips[0])
+                return {"query": query, "server": server, "ip": ips[0], "reverse": rev or "Unknown"}
+            rev = await resolver.reverse(query)
+            if rev is None:
+                return {"query": query, "server": server, "error": "Could not resolve as hostname or IP."}
+            return {"query": query, "server": server, "reverse": rev}
+
+    return asyncio.run(lookup())
+
 def _print_dns_resolving(console, query, color, verbosity):
     """Prints the resolving message based on color and verbosity."""
     if verbosity > 0:
@@ -52,6 +80,52 @@ def _output_table(console, results, query, color):
         for k, v in results.items():
             print(f"{k}: {v}")
 
+def _fmt_ms(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+def _output_bench_results(console, results, output_format, color):
+    """Outputs resolver benchmark results, fastest resolver first."""
+    if output_format == "json":
+        _output_json(console, results, color)
+        return
+    if output_format == "plain":
+        for r in results:
+            print(
+                f"{r['server']}\tqps={r['qps']:.0f}\tcold_p50={_fmt_ms(r['cold']['p50'])}ms"
+                f"\twarm_p50={_fmt_ms(r['warm']['p50'])}ms\twarm_p99={_fmt_ms(r['warm']['p99'])}ms"
+                f"\ttimeouts={r['timeouts']}\terrors={r['errors']}",
+                flush=True,
+            )
+        return
+    table = Table(title="DNS Resolver Benchmark (ms)", show_lines=True)
+    for column in ["Resolver", "QPS", "Cold p50", "Warm p50", "Warm p90", "Warm p99", "Timeouts", "Errors", "Cache speedup"]:
+        table.add_column(column, style=("cyan" if column == "Resolver" else "green") if color else None)
+    for r in results:
+        speedup = f"{r['cache_speedup']:.1f}x" if r["cache_speedup"] else "-"
+        table.add_row(
+            r["server"], f"{r['qps']:.0f}", _fmt_ms(r["cold"]["p50"]), _fmt_ms(r["warm"]["p50"]),
+            _fmt_ms(r["warm"]["p90"]), _fmt_ms(r["warm"]["p99"]), str(r["timeouts"]), str(r["errors"]), speedup,
+        )
+    console.print(table)
+
+def _run_dns_bench(args, console, output_format, color):
+    """Runs 'gatenet dns bench' and prints the results."""
+    import asyncio
+    from gatenet.diagnostics.dns import system_nameserver
+    from gatenet.diagnostics.dns_bench import DEFAULT_NAMES, DEFAULT_TYPES, benchmark_resolvers
+
+    servers = getattr(args, "servers", None) or [system_nameserver()] + BENCH_DEFAULT_SERVERS
+    results = asyncio.run(benchmark_resolvers(
+        servers,
+        names=getattr(args, "names", None) or DEFAULT_NAMES,
+        # Numeric codes such as 28 are valid types too
+        types=[int(t) if str(t).isdigit() else t for t in getattr(args, "types", None) or DEFAULT_TYPES],
+        rounds=getattr(args, "rounds", 3),
+        concurrency=getattr(args, "concurrency", 32),
+        timeout=getattr(args, "timeout", 2.0),
+    ))
+    _output_bench_results(console, results, output_format, color)
+
 def _output_dns_results(console, results, query, output_format, color):
     """Handles output formatting for DNS results."""
     if output_format == "json":
@@ -67,19 +141,30 @@ def cmd_dns(args):
     DNS lookup and reverse lookup CLI command.
 
     Displays DNS resolution results for a domain or IP in the selected output format.
+    With the query ``bench``, benchmarks resolvers instead: the same query mix is sent
+    to every resolver concurrently, once cold and then ``rounds`` times warm, and QPS,
+    latency percentiles, timeouts, errors and the warm-cache speedup are reported per
+    resolver, fastest first.
 
     Args:
         args (argparse.Namespace):
-            query (str): Domain or IP to resolve.
+            query (str): Domain or IP to resolve, or 'bench'.
             output_format (str, optional): Output style. One of 'table', 'plain', or 'json'.
             color (bool, optional): Enable colorized output. Default is True.
             verbosity (str or int, optional): Verbosity level. One of 'debug', 'info', 0, or 1. Default is 1.
-            server (str, optional): Custom DNS server to use.
+            server (str, optional): DNS server to query instead of the system resolver (host or host:port).
+            servers (list[str], optional): Resolvers to benchmark (bench). Default: the system resolver, 1.1.1.1, 8.8.8.8 and 9.9.9.9.
+            names (list[str], optional): Names to query (bench).
+            types (list[str], optional): Record types queried for every name (bench). Default: A AAAA.
+            rounds (int, optional): Warm passes over the query mix (bench). Default is 3.
+            concurrency (int, optional): Queries in flight per resolver (bench). Default is 32.
+            timeout (float, optional): Per-query timeout in seconds. Default is 2.0.
 
     Example:
         .. code-block:: bash
 
-           gatenet dns google.com --output json --color false --server 1.1.1.1
+           gatenet dns google.com --output json --server 1.1.1.1
+           gatenet dns bench --servers 1.1.1.1 8.8.8.8 192.168.1.1 --types A AAAA MX --rounds 5
 
     Returns:
         None
@@ -94,10 +179,17 @@ def cmd_dns(args):
     color = getattr(args, "color", True)
     verbosity = getattr(args, "verbosity", 1)
 
-    _print_dns_resolving(console, query, color, verbosity)
+    server = getattr(args, "server", None)
 
     try:
-        results = _build_dns_results(query, dns_lookup, reverse_dns_lookup)
+        if query == "bench":
+            _run_dns_bench(args, console, output_format, color)
+            return
+        _print_dns_resolving(console, query, color, verbosity)
+        if server:
+            results = _build_dns_results_with_server(query, server, getattr(args, "timeout", 2.0))
+        else:
+            results = _build_dns_results(query, dns_lookup, reverse_dns_lookup)
         _output_dns_results(console, results, query, output_format, color)
     except Exception as e:
         err_msg = f"[dns] Error: {e}"
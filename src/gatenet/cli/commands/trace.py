@@ -8,13 +8,16 @@ def print_trace_json(hops, color, console):
     else:
         print(json.dumps(hops, indent=2))
 
+def _rtt_text(hop):
+    rtts = hop.get("rtts") or [hop.get("rtt_ms", None)]
+    return "  ".join(f"{rtt:.2f} ms" if rtt is not None else "*" for rtt in rtts)
+
 def print_trace_plain(hops):
     for hop in hops:
         hopnum = hop.get("hop", "?")
         ip = hop.get("ip", "*")
         host = hop.get("hostname", "")
-        rtt = hop.get("rtt_ms", None)
-        rtt_str = f"{rtt:.2f} ms" if rtt is not None else "*"
+        rtt_str = _rtt_text(hop)
         print(f"{hopnum}\t{ip}\t{host}\t{rtt_str}")
 
 def print_trace_table(hops, color, console, host):
@@ -28,8 +31,7 @@ def print_trace_table(hops, color, console, host):
         hopnum = str(hop.get("hop", "?"))
         ip = hop.get("ip", "*")
         hostname = hop.get("hostname", "")
-        rtt = hop.get("rtt_ms", None)
-        rtt_str = f"{rtt:.2f} ms" if rtt is not None else "*"
+        rtt_str = _rtt_text(hop)
         table.add_row(hopnum, ip, hostname, rtt_str)
     console.print(table)
 
@@ -46,11 +48,16 @@ def cmd_trace(args):
             color (bool, optional): Enable colorized output. Default is True.
             verbosity (str or int, optional): Verbosity level. One of 'debug', 'info', 0, or 1. Default is 'info'.
             max_hops (int, optional): Maximum hops to trace.
+            parallel (bool, optional): Probe all hops at once. Default is False.
+            probes (int, optional): Probes per hop in parallel mode. Default is 1.
+            paris (bool, optional): Keep every probe on one flow (Paris traceroute). Default is False.
 
     Example:
         .. code-block:: bash
 
            gatenet trace google.com --output plain --color false --max-hops 20
+           gatenet trace google.com --parallel --probes 3
+           gatenet trace google.com --paris --probes 3
 
     Returns:
         None
@@ -64,7 +71,14 @@ def cmd_trace(args):
     print_func = console.print if color else print
     print_func(msg)
     try:
-        hops = traceroute(args.host, print_output=False)
+        hops = traceroute(
+            args.host,
+            max_hops=getattr(args, "max_hops", 30),
+            print_output=False,
+            parallel=getattr(args, "parallel", False),
+            probes=getattr(args, "probes", 1),
+            paris=getattr(args, "paris", False),
+        )
         if not hops:
             console.print("[bold red]No hops found or traceroute failed.[/bold red]")
             raise SystemExit(1)
@@ -32,6 +32,9 @@ def _load_handler(name):
     if name == "ports":
         from .commands.ports import cmd_ports
         return cmd_ports
+    if name == "bandwidth":
+        from .commands.bandwidth import cmd_bandwidth
+        return cmd_bandwidth
     if name == "hotspot":
         from .commands.hotspot import cmd_hotspot
         return cmd_hotspot
@@ -64,13 +67,24 @@ def main() -> int:
     trace_parser = subparsers.add_parser("trace", help="Run traceroute connectivity test")
     trace_parser.add_argument("host", help="Target host for traceroute")
     trace_parser.add_argument("--output", choices=["json", "table", "plain"], default="table", help=OUTPUT_FORMAT_HELP)
+    trace_parser.add_argument("--max-hops", type=int, default=30, help="Maximum number of hops to probe (default: 30)")
+    trace_parser.add_argument("--parallel", action="store_true", help="Probe every hop at once instead of one hop at a time")
+    trace_parser.add_argument("--probes", type=int, default=1, help="Probes per hop with --parallel (default: 1)")
+    trace_parser.add_argument("--paris", action="store_true", help="Keep every probe on one flow so load balancers don't mix paths (implies --parallel)")
 
     ping_parser = subparsers.add_parser("ping", help="Ping a host for connectivity test")
     ping_parser.add_argument("host", help="Target host to ping")
     ping_parser.add_argument("--output", choices=["json", "table", "plain"], default="table", help=OUTPUT_FORMAT_HELP)
 
-    dns_parser = subparsers.add_parser("dns", help="DNS lookup and reverse lookup tools")
-    dns_parser.add_argument("query", help="Domain or IP to resolve")
+    dns_parser = subparsers.add_parser("dns", help="DNS lookup, reverse lookup and resolver benchmark tools")
+    dns_parser.add_argument("query", help="Domain or IP to resolve, or 'bench' to benchmark resolvers")
+    dns_parser.add_argument("--server", help="DNS server to query instead of the system resolver (host or host:port)")
+    dns_parser.add_argument("--servers", nargs="+", help="Resolvers to benchmark (default: system resolver, 1.1.1.1, 8.8.8.8, 9.9.9.9)")
+    dns_parser.add_argument("--names", nargs="+", help="Names to query when benchmarking")
+    dns_parser.add_argument("--types", nargs="+", help="Record types to query for each name when benchmarking (default: A AAAA)")
+    dns_parser.add_argument("--rounds", type=int, default=3, help="Warm passes over the query mix when benchmarking (default: 3)")
+    dns_parser.add_argument("--concurrency", type=int, default=32, help="Queries in flight per resolver when benchmarking (default: 32)")
+    dns_parser.add_argument("--timeout", type=float, default=2.0, help="Per-query timeout in seconds (default: 2.0)")
     dns_parser.add_argument("--output", choices=["json", "table", "plain"], default="table", help=OUTPUT_FORMAT_HELP)
 
     ports_parser = subparsers.add_parser("ports", help="Scan ports on a host")
@@ -84,6 +98,21 @@ def main() -> int:
     )
     ports_parser.add_argument("--output", choices=["json", "table", "plain"], default="table", help=OUTPUT_FORMAT_HELP)
 
+    bandwidth_parser = subparsers.add_parser("bandwidth", help="Measure TCP or UDP throughput, or run the bandwidth server")
+    bandwidth_parser.add_argument("host", help="Host running the gatenet bandwidth server, or 'serve' to run the server")
+    bandwidth_parser.add_argument("--port", type=int, default=5201, help="Server port (default: 5201)")
+    bandwidth_parser.add_argument("--duration", type=float, default=5.0, help="Test length in seconds (default: 5.0)")
+    bandwidth_parser.add_argument("--streams", type=int, default=1, help="Parallel TCP streams (default: 1)")
+    bandwidth_parser.add_argument("--direction", choices=["download", "upload"], default="download", help="Direction to measure (default: download)")
+    bandwidth_parser.add_argument("--sendfile", action="store_true", help="Upload with zero-copy sendfile")
+    bandwidth_parser.add_argument("--udp", action="store_true", help="Send paced UDP datagrams and report loss and jitter")
+    bandwidth_parser.add_argument("--bitrate", default="1M", help="Target UDP rate in bits/s, with optional K/M/G suffix (default: 1M)")
+    bandwidth_parser.add_argument("--datagram-size", type=int, default=1400, help="UDP payload size in bytes (default: 1400)")
+    bandwidth_parser.add_argument("--interval", type=float, default=1.0, help="Seconds per throughput sample, e.g. 0.1 (default: 1.0)")
+    bandwidth_parser.add_argument("--omit", type=float, default=0.0, help="Warm-up seconds to leave out of a TCP test, e.g. slow start (default: 0)")
+    bandwidth_parser.add_argument("--bind", default="0.0.0.0", help="Address the server listens on with 'serve' (default: 0.0.0.0)")
+    bandwidth_parser.add_argument("--output", choices=["json", "table", "plain"], default="table", help=OUTPUT_FORMAT_HELP)
+
     hotspot_parser = subparsers.add_parser("hotspot", help="Create and manage Wi-Fi hotspots")
     hotspot_parser.add_argument("action", choices=["start", "stop", "status", "devices", "generate-password"], help="Action to perform")
     hotspot_parser.add_argument("--ssid", help="SSID name for the hotspot")
@@ -18,7 +18,10 @@ UDP_AFTER_RECV = "udp:after_recv"                  # kwargs: data
 # Discovery events
 DISCOVERY_BEFORE_DETECT = "discovery:before_detect"  # kwargs: port, banner
 DISCOVERY_AFTER_DETECT = "discovery:after_detect"    # kwargs: port, banner, result
+DISCOVERY_BATCH_DETECT = "discovery:batch_detect"    # kwargs: results (list of (port, banner, result))
 
 # Diagnostics events
 PING_BEFORE = "diagnostics:ping:before"             # kwargs: host, count
 PING_AFTER = "diagnostics:ping:after"               # kwargs: host, result
+LATENCY_SNAPSHOT = "diagnostics:latency:snapshot"   # kwargs: snapshots ({host: stats})
+PATH_CHANGE = "diagnostics:traceroute:path_change"  # kwargs: host, previous, path, changed, snapshot
@@ -8,11 +8,12 @@ from fastapi.responses import HTMLResponse
 
 
 from gatenet.diagnostics.ping import ping
-from gatenet.diagnostics.traceroute import traceroute
+from gatenet.diagnostics.traceroute import traceroute, async_traceroute_stream
 from gatenet.diagnostics.dns import dns_lookup
 from gatenet.diagnostics.port_scan import scan_ports
+from gatenet.diagnostics.rdns import reverse_resolver
 from fastapi.responses import StreamingResponse
-import time
+import json
 from fastapi import Query
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -53,7 +54,14 @@ def index():
                 const eventSource = new EventSource(`/api/traceroute/stream?host=${encodeURIComponent(host)}`);
                 let output = '';
                 eventSource.onmessage = function(event) {
-                    output += event.data + '\n';
+                    let line = event.data;
+                    try {
+                        const hop = JSON.parse(event.data);
+                        const name = hop.hostname ? ` (${hop.hostname})` : '';
+                        const rtts = hop.rtts.map(r => r === null ? '*' : `${r.toFixed(2)} ms`).join('  ');
+                        line = `${hop.hop}  ${hop.ip}${name}  ${rtts}`;
+                    } catch (e) {}
+                    output += line + '\\n';
                     document.getElementById('tr_live_result').textContent = output;
                 };
                 eventSource.onerror = function() {
@@ -125,6 +133,22 @@ def api_dns_lookup(host: str = Query(..., description="Host to resolve")):
         return {"ok": False, "error": error_message}
 
 
+# Upper bound on addresses per reverse_dns request
+MAX_REVERSE_DNS_IPS = 256
+
+@app.get("/api/reverse_dns")
+async def api_reverse_dns(ips: str = Query(..., description="Comma-separated IP addresses")):
+    """Reverse-resolve IP addresses (e.g. scan or traceroute results) in parallel."""
+    try:
+        ip_list = [ip.strip() for ip in ips.split(",") if ip.strip()][:MAX_REVERSE_DNS_IPS]
+        names = await reverse_resolver.lookup_many(ip_list)
+        return {"ok": True, "names": names}
+    except Exception:
+        import logging
+        logging.error("Error in api_reverse_dns")
+        return {"ok": False, "error": error_message}
+
+
 @app.get("/api/port_scan")
 def api_port_scan(host: str = Query(..., description="Host to scan"), ports: str = Query(..., description="Comma-separated ports")):
     """Scan ports on a host."""
@@ -140,14 +164,12 @@ def api_port_scan(host: str = Query(..., description="Host to scan"), ports: str
 
 # SSE endpoint for live traceroute
 @app.get("/api/traceroute/stream")
-def api_traceroute_stream(host: str = Query(..., description="Host to traceroute")):
+async def api_traceroute_stream(host: str = Query(..., description="Host to traceroute")):
     """Stream traceroute hops as they are discovered (SSE)."""
-    def event_stream():
+    async def event_stream():
         try:
-            hops = traceroute(host)
-            for hop in hops:
-                yield f"data: {hop}\n\n"
-                time.sleep(0.2)  # Simulate delay for demo
+            async for hop in async_traceroute_stream(host):
+                yield f"data: {json.dumps(hop)}\n\n"
         except Exception:
             # Never leak exception details to SSE client
             yield "data: ERROR: An internal error occurred.\n\n"
@@ -5,29 +5,39 @@ Provides networking diagnostic tools including ping, traceroute, DNS lookups,
 port scanning, geolocation, and bandwidth testing.
 """
 
-from .dns import reverse_dns_lookup, dns_lookup
-from .port_scan import check_public_port, scan_ports, check_port, scan_ports_async
+from .dns import reverse_dns_lookup, dns_lookup, DNSResolver
+from .port_scan import check_public_port, scan_ports, check_port, scan_ports_async, scan_network
 from .geo import get_geo_info
-from .ping import ping, async_ping, ping_with_rf
-from .traceroute import traceroute
+from .ping import ping, async_ping, ping_with_rf, ping_many
+from .traceroute import traceroute, multipath_traceroute, traceroute_stream, async_traceroute_stream
 
 # Import bandwidth if available (may have optional dependencies)
 try:
-    from .bandwidth import measure_bandwidth
+    from .bandwidth import measure_bandwidth, measure_udp, BandwidthServer
 except ImportError:
     measure_bandwidth = None
+    measure_udp = None
+    BandwidthServer = None
 
 __all__ = [
     "reverse_dns_lookup",
     "dns_lookup", 
+    "DNSResolver",
     "check_public_port",
     "scan_ports",
     "check_port",
     "scan_ports_async",
+    "scan_network",
     "get_geo_info",
     "ping",
     "async_ping",
     "ping_with_rf",
+    "ping_many",
     "traceroute",
+    "multipath_traceroute",
+    "traceroute_stream",
+    "async_traceroute_stream",
     "measure_bandwidth",
+    "measure_udp",
+    "BandwidthServer",
 ]
\ No newline at end of file
@@ -3,27 +3,583 @@ bandwidth.py
 
 Bandwidth measurement utilities for gatenet.
 
-This module provides functions to measure upload and download bandwidth to a target host using TCP sockets.
+This module measures upload and download throughput to a target host over
+one or more parallel TCP streams, and provides :class:`BandwidthServer`, the
+matching server end, so no external tool such as iperf3 is needed. Each
+stream runs on its own thread and moves data through a preallocated buffer
+(``recv_into`` / ``sendall`` on a ``memoryview``, or ``socket.sendfile`` for
+zero-copy uploads), which is enough to fill multi-gigabit links.
+
+:func:`measure_udp` runs a UDP test against the same server: datagrams are
+paced at a target bitrate and the receiving end reports loss, reordering
+and RFC 3550 jitter, which is what matters for voice and video traffic.
+
+Every connection starts with a small hello telling the server what to do;
+servers that ignore it (anything that just streams data, or accepts and
+discards it) still work for plain TCP download and upload tests.
 
 Example:
-    from gatenet.diagnostics.bandwidth import measure_bandwidth
-    result = measure_bandwidth("example.com", port=5201)
-    print(result)
+    from gatenet.diagnostics.bandwidth import BandwidthServer, measure_bandwidth, measure_udp
+
+    # On the far end: BandwidthServer(port=5201).serve_forever()
+    # (or `gatenet bandwidth serve`)
+    result = measure_bandwidth("192.168.1.20", port=5201, streams=4)
+    print(result["bandwidth_mbps"], result["intervals"])
+    result = measure_udp("192.168.1.20", port=5201, bitrate=64_000, datagram_size=160)
+    print(result["loss_percent"], result["jitter_ms"])
 """
 
+import concurrent.futures
+import json
+import math
+import select
 import socket
+import struct
+import sys
+import tempfile
+import threading
 import time
-from typing import Dict, Optional
+from array import array
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from gatenet.diagnostics.icmp import _SO_TIMESTAMPNS, _TIMESPEC
+from gatenet.diagnostics.resolver import resolver_cache
+
+DEFAULT_PORT = 5201
+# Default seconds covered by each entry of a result's "intervals"
+REPORT_INTERVAL = 1.0
+
+# magic, mode, reserved, reserved, duration
+_HELLO = struct.Struct("!4sBBHd")
+_MAGIC = b"GNBW"
+_MODE_SEND = 0  # server sends, client measures download
+_MODE_RECV = 1  # server receives, client measures upload
+_MODE_UDP_SEND = 2  # server sends paced datagrams
+_MODE_UDP_RECV = 3  # server receives datagrams and reports the stats
+# UDP modes follow the hello with: bitrate (bits/s), datagram size, client UDP port, interval
+_UDP_PARAMS = struct.Struct("!QHHd")
+_UDP_PORT = struct.Struct("!H")
+# Sender -> receiver over the control connection once pacing ends: datagrams sent
+_UDP_DONE = struct.Struct("!Q")
+_REPORT_LEN = struct.Struct("!I")
+# Every datagram starts with its sequence number and send time (ns)
+_DATAGRAM = struct.Struct("!QQ")
+# Seconds the receiver keeps reading after the sender reports it is done
+_UDP_GRACE = 0.25
+# Limits on the test parameters a server accepts from a client
+_UDP_MAX_DURATION = 86400.0
+_UDP_MAX_INTERVALS = 86400
+# Recent sequence numbers remembered for spotting duplicates
+_DUPLICATE_WINDOW = 1 << 14
+_UDP_RECV_BUFFER = 4 << 20
+# Not exported by the socket module on older Pythons; 103 is UDP_SEGMENT on Linux
+_UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103 if sys.platform.startswith("linux") else None)
+_SOL_UDP = getattr(socket, "SOL_UDP", 17)
+# Kernel limits for one segmented (GSO) send
+_GSO_MAX_SEGMENTS = 64
+_GSO_MAX_BYTES = 65000
+# Leading fields of Linux's struct tcp_info, up to tcpi_total_retrans
+_TCP_INFO = struct.Struct("=8B24I")
+_TCP_INFO_OPT = getattr(socket, "TCP_INFO", None) if sys.platform.startswith("linux") else None
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    while view:
+        n = sock.recv_into(view)
+        if not n:
+            raise ConnectionError("Connection closed during handshake")
+        view = view[n:]
+    return bytes(buf)
+
+
+def _check_udp_params(bitrate: int, size: int, duration: float, interval: float) -> None:
+    """Raise ValueError for UDP test parameters the two ends cannot run with."""
+    if not _DATAGRAM.size <= size <= 65507:
+        raise ValueError(f"datagram_size must be between {_DATAGRAM.size} and 65507")
+    if not bitrate > 0:
+        raise ValueError("bitrate must be positive")
+    if not interval > 0:
+        raise ValueError("interval must be positive")
+    if not 0 < duration <= _UDP_MAX_DURATION:
+        raise ValueError(f"duration must be positive and at most {_UDP_MAX_DURATION:g} seconds")
+    if duration / interval > _UDP_MAX_INTERVALS:
+        raise ValueError(f"duration / interval must be at most {_UDP_MAX_INTERVALS}")
+
+
+def _datagram_count(bitrate: int, size: int, duration: float) -> int:
+    """Number of datagrams a test sends; both ends derive it from the parameters."""
+    return int(bitrate / (size * 8) * duration)
+
 
-def measure_bandwidth(host: str, port: int = 5201, duration: float = 5.0, payload_size: int = 65536, direction: str = "download") -> Dict[str, float]:
+class _UdpStats:
     """
+    Receiver-side accounting for one UDP test.
+
+    Sequence numbers at or past ``expected`` (the sender's total) cannot be
+    part of the test and are dropped. Duplicates are spotted among the last
+    ``_DUPLICATE_WINDOW`` sequence numbers, so memory stays fixed whatever
+    the test length.
+    """
+
+    def __init__(self, duration: float, interval: float = REPORT_INTERVAL, expected: int = 0) -> None:
+        self.duration = float(duration)
+        self.interval = interval
+        self.expected = expected
+        self.received = 0
+        self.bytes = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self.jitter_ns = 0.0
+        self._highest = -1
+        # Slot seq % window holds the last sequence number seen there
+        self._seen = array("q", [-1]) * _DUPLICATE_WINDOW
+        self._transit: Optional[int] = None
+        self._first: Optional[int] = None
+        self._buckets = array("d", bytes(8 * max(1, math.ceil(duration / interval))))
+
+    def add(self, seq: int, sent_ns: int, arrival_ns: int, size: int) -> None:
+        if seq >= self.expected:
+            return
+        slot = seq % _DUPLICATE_WINDOW
+        if self._seen[slot] == seq:
+            self.duplicates += 1
+            return
+        # Older than the window: count it, but keep the newer number in its slot
+        if seq > self._seen[slot]:
+            self._seen[slot] = seq
+        self.received += 1
+        self.bytes += size
+        if seq < self._highest:
+            self.out_of_order += 1
+        else:
+            self._highest = seq
+        # RFC 3550 6.4.1: smoothed mean deviation of the transit time difference
+        transit = arrival_ns - sent_ns
+        if self._transit is not None:
+            self.jitter_ns += (abs(transit - self._transit) - self.jitter_ns) / 16
+        self._transit = transit
+        if self._first is None:
+            self._first = arrival_ns
+        bucket = int((arrival_ns - self._first) / (self.interval * 1e9))
+        self._buckets[min(bucket, len(self._buckets) - 1)] += size
+
+    def result(self, sent: int, direction: str, bitrate: int) -> Dict[str, Any]:
+        lost = max(0, sent - self.received)
+        spans = [min(self.interval, self.duration - i * self.interval) for i in range(len(self._buckets))]
+        return {
+            "bandwidth_mbps": (self.bytes * 8) / (self.duration * 1_000_000) if self.duration > 0 else 0.0,
+            "bytes_transferred": self.bytes,
+            "duration": self.duration,
+            "direction": direction,
+            "bitrate": bitrate,
+            "packets_sent": sent,
+            "packets_received": self.received,
+            "packets_lost": lost,
+            "loss_percent": 100.0 * lost / sent if sent else 0.0,
+            "out_of_order": self.out_of_order,
+            "duplicates": self.duplicates,
+            "jitter_ms": self.jitter_ns / 1_000_000,
+            "interval": self.interval,
+            "intervals": array("d", (b * 8 / (span * 1_000_000) for b, span in zip(self._buckets, spans) if span > 0)),
+        }
+
+
+def _send_datagrams(sock: socket.socket, bitrate: int, size: int, duration: float) -> int:
+    """
+    Send paced, numbered datagrams on a connected UDP socket; return the count.
+
+    Datagrams are released on a fixed schedule at ``bitrate``. When the
+    sender falls behind (or the rate is high), the backlog goes out as one
+    batch: a single segmented ``sendmsg`` (UDP GSO) where the kernel
+    supports it, so high rates cost one syscall per batch rather than per
+    datagram.
+    """
+    rate = bitrate / (size * 8)
+    total = _datagram_count(bitrate, size, duration)
+    max_batch = max(1, min(_GSO_MAX_SEGMENTS, _GSO_MAX_BYTES // size))
+    buf = bytearray(max_batch * size)
+    view = memoryview(buf)
+    segment = [(_SOL_UDP, _UDP_SEGMENT, struct.pack("=H", size))] if _UDP_SEGMENT is not None else None
+    pack_into, send = _DATAGRAM.pack_into, sock.send
+    seq = 0
+    start = time.perf_counter()
+    while seq < total:
+        now = time.perf_counter()
+        due = min(total, int((now - start) * rate) + 1)
+        if due <= seq:
+            time.sleep(start + seq / rate - now)
+            continue
+        count = min(due - seq, max_batch)
+        stamp = time.time_ns()
+        for i in range(count):
+            pack_into(buf, i * size, seq + i, stamp)
+        sent = 0
+        try:
+            if count > 1 and segment is not None:
+                try:
+                    sock.sendmsg([view[:count * size]], segment)
+                    sent = count
+                except ConnectionRefusedError:
+                    raise
+                except OSError:
+                    # No GSO here (old kernel, or the route can't segment): one by one
+                    segment = None
+            while sent < count:
+                send(view[sent * size:(sent + 1) * size])
+                sent += 1
+        except ConnectionRefusedError:
+            # An earlier datagram drew a port unreachable and this send was
+            # dropped; the unsent datagrams go out on the next pass
+            pass
+        seq += sent
+    return seq
+
+
+def _read_datagrams(sock: socket.socket, stats: _UdpStats, buf: bytearray, kernel_stamps: bool) -> None:
+    """Drain every queued datagram from a non-blocking socket into ``stats``."""
+    unpack_from = _DATAGRAM.unpack_from
+    while True:
+        try:
+            if kernel_stamps:
+                size, ancdata, _flags, _addr = sock.recvmsg_into([buf], socket.CMSG_SPACE(_TIMESPEC.size))
+                arrival = None
+                for level, kind, value in ancdata:
+                    if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(value) >= _TIMESPEC.size:
+                        sec, nsec = _TIMESPEC.unpack_from(value)
+                        arrival = sec * 1_000_000_000 + nsec
+                if arrival is None:
+                    arrival = time.time_ns()
+            else:
+                size = sock.recv_into(buf)
+                arrival = time.time_ns()
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionRefusedError:
+            continue
+        if size >= _DATAGRAM.size:
+            seq, sent_ns = unpack_from(buf)
+            stats.add(seq, sent_ns, arrival, size)
+
+
+def _receive_datagrams(sock: socket.socket, control: socket.socket, stats: _UdpStats, timeout: float) -> int:
+    """
+    Read datagrams until the sender reports the count it sent, plus a short
+    grace period for stragglers; return that count.
+
+    Raises
+    ------
+    TimeoutError
+        If the sender goes quiet for ``timeout`` seconds before it is done.
+    ConnectionError
+        If the control connection closes first.
+    """
+    kernel_stamps = False
+    if _SO_TIMESTAMPNS is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+            kernel_stamps = True
+        except OSError:
+            pass
+    try:
+        # Room for bursts while this thread is busy with earlier datagrams
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _UDP_RECV_BUFFER)
+    except OSError:
+        pass
+    sock.setblocking(False)
+    buf = bytearray(65536)
+    sent: Optional[int] = None
+    until = time.monotonic() + stats.duration + timeout
+    while True:
+        wait = until - time.monotonic()
+        if wait <= 0:
+            if sent is None:
+                raise TimeoutError("Bandwidth test sender stopped responding")
+            return sent
+        readable, _w, _x = select.select([sock] if sent is not None else [sock, control], [], [], wait)
+        if sock in readable:
+            _read_datagrams(sock, stats, buf, kernel_stamps)
+            if sent is None:
+                until = max(until, time.monotonic() + timeout)
+        if control in readable:
+            (sent,) = _UDP_DONE.unpack(_recv_exact(control, _UDP_DONE.size))
+            until = time.monotonic() + _UDP_GRACE
+
+
+class BandwidthServer:
+    """
+    Server end for :func:`measure_bandwidth`.
+
+    Every client connection is served on its own thread: download streams
+    are sent data from one preallocated buffer until the client disconnects,
+    upload streams are read into a preallocated buffer and discarded. UDP
+    tests use the connection for control and an ephemeral UDP port for the
+    datagrams.
+
+    Parameters
+    ----------
+    host : str, optional
+        Address to listen on (default: "0.0.0.0").
+    port : int, optional
+        Port to listen on; 0 picks a free port, available as ``port`` after
+        :meth:`start` (default: 5201).
+    payload_size : int, optional
+        Size of the send and receive buffers in bytes (default: 131072).
+    timeout : float, optional
+        Seconds a connection may stall before it is dropped (default: 10.0).
+
     Example
     -------
-    >>> from gatenet.diagnostics.bandwidth import measure_bandwidth
-    >>> result = measure_bandwidth("example.com", port=5201, duration=2.0)
-    >>> print(result)
-    {'bandwidth_mbps': 94.2, 'bytes_transferred': 2359296, 'duration': 2.0}
-    Measure bandwidth to a target host using TCP sockets.
+    >>> from gatenet.diagnostics.bandwidth import BandwidthServer, measure_bandwidth
+    >>> with BandwidthServer(host="127.0.0.1", port=0) as server:
+    ...     result = measure_bandwidth("127.0.0.1", port=server.port, duration=1.0, streams=2)
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = DEFAULT_PORT, payload_size: int = 131072, timeout: float = 10.0) -> None:
+        self.host = host
+        self.port = port
+        self.payload_size = payload_size
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._conns: Set[socket.socket] = set()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Bind, listen and serve connections on a background thread."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(128)
+        self.port = self._sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, args=(self._sock,), name="gatenet-bandwidth-server", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Start the server if needed and block until :meth:`stop` is called."""
+        if self._sock is None:
+            self.start()
+        assert self._thread is not None
+        self._thread.join()
+
+    def stop(self) -> None:
+        """Stop accepting and close every open connection."""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                # Wakes the blocked accept(); close() alone doesn't on Linux
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        with self._lock:
+            conns = list(self._conns)
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _accept_loop(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                conn, _addr = sock.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._conns.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), name="gatenet-bandwidth-conn", daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            conn.settimeout(self.timeout)
+            magic, mode, _r1, _r2, duration = _HELLO.unpack(_recv_exact(conn, _HELLO.size))
+            if magic != _MAGIC:
+                return
+            if mode in (_MODE_UDP_SEND, _MODE_UDP_RECV):
+                self._serve_udp(conn, mode, duration)
+                return
+            buf = memoryview(bytearray(self.payload_size))
+            if mode == _MODE_SEND:
+                sendall = conn.sendall
+                while True:
+                    sendall(buf)
+            elif mode == _MODE_RECV:
+                recv_into = conn.recv_into
+                while recv_into(buf):
+                    pass
+        except (OSError, struct.error, ValueError):
+            # Client went away (the normal end of a download), stalled or sent bad parameters
+            pass
+        finally:
+            with self._lock:
+                self._conns.discard(conn)
+            conn.close()
+
+    def _serve_udp(self, conn: socket.socket, mode: int, duration: float) -> None:
+        bitrate, size, client_port, interval = _UDP_PARAMS.unpack(_recv_exact(conn, _UDP_PARAMS.size))
+        # The server may face any client; refuse parameters before allocating for them
+        _check_udp_params(bitrate, size, duration, interval)
+        local, peer = conn.getsockname(), conn.getpeername()
+        with socket.socket(conn.family, socket.SOCK_DGRAM) as udp:
+            udp.bind((local[0], 0))
+            conn.sendall(_UDP_PORT.pack(udp.getsockname()[1]))
+            if mode == _MODE_UDP_SEND:
+                udp.connect((peer[0], client_port))
+                sent = _send_datagrams(udp, bitrate, size, duration)
+                conn.sendall(_UDP_DONE.pack(sent))
+                return
+            # Only the client that asked for the test may feed the stats
+            udp.connect((peer[0], client_port))
+            stats = _UdpStats(duration, interval, _datagram_count(bitrate, size, duration))
+            sent = _receive_datagrams(udp, conn, stats, self.timeout)
+            report = json.dumps(stats.result(sent, "upload", bitrate), default=list).encode()
+            conn.sendall(_REPORT_LEN.pack(len(report)) + report)
+
+    def __enter__(self) -> "BandwidthServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class _Stream:
+    """One TCP stream of a test; ``run`` moves data until ``stop``."""
+
+    def __init__(self, sock: socket.socket, direction: str, payload_size: int, source: Optional[BinaryIO]) -> None:
+        self.sock = sock
+        self.direction = direction
+        self.payload_size = payload_size
+        self.source = source
+        self.bytes = 0
+        self.running = True
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        sock = self.sock
+        try:
+            if self.direction == "download":
+                buf = memoryview(bytearray(self.payload_size))
+                recv_into = sock.recv_into
+                while self.running:
+                    n = recv_into(buf)
+                    if not n:
+                        break
+                    self.bytes += n
+            elif self.source is not None:
+                source, size = self.source, self.payload_size
+                while self.running:
+                    self.bytes += sock.sendfile(source, 0, size)
+            else:
+                buf = memoryview(bytearray(self.payload_size))
+                size, sendall = len(buf), sock.sendall
+                while self.running:
+                    sendall(buf)
+                    self.bytes += size
+        except ConnectionResetError as exc:
+            # A plain sender that never reads our hello resets when it closes
+            if self.running and self.direction != "download":
+                self.error = exc
+        except OSError as exc:
+            if self.running:
+                self.error = exc
+
+    def stop(self) -> None:
+        self.running = False
+        try:
+            # Wake a recv or send blocked in run()
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _tcp_info(sock: socket.socket) -> Optional[Tuple[float, int, int]]:
+    """Return ``(rtt_ms, cwnd_bytes, total_retransmits)`` from TCP_INFO, or None."""
+    if _TCP_INFO_OPT is None:
+        return None
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, _TCP_INFO_OPT, _TCP_INFO.size)
+    except OSError:
+        return None
+    if len(raw) < _TCP_INFO.size:
+        return None
+    info = _TCP_INFO.unpack(raw)
+    # tcpi_rtt (us), tcpi_snd_cwnd (segments) * tcpi_snd_mss, tcpi_total_retrans
+    return info[23] / 1000, info[26] * info[10], info[31]
+
+
+class _Samples:
+    """Per-interval throughput of a set of streams, with TCP_INFO series where available."""
+
+    def __init__(self, workers: List[_Stream], now: float) -> None:
+        self.workers = workers
+        self.start = self.mark = now
+        self.first = self.marked = self.bytes()
+        self.mbps = array("d")
+        self.tcp_info: Optional[Dict[str, "array[float]"]] = None
+        snapshots = [_tcp_info(worker.sock) for worker in workers]
+        self._retransmits = 0
+        if all(snapshot is not None for snapshot in snapshots):
+            self.tcp_info = {"rtt_ms": array("d"), "cwnd": array("d"), "retransmits": array("d")}
+            self._retransmits = sum(snapshot[2] for snapshot in snapshots if snapshot is not None)
+
+    def bytes(self) -> int:
+        return sum(worker.bytes for worker in self.workers)
+
+    def record(self, now: float, total: int) -> None:
+        self.mbps.append((total - self.marked) * 8 / ((now - self.mark) * 1_000_000))
+        self.mark, self.marked = now, total
+        if self.tcp_info is None:
+            return
+        snapshots = [snapshot for snapshot in (_tcp_info(worker.sock) for worker in self.workers) if snapshot is not None]
+        if not snapshots:
+            # Keep the series aligned with the throughput samples
+            for series in self.tcp_info.values():
+                series.append(math.nan)
+            return
+        retransmits = sum(snapshot[2] for snapshot in snapshots)
+        self.tcp_info["rtt_ms"].append(sum(snapshot[0] for snapshot in snapshots) / len(snapshots))
+        self.tcp_info["cwnd"].append(sum(snapshot[1] for snapshot in snapshots))
+        self.tcp_info["retransmits"].append(max(0, retransmits - self._retransmits))
+        self._retransmits = retransmits
+
+
+def _open_streams(host: str, port: int, count: int, mode: int, duration: float) -> List[socket.socket]:
+    family, address = resolver_cache.resolve(host)
+    hello = _HELLO.pack(_MAGIC, mode, 0, 0, duration)
+    socks: List[socket.socket] = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            socks.append(sock)
+            sock.settimeout(5)
+            sock.connect((address, port))
+            sock.sendall(hello)
+    except BaseException:
+        for sock in socks:
+            sock.close()
+        raise
+    return socks
+
+
+def measure_bandwidth(
+    host: str,
+    port: int = DEFAULT_PORT,
+    duration: float = 5.0,
+    payload_size: int = 131072,
+    direction: str = "download",
+    streams: int = 1,
+    sendfile: bool = False,
+    interval: float = REPORT_INTERVAL,
+    omit: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Measure bandwidth to a target host using parallel TCP streams.
 
     Parameters
     ----------
@@ -34,43 +590,205 @@ def measure_bandwidth(host: str, port: int = 5201, duration: float = 5.0, payloa
     duration : float, optional
         Duration of the test in seconds (default: 5.0).
     payload_size : int, optional
-        Size of each payload in bytes (default: 65536).
+        Size of each stream's buffer, i.e. of each read or write, in bytes
+        (default: 131072).
     direction : {"download", "upload"}, optional
         Direction of measurement (default: "download").
+    streams : int, optional
+        Number of parallel TCP connections (default: 1). A single stream is
+        often limited by one core or by the TCP window; several fill the
+        link.
+    sendfile : bool, optional
+        Upload with ``socket.sendfile`` from a temporary file, so the kernel
+        copies the payload straight from the page cache (default: False).
+    interval : float, optional
+        Seconds covered by each sample; short intervals such as 0.1 show
+        slow start and throughput collapse (default: 1.0).
+    omit : float, optional
+        Warm-up seconds run before measuring starts and left out of every
+        figure, e.g. to skip TCP slow start (default: 0).
 
     Returns
     -------
     dict
-        Dictionary with keys 'bandwidth_mbps', 'bytes_transferred', and 'duration'.
+        ``bandwidth_mbps``, ``bytes_transferred``, ``duration`` (seconds
+        actually measured), ``direction``, ``streams``, ``interval``,
+        ``omit``, ``intervals`` (an ``array('d')`` of Mbps per interval; the
+        last may cover a shorter period) and ``tcp_info``. On Linux,
+        ``tcp_info`` holds ``array('d')`` series aligned with
+        ``intervals``: ``rtt_ms`` (smoothed RTT, averaged over streams),
+        ``cwnd`` (congestion window in bytes, summed over streams) and
+        ``retransmits`` (segments retransmitted in the interval); elsewhere
+        it is None. The window and retransmits describe this end's sending
+        side, so they are most telling for uploads; a rising RTT under load
+        points at bufferbloat.
+
+    Raises
+    ------
+    ValueError
+        If ``interval`` is not positive.
+    socket.gaierror
+        If ``host`` does not resolve.
+    OSError
+        If a connection fails, or breaks before the test ends.
 
     Notes
     -----
-    This function requires a bandwidth server (e.g., iperf3) running on the target host.
+    Upload figures count the bytes handed to the kernel, so they include
+    data still in flight when the test stops.
+
+    Example
+    -------
+    >>> from gatenet.diagnostics.bandwidth import measure_bandwidth
+    >>> result = measure_bandwidth("192.168.1.20", duration=2.0, streams=4)
+    >>> result["bandwidth_mbps"], result["bytes_transferred"]
+    (9387.1, 2346775552)
+    >>> result["intervals"]
+    array('d', [9391.4, 9382.8])
     """
     assert direction in ("download", "upload"), "direction must be 'download' or 'upload'"
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(5)
-    s.connect((host, port))
-    total_bytes = 0
-    start = time.time()
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+    socks = _open_streams(host, port, max(1, streams), _MODE_SEND if direction == "download" else _MODE_RECV, duration)
+    source: Optional[BinaryIO] = None
     try:
-        if direction == "download":
-            while time.time() - start < duration:
-                data = s.recv(payload_size)
-                if not data:
-                    break
-                total_bytes += len(data)
-        else:
-            payload = b"0" * payload_size
-            while time.time() - start < duration:
-                sent = s.send(payload)
-                total_bytes += sent
+        if sendfile and direction == "upload":
+            source = tempfile.TemporaryFile()
+            source.write(bytes(payload_size))
+            source.flush()
+        workers = [_Stream(sock, direction, payload_size, source) for sock in socks]
+        with concurrent.futures.ThreadPoolExecutor(len(workers), thread_name_prefix="gatenet-bandwidth") as pool:
+            pending = {pool.submit(worker.run) for worker in workers}
+            now = time.perf_counter()
+            if omit > 0:
+                _done, pending = concurrent.futures.wait(pending, timeout=omit)
+                now = time.perf_counter()
+            samples = _Samples(workers, now)
+            deadline = now + duration
+            # Only this thread reads the clock; the streams just move bytes
+            while pending and now < deadline:
+                boundary = min(samples.mark + interval, deadline)
+                _done, pending = concurrent.futures.wait(pending, timeout=boundary - now)
+                now = time.perf_counter()
+                if pending and boundary < deadline and now >= boundary:
+                    samples.record(now, samples.bytes())
+            end = min(now, deadline)
+            total = samples.bytes()
+            if end > samples.mark:
+                samples.record(end, total)
+            for worker in workers:
+                worker.stop()
+        errors = [worker.error for worker in workers if worker.error is not None]
+        if errors:
+            raise errors[0]
     finally:
-        s.close()
-    elapsed = time.time() - start
-    bandwidth_mbps = (total_bytes * 8) / (elapsed * 1_000_000)
+        for sock in socks:
+            sock.close()
+        if source is not None:
+            source.close()
+    elapsed = end - samples.start
+    transferred = total - samples.first
     return {
-        "bandwidth_mbps": bandwidth_mbps,
-        "bytes_transferred": total_bytes,
-        "duration": elapsed
+        "bandwidth_mbps": (transferred * 8) / (elapsed * 1_000_000) if elapsed > 0 else 0.0,
+        "bytes_transferred": transferred,
+        "duration": elapsed,
+        "direction": direction,
+        "streams": len(workers),
+        "interval": interval,
+        "omit": omit,
+        "intervals": samples.mbps,
+        "tcp_info": samples.tcp_info,
     }
+
+
+def measure_udp(
+    host: str,
+    port: int = DEFAULT_PORT,
+    duration: float = 5.0,
+    bitrate: int = 1_000_000,
+    datagram_size: int = 1400,
+    direction: str = "download",
+    interval: float = REPORT_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    Measure UDP throughput, loss and jitter against a :class:`BandwidthServer`.
+
+    The sender paces sequence-numbered, timestamped datagrams at
+    ``bitrate``; the receiver (the server for uploads, this client for
+    downloads) counts loss, reordering and duplicates and computes
+    interarrival jitter as in RFC 3550. Test parameters and the final
+    report travel over a TCP control connection to the server's port.
+
+    Parameters
+    ----------
+    host : str
+        Host running the gatenet bandwidth server.
+    port : int, optional
+        Server port (default: 5201).
+    duration : float, optional
+        Sending time in seconds (default: 5.0).
+    bitrate : int, optional
+        Target send rate in bits per second, counting UDP payload
+        (default: 1000000).
+    datagram_size : int, optional
+        UDP payload size in bytes; keep it under the path MTU to avoid
+        fragmentation (default: 1400).
+    direction : {"download", "upload"}, optional
+        ``"download"`` has the server send, ``"upload"`` has this client
+        send (default: "download").
+    interval : float, optional
+        Seconds covered by each throughput sample (default: 1.0).
+
+    Returns
+    -------
+    dict
+        ``bandwidth_mbps`` (received), ``bytes_transferred``, ``duration``,
+        ``direction``, ``bitrate``, ``packets_sent``, ``packets_received``,
+        ``packets_lost``, ``loss_percent``, ``out_of_order``, ``duplicates``,
+        ``jitter_ms``, ``interval`` and ``intervals`` (an ``array('d')`` of
+        received Mbps per interval).
+
+    Raises
+    ------
+    ValueError
+        If ``datagram_size`` cannot hold the datagram header, ``bitrate`` or
+        ``interval`` is not positive, or ``duration`` is outside what the
+        server accepts (up to a day, in at most 86400 intervals).
+    socket.gaierror
+        If ``host`` does not resolve.
+    OSError
+        If the server cannot be reached or the control connection fails.
+
+    Example
+    -------
+    >>> from gatenet.diagnostics.bandwidth import measure_udp
+    >>> result = measure_udp("192.168.1.20", bitrate=2_000_000, datagram_size=200, duration=10)
+    >>> result["loss_percent"], result["jitter_ms"]
+    (0.12, 0.41)
+    """
+    assert direction in ("download", "upload"), "direction must be 'download' or 'upload'"
+    _check_udp_params(bitrate, datagram_size, duration, interval)
+    mode = _MODE_UDP_SEND if direction == "download" else _MODE_UDP_RECV
+    control = _open_streams(host, port, 1, mode, duration)[0]
+    try:
+        server = control.getpeername()
+        with socket.socket(control.family, socket.SOCK_DGRAM) as udp:
+            udp.bind((control.getsockname()[0], 0))
+            control.sendall(_UDP_PARAMS.pack(bitrate, datagram_size, udp.getsockname()[1], interval))
+            (server_port,) = _UDP_PORT.unpack(_recv_exact(control, _UDP_PORT.size))
+            # Connected either way, so only the server's datagrams are counted
+            udp.connect((server[0], server_port))
+            if direction == "download":
+                stats = _UdpStats(duration, interval, _datagram_count(bitrate, datagram_size, duration))
+                sent = _receive_datagrams(udp, control, stats, timeout=5.0)
+                return stats.result(sent, direction, bitrate)
+            sent = _send_datagrams(udp, bitrate, datagram_size, duration)
+            control.sendall(_UDP_DONE.pack(sent))
+            # The server reports once its grace period for late datagrams ends
+            control.settimeout(5 + _UDP_GRACE)
+            (length,) = _REPORT_LEN.unpack(_recv_exact(control, _REPORT_LEN.size))
+            result = json.loads(_recv_exact(control, length))
+            result["intervals"] = array("d", result["intervals"])
+            return result
+    finally:
+        control.close()
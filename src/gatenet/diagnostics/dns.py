@@ -1,4 +1,37 @@
+"""
+dns.py
+
+DNS lookups for gatenet.
+
+:func:`dns_lookup` and :func:`reverse_dns_lookup` ask the system resolver.
+:class:`DNSResolver` is an asyncio stub resolver that builds and parses the
+DNS wire format itself (RFC 1035): it pipelines any number of queries over
+one UDP socket, matches answers to queries by ID and question, retries a
+query over TCP when its answer is truncated, and can target any server.
+A, AAAA, PTR, MX, TXT and SRV queries are supported; CNAME, NS and SOA
+records are decoded when they appear in answers.
+
+Example:
+    import asyncio
+    from gatenet.diagnostics.dns import DNSResolver
+
+    async def main():
+        async with DNSResolver("1.1.1.1") as resolver:
+            print(await resolver.resolve("example.com", "AAAA"))
+            print(await resolver.reverse_many(["1.1.1.1", "8.8.8.8"]))
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import ipaddress
+import secrets
 import socket
+import struct
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from gatenet.diagnostics.resolver import resolver_cache
+
 
 def reverse_dns_lookup(ip: str) -> str:
     """
@@ -36,4 +69,528 @@ def dns_lookup(hostname: str) -> str:
     except socket.gaierror:
         return "Unknown"
     except socket.herror:
-        return "Invalid Hostname"  # Handle invalid hostnames gracefully
\ No newline at end of file
+        return "Invalid Hostname"  # Handle invalid hostnames gracefully
+
+
+# Query types by name; other types in answers are reported as "TYPE<n>"
+RECORD_TYPES: Dict[str, int] = {
+    "A": 1,
+    "NS": 2,
+    "CNAME": 5,
+    "SOA": 6,
+    "PTR": 12,
+    "MX": 15,
+    "TXT": 16,
+    "AAAA": 28,
+    "SRV": 33,
+}
+RCODES: Dict[int, str] = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+NOERROR = 0
+NXDOMAIN = 3
+
+_TYPE_NAMES = {code: name for name, code in RECORD_TYPES.items()}
+_HEADER = struct.Struct("!HHHHHH")
+_QUESTION = struct.Struct("!HH")
+_RR = struct.Struct("!HHIH")
+_OPT = 41
+# EDNS(0) UDP payload size recommended by DNS Flag Day 2020; avoids IP fragmentation
+_EDNS_PAYLOAD = 1232
+_FLAG_TC = 0x0200
+_FLAG_RD = 0x0100
+
+
+class DNSError(Exception):
+    """
+    Raised for malformed DNS messages and for error answers.
+
+    Attributes
+    ----------
+    rcode : int or None
+        DNS response code of the answer, if there was one.
+    """
+
+    def __init__(self, message: str, rcode: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.rcode = rcode
+
+
+class DNSRecord(NamedTuple):
+    """
+    One resource record from a DNS answer.
+
+    Attributes
+    ----------
+    name : str
+        Owner name, without the trailing dot.
+    type : str
+        Record type, e.g. ``"A"`` or ``"TYPE65"`` for unsupported types.
+    ttl : int
+        Time to live in seconds.
+    value : Any
+        Decoded data: an address or name (str) for A, AAAA, PTR, CNAME and
+        NS; ``(preference, exchange)`` for MX; the concatenated strings for
+        TXT; ``(priority, weight, port, target)`` for SRV;
+        ``(mname, rname, serial, refresh, retry, expire, minimum)`` for SOA;
+        raw bytes otherwise.
+    """
+
+    name: str
+    type: str
+    ttl: int
+    value: Any
+
+
+class DNSResponse(NamedTuple):
+    """
+    A parsed DNS response.
+
+    Attributes
+    ----------
+    id : int
+        Message ID.
+    rcode : int
+        Response code (``NOERROR``, ``NXDOMAIN``, ...).
+    truncated : bool
+        Whether the TC bit was set.
+    question : tuple
+        ``(name, type)`` of the first question, name lower-cased.
+    answers : list of DNSRecord
+        Answer section.
+    authority : list of DNSRecord
+        Authority section (carries the SOA for negative answers).
+    """
+
+    id: int
+    rcode: int
+    truncated: bool
+    question: Tuple[str, int]
+    answers: List[DNSRecord]
+    authority: List[DNSRecord]
+
+
+def _qtype(rtype: Union[str, int]) -> int:
+    if isinstance(rtype, int):
+        return rtype
+    try:
+        return RECORD_TYPES[rtype.upper()]
+    except KeyError:
+        raise ValueError(f"Unsupported record type: {rtype}") from None
+
+
+def _encode_name(name: str) -> bytes:
+    name = name.rstrip(".")
+    out = bytearray()
+    for label in name.split(".") if name else ():
+        raw = label.encode("ascii") if label.isascii() else label.encode("idna")
+        if not 0 < len(raw) < 64:
+            raise ValueError(f"Invalid DNS name: {name!r}")
+        out.append(len(raw))
+        out += raw
+    out.append(0)
+    if len(out) > 255:
+        raise ValueError(f"DNS name too long: {name!r}")
+    return bytes(out)
+
+
+def _decode_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Decode a possibly compressed name; returns it and the offset just past it."""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise DNSError("Truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise DNSError("Truncated compression pointer")
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 127:
+                raise DNSError("Compression pointer loop")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length & 0xC0:
+            raise DNSError("Unsupported label type")
+        offset += 1
+        if not length:
+            break
+        if offset + length > len(data):
+            raise DNSError("Truncated label")
+        labels.append(data[offset:offset + length].decode("ascii", "backslashreplace"))
+        offset += length
+    return ".".join(labels), offset if end is None else end
+
+
+def _decode_rdata(data: bytes, rtype: int, offset: int, end: int) -> Any:
+    rdata = data[offset:end]
+    if rtype == 1 and len(rdata) == 4:
+        return socket.inet_ntop(socket.AF_INET, rdata)
+    if rtype == 28 and len(rdata) == 16:
+        return socket.inet_ntop(socket.AF_INET6, rdata)
+    if rtype in (2, 5, 12):
+        return _decode_name(data, offset)[0]
+    if rtype == 15:
+        (preference,) = struct.unpack_from("!H", data, offset)
+        return preference, _decode_name(data, offset + 2)[0]
+    if rtype == 16:
+        chunks = []
+        i = 0
+        while i < len(rdata):
+            chunks.append(rdata[i + 1:i + 1 + rdata[i]])
+            i += 1 + rdata[i]
+        return b"".join(chunks).decode("utf-8", "replace")
+    if rtype == 33:
+        priority, weight, port = struct.unpack_from("!HHH", data, offset)
+        return priority, weight, port, _decode_name(data, offset + 6)[0]
+    if rtype == 6:
+        mname, next_offset = _decode_name(data, offset)
+        rname, next_offset = _decode_name(data, next_offset)
+        return (mname, rname) + struct.unpack_from("!IIIII", data, next_offset)
+    return rdata
+
+
+def _parse_record(data: bytes, offset: int) -> Tuple[DNSRecord, int]:
+    name, offset = _decode_name(data, offset)
+    if offset + _RR.size > len(data):
+        raise DNSError("Truncated resource record")
+    rtype, _rclass, ttl, rdlength = _RR.unpack_from(data, offset)
+    offset += _RR.size
+    end = offset + rdlength
+    if end > len(data):
+        raise DNSError("Truncated resource record data")
+    value = _decode_rdata(data, rtype, offset, end)
+    return DNSRecord(name, _TYPE_NAMES.get(rtype, f"TYPE{rtype}"), ttl, value), end
+
+
+def build_query(name: str, rtype: Union[str, int] = "A", qid: int = 0, edns: bool = True) -> bytes:
+    """
+    Build a recursive DNS query message.
+
+    Parameters
+    ----------
+    name : str
+        Domain name to query; non-ASCII labels are IDNA-encoded.
+    rtype : str or int, optional
+        Record type name or number (default: "A").
+    qid : int, optional
+        Message ID (default: 0).
+    edns : bool, optional
+        Advertise a 1232-byte EDNS(0) UDP payload, so larger answers fit
+        without falling back to TCP (default: True).
+
+    Returns
+    -------
+    bytes
+        The query in wire format.
+
+    Example
+    -------
+    >>> build_query("example.com", "A", qid=1)[:4]
+    b'\\x00\\x01\\x01\\x00'
+    """
+    message = _HEADER.pack(qid, _FLAG_RD, 1, 0, 0, 1 if edns else 0)
+    message += _encode_name(name) + _QUESTION.pack(_qtype(rtype), 1)
+    if edns:
+        message += b"\x00" + _RR.pack(_OPT, _EDNS_PAYLOAD, 0, 0)
+    return message
+
+
+def parse_response(data: bytes) -> DNSResponse:
+    """
+    Parse a DNS response message.
+
+    Truncated responses are returned with whatever records parsed cleanly.
+
+    Raises
+    ------
+    DNSError
+        If the message is malformed.
+    """
+    if len(data) < _HEADER.size:
+        raise DNSError("Short DNS message")
+    qid, flags, qdcount, ancount, nscount, _arcount = _HEADER.unpack_from(data)
+    truncated = bool(flags & _FLAG_TC)
+    offset = _HEADER.size
+    question: Tuple[str, int] = ("", 0)
+    sections: List[List[DNSRecord]] = [[], []]
+    try:
+        for i in range(qdcount):
+            qname, offset = _decode_name(data, offset)
+            if offset + _QUESTION.size > len(data):
+                raise DNSError("Truncated question")
+            qtype, _qclass = _QUESTION.unpack_from(data, offset)
+            offset += _QUESTION.size
+            if i == 0:
+                question = (qname.lower(), qtype)
+        for section, count in zip(sections, (ancount, nscount)):
+            for _ in range(count):
+                record, offset = _parse_record(data, offset)
+                section.append(record)
+    except (DNSError, struct.error) as e:
+        if not truncated:
+            raise DNSError(f"Malformed DNS message: {e}") from None
+    return DNSResponse(qid, flags & 0x0F, truncated, question, sections[0], sections[1])
+
+
+def system_nameserver() -> str:
+    """Return the first nameserver in /etc/resolv.conf, or 127.0.0.1."""
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return "127.0.0.1"
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver: "DNSResolver") -> None:
+        self._resolver = resolver
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._resolver._on_datagram(data)
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP errors for one datagram; the affected queries retry or time out
+        pass
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._resolver._on_closed()
+
+
+class DNSResolver:
+    """
+    Asyncio stub resolver with pipelined queries.
+
+    All queries share one connected UDP socket; each gets a random ID, and
+    answers are matched on ID and question, so thousands of lookups can be
+    in flight at once without threads. Unanswered queries are resent
+    ``retries`` times, and truncated answers are re-queried over TCP.
+
+    Parameters
+    ----------
+    server : str, optional
+        Nameserver address or hostname (default: the first ``nameserver``
+        in /etc/resolv.conf, else 127.0.0.1).
+    port : int, optional
+        Nameserver port (default: 53).
+    timeout : float, optional
+        Seconds to wait for each attempt (default: 2.0).
+    retries : int, optional
+        Resends after a timeout (default: 2).
+    max_inflight : int, optional
+        Maximum number of outstanding queries (default: 512).
+    tcp_fallback : bool, optional
+        Retry truncated answers over TCP (default: True).
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.dns import DNSResolver
+    >>> async def main():
+    ...     async with DNSResolver("8.8.8.8") as resolver:
+    ...         return await resolver.resolve("google.com", "MX")
+    >>> asyncio.run(main())
+    [(10, 'smtp.google.com')]
+    """
+
+    def __init__(
+        self,
+        server: Optional[str] = None,
+        port: int = 53,
+        timeout: float = 2.0,
+        retries: int = 2,
+        max_inflight: int = 512,
+        tcp_fallback: bool = True,
+    ) -> None:
+        if not 0 < max_inflight < 0x10000:
+            raise ValueError("max_inflight must be between 1 and 65535")
+        self.server = server or system_nameserver()
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.tcp_fallback = tcp_fallback
+        self._address: Optional[Tuple[int, str]] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._open_lock = asyncio.Lock()
+        self._limit = asyncio.Semaphore(max_inflight)
+        # id -> (question name, question type, future)
+        self._pending: Dict[int, Tuple[str, int, asyncio.Future]] = {}
+
+    async def __aenter__(self) -> "DNSResolver":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the socket; outstanding queries fail with :class:`DNSError`."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._on_closed()
+
+    def _on_closed(self) -> None:
+        for _name, _type, fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(DNSError("Resolver closed"))
+        self._pending.clear()
+
+    def _on_datagram(self, data: bytes) -> None:
+        try:
+            response = parse_response(data)
+        except DNSError:
+            return
+        entry = self._pending.get(response.id)
+        if entry is None:
+            return
+        name, qtype, fut = entry
+        # Matching the question too rejects stray or spoofed answers that reuse an ID
+        if response.question == (name, qtype) and not fut.done():
+            fut.set_result(response)
+
+    async def _ensure_open(self) -> asyncio.DatagramTransport:
+        async with self._open_lock:
+            if self._transport is None or self._transport.is_closing():
+                self._address = await resolver_cache.resolve_async(self.server)
+                family, address = self._address
+                loop = asyncio.get_running_loop()
+                self._transport, _protocol = await loop.create_datagram_endpoint(
+                    lambda: _DNSProtocol(self), remote_addr=(address, self.port), family=family
+                )
+            return self._transport
+
+    def _new_id(self) -> int:
+        while True:
+            qid = secrets.randbelow(0x10000)
+            if qid not in self._pending:
+                return qid
+
+    async def query(self, name: str, rtype: Union[str, int] = "A") -> DNSResponse:
+        """
+        Send one query and return the parsed response.
+
+        Parameters
+        ----------
+        name : str
+            Domain name.
+        rtype : str or int, optional
+            Record type (default: "A").
+
+        Returns
+        -------
+        DNSResponse
+            The answer, whatever its response code.
+
+        Raises
+        ------
+        TimeoutError
+            If no answer arrived after all retries.
+        DNSError
+            If the TCP fallback failed or the resolver was closed.
+        """
+        qtype = _qtype(rtype)
+        wire_name = _encode_name(name)
+        question = (_decode_name(wire_name, 0)[0].lower(), qtype)
+        async with self._limit:
+            transport = await self._ensure_open()
+            qid = self._new_id()
+            packet = build_query(name, qtype, qid)
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[qid] = (question[0], qtype, fut)
+            try:
+                for attempt in range(self.retries + 1):
+                    transport.sendto(packet)
+                    try:
+                        response = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+                        break
+                    except asyncio.TimeoutError:
+                        if attempt == self.retries:
+                            raise TimeoutError(f"No answer from {self.server} for {name} {rtype}") from None
+            finally:
+                self._pending.pop(qid, None)
+        if response.truncated and self.tcp_fallback:
+            response = await self._query_tcp(packet, qid, question)
+        return response
+
+    async def _query_tcp(self, packet: bytes, qid: int, question: Tuple[str, int]) -> DNSResponse:
+        assert self._address is not None
+        try:
+            async with asyncio.timeout(self.timeout):
+                reader, writer = await asyncio.open_connection(self._address[1], self.port)
+                try:
+                    writer.write(struct.pack("!H", len(packet)) + packet)
+                    await writer.drain()
+                    (length,) = struct.unpack("!H", await reader.readexactly(2))
+                    data = await reader.readexactly(length)
+                finally:
+                    writer.close()
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise DNSError(f"TCP fallback to {self.server} failed: {e}") from None
+        response = parse_response(data)
+        if response.id != qid or response.question != question:
+            raise DNSError("TCP answer does not match the query")
+        return response
+
+    async def resolve(self, name: str, rtype: Union[str, int] = "A") -> List[Any]:
+        """
+        Return the values of the ``rtype`` records for ``name``.
+
+        CNAME chains in the answer are followed implicitly; the result is
+        empty for NXDOMAIN and for names without such records.
+
+        Raises
+        ------
+        DNSError
+            If the server answered with another error (SERVFAIL, REFUSED, ...).
+        TimeoutError
+            If no answer arrived after all retries.
+        """
+        qtype = _qtype(rtype)
+        response = await self.query(name, qtype)
+        if response.rcode not in (NOERROR, NXDOMAIN):
+            rcode = RCODES.get(response.rcode, str(response.rcode))
+            raise DNSError(f"{self.server} answered {rcode} for {name}", response.rcode)
+        type_name = _TYPE_NAMES.get(qtype, f"TYPE{qtype}")
+        return [record.value for record in response.answers if record.type == type_name]
+
+    async def reverse(self, ip: str) -> Optional[str]:
+        """
+        Return the PTR name for ``ip``, or None if there is none.
+
+        Raises
+        ------
+        ValueError
+            If ``ip`` is not an IP address.
+        """
+        names = await self.resolve(ipaddress.ip_address(ip).reverse_pointer, "PTR")
+        return names[0] if names else None
+
+    async def query_many(self, queries: Iterable[Tuple[str, Union[str, int]]]) -> List[Union[DNSResponse, Exception]]:
+        """
+        Run many ``(name, rtype)`` queries concurrently.
+
+        Returns
+        -------
+        list
+            One :class:`DNSResponse`, or the exception raised, per query.
+        """
+        return list(await asyncio.gather(*(self.query(name, rtype) for name, rtype in queries), return_exceptions=True))
+
+    async def reverse_many(self, ips: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Reverse-resolve many addresses concurrently.
+
+        Returns
+        -------
+        dict
+            ``{ip: name}``; the name is None for addresses without a PTR
+            record and for lookups that failed or timed out.
+        """
+        unique = list(dict.fromkeys(ips))
+        results = await asyncio.gather(*(self.reverse(ip) for ip in unique), return_exceptions=True)
+        return {ip: None if isinstance(name, BaseException) else name for ip, name in zip(unique, results)}
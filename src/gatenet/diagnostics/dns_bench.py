@@ -0,0 +1,238 @@
+"""
+dns_bench.py
+
+Concurrent benchmarking of DNS resolvers.
+
+:func:`benchmark_resolvers` sends the same query mix to several resolvers at
+once, each through its own pipelined
+:class:`~gatenet.diagnostics.dns.DNSResolver`, and reports per resolver the
+throughput, latency percentiles, timeouts and errors. Every query is sent
+once "cold" (the resolver likely has to recurse) and then ``rounds`` more
+times "warm" (normally answered from its cache); comparing the two latency
+distributions shows how much each resolver's cache helps.
+
+Example:
+    import asyncio
+    from gatenet.diagnostics.dns_bench import benchmark_resolvers
+
+    results = asyncio.run(benchmark_resolvers(["1.1.1.1", "8.8.8.8", "9.9.9.9"]))
+    fastest = results[0]["server"]
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from gatenet.diagnostics.dns import NOERROR, NXDOMAIN, DNSError, DNSResolver, _qtype
+from gatenet.diagnostics.latency import LatencyHistogram
+
+# Popular names, so "cold" mostly measures the resolver rather than slow authorities
+DEFAULT_NAMES = (
+    "google.com",
+    "cloudflare.com",
+    "github.com",
+    "wikipedia.org",
+    "amazon.com",
+    "microsoft.com",
+    "apple.com",
+    "python.org",
+)
+DEFAULT_TYPES = ("A", "AAAA")
+
+
+def parse_server(spec: str, default_port: int = 53) -> Tuple[str, int]:
+    """
+    Split a resolver spec into ``(address, port)``.
+
+    Accepts ``host``, ``host:port``, a bare IPv6 address and ``[v6]:port``.
+
+    Example
+    -------
+    >>> parse_server("1.1.1.1:5353")
+    ('1.1.1.1', 5353)
+    >>> parse_server("2606:4700:4700::1111")
+    ('2606:4700:4700::1111', 53)
+    """
+    if spec.startswith("["):
+        host, _, rest = spec[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else default_port
+    if spec.count(":") == 1:
+        host, port = spec.split(":")
+        return host, int(port)
+    return spec, default_port
+
+
+class _Phase:
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.answered = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p90, p99 = self.histogram.quantiles((0.5, 0.9, 0.99))
+        return {
+            "sent": self.sent,
+            "answered": self.answered,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "mean": self.total_ms / self.answered if self.answered else None,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "min": self.histogram.min if self.answered else None,
+            "max": self.histogram.max if self.answered else None,
+        }
+
+
+def _check_types(queries: Sequence[Tuple[str, Union[str, int]]]) -> None:
+    # Fail before any query is sent rather than inside the gathered phase
+    for rtype in {rtype for _name, rtype in queries}:
+        _qtype(rtype)
+
+
+async def _run_phase(resolver: DNSResolver, queries: Sequence[Tuple[str, Union[str, int]]], limit: asyncio.Semaphore, phase: _Phase) -> None:
+    async def one(name: str, rtype: Union[str, int]) -> None:
+        async with limit:
+            phase.sent += 1
+            start = time.perf_counter()
+            try:
+                response = await resolver.query(name, rtype)
+            except TimeoutError:
+                phase.timeouts += 1
+                return
+            except (DNSError, OSError, ValueError):
+                # ValueError: a name that cannot be encoded; it must not sink the phase
+                phase.errors += 1
+                return
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.rcode in (NOERROR, NXDOMAIN):
+            phase.answered += 1
+            phase.total_ms += elapsed
+            phase.histogram.record(elapsed)
+        else:
+            phase.errors += 1
+
+    await asyncio.gather(*(one(name, rtype) for name, rtype in queries))
+
+
+async def benchmark_resolver(
+    server: str,
+    queries: Sequence[Tuple[str, Union[str, int]]],
+    rounds: int = 3,
+    concurrency: int = 32,
+    timeout: float = 2.0,
+    port: int = 53,
+) -> Dict[str, Any]:
+    """
+    Benchmark one resolver with a query mix.
+
+    Parameters
+    ----------
+    server : str
+        Resolver address, optionally with ``:port``.
+    queries : sequence of (name, type)
+        Query mix, sent once cold and then ``rounds`` times warm.
+    rounds : int, optional
+        Warm passes over the mix (default: 3).
+    concurrency : int, optional
+        Maximum queries in flight (default: 32).
+    timeout : float, optional
+        Seconds before a query counts as timed out; there are no retries
+        (default: 2.0).
+    port : int, optional
+        Port used when ``server`` has none (default: 53).
+
+    Returns
+    -------
+    dict
+        ``server``, ``sent``, ``answered``, ``timeouts``, ``errors``,
+        ``qps`` (answers per second of wall time), ``cold`` and ``warm``
+        phase summaries (counts plus ``mean``, ``p50``, ``p90``, ``p99``,
+        ``min`` and ``max`` latency in ms) and ``cache_speedup`` (cold p50
+        over warm p50).
+
+    Raises
+    ------
+    ValueError
+        If a query type is not supported, before any query is sent.
+    """
+    _check_types(queries)
+    address, port = parse_server(server, port)
+    limit = asyncio.Semaphore(concurrency)
+    cold, warm = _Phase(), _Phase()
+    start = time.perf_counter()
+    async with DNSResolver(address, port=port, timeout=timeout, retries=0, max_inflight=max(concurrency, 1), tcp_fallback=False) as resolver:
+        await _run_phase(resolver, queries, limit, cold)
+        if rounds > 0:
+            await _run_phase(resolver, list(queries) * rounds, limit, warm)
+    elapsed = time.perf_counter() - start
+    cold_summary, warm_summary = cold.summary(), warm.summary()
+    answered = cold.answered + warm.answered
+    speedup: Optional[float] = None
+    if cold_summary["p50"] and warm_summary["p50"]:
+        speedup = cold_summary["p50"] / warm_summary["p50"]
+    return {
+        "server": server,
+        "sent": cold.sent + warm.sent,
+        "answered": answered,
+        "timeouts": cold.timeouts + warm.timeouts,
+        "errors": cold.errors + warm.errors,
+        "qps": answered / elapsed if elapsed > 0 else 0.0,
+        "cold": cold_summary,
+        "warm": warm_summary,
+        "cache_speedup": speedup,
+    }
+
+
+async def benchmark_resolvers(
+    servers: Iterable[str],
+    names: Iterable[str] = DEFAULT_NAMES,
+    types: Iterable[Union[str, int]] = DEFAULT_TYPES,
+    rounds: int = 3,
+    concurrency: int = 32,
+    timeout: float = 2.0,
+    port: int = 53,
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark several resolvers concurrently with the same query mix.
+
+    Parameters
+    ----------
+    servers : iterable of str
+        Resolver addresses, optionally with ``:port``.
+    names : iterable of str, optional
+        Names to query (default: :data:`DEFAULT_NAMES`).
+    types : iterable of str or int, optional
+        Record types (names or numeric codes) queried for every name
+        (default: A and AAAA).
+    rounds, concurrency, timeout, port
+        As for :func:`benchmark_resolver`; ``concurrency`` is per resolver.
+
+    Returns
+    -------
+    list of dict
+        One :func:`benchmark_resolver` result per server, fastest (lowest
+        warm median, then cold median) first; resolvers that never answered
+        come last.
+
+    Raises
+    ------
+    ValueError
+        If a record type is not supported, before any query is sent.
+    """
+    queries = [(name, rtype) for name in names for rtype in types]
+    _check_types(queries)
+    results = await asyncio.gather(
+        *(benchmark_resolver(server, queries, rounds, concurrency, timeout, port) for server in dict.fromkeys(servers))
+    )
+
+    def rank(result: Dict[str, Any]) -> Tuple[float, float]:
+        warm_p50 = result["warm"]["p50"]
+        cold_p50 = result["cold"]["p50"]
+        inf = float("inf")
+        return (inf if warm_p50 is None else warm_p50, inf if cold_p50 is None else cold_p50)
+
+    return sorted(results, key=rank)
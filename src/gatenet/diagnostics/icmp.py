@@ -0,0 +1,412 @@
+"""
+icmp.py
+
+In-process ICMP echo engine.
+
+:class:`ICMPEngine` sends echo requests and matches replies on a single
+socket, without spawning ``ping``. It prefers unprivileged ping sockets
+(``SOCK_DGRAM``/``IPPROTO_ICMP``, enabled on Linux through
+``net.ipv4.ping_group_range`` and on macOS by default) and falls back to raw
+sockets, which need root or ``CAP_NET_RAW``. Replies are demultiplexed by
+ICMP identifier, sequence number and source address, so one engine can
+have probes to many hosts in flight at once. Where the kernel supports
+``SO_TIMESTAMPNS`` replies are timestamped on arrival, keeping RTTs accurate
+to microseconds even when the caller is slow to read them.
+
+Example:
+    from gatenet.diagnostics.icmp import ICMPEngine
+    with ICMPEngine() as engine:
+        rtts = engine.ping("8.8.8.8", count=3, timeout=1.0, interval=0.2)
+        # -> [12.41, 12.38, None]  (ms, None = lost)
+"""
+
+import asyncio
+import functools
+import ipaddress
+import itertools
+import os
+import select
+import socket
+import struct
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACHABLE = 3
+ICMP_ECHO_REQUEST = 8
+ICMP_TIME_EXCEEDED = 11
+ICMPV6_ECHO_REQUEST = 128
+ICMPV6_ECHO_REPLY = 129
+
+_HEADER = struct.Struct("!BBHHH")
+# Raw sockets see every reply, so each engine needs its own identifier
+_RAW_IDENTS = itertools.count(os.getpid())
+_TIMESPEC = struct.Struct("@ll")
+# Not exported by the socket module; 35 is SO_TIMESTAMPNS on mainstream Linux ABIs
+_SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+
+
+def _checksum(data: bytes) -> int:
+    """RFC 1071 internet checksum."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+@functools.lru_cache(maxsize=4096)
+def _host_key(address: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    """Comparable form of an IP literal: scope id dropped, notation normalised."""
+    try:
+        return ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return None
+
+
+class ICMPQuote(NamedTuple):
+    """
+    An IPv4 ICMP message relevant to probing, as read from a raw socket.
+
+    For Time Exceeded and Destination Unreachable messages, ``protocol``,
+    ``destination`` and ``header`` describe the probe quoted by the router:
+    its IP protocol, its destination address and the first 8 bytes of its
+    transport header (the whole UDP header, or the ICMP echo header). For
+    an echo reply, ``destination`` is the host that replied and ``header``
+    is the reply's own echo header.
+    """
+
+    type: int
+    code: int
+    protocol: int
+    destination: str
+    header: bytes
+
+
+def parse_icmp_quote(data: bytes) -> Optional[ICMPQuote]:
+    """
+    Parse a packet from a raw IPv4 ICMP socket (IP header included).
+
+    Returns None for anything but a well-formed echo reply, Time Exceeded or
+    Destination Unreachable message.
+
+    Example
+    -------
+    >>> import socket, struct
+    >>> probe = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 28, 0, 0, 1, 17, 0,
+    ...                     socket.inet_aton("10.0.0.2"), socket.inet_aton("192.0.2.7"))
+    >>> probe += struct.pack("!HHHH", 40000, 33434, 8, 0)
+    >>> outer = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 56, 0, 0, 64, 1, 0,
+    ...                     socket.inet_aton("10.0.0.1"), socket.inet_aton("10.0.0.2"))
+    >>> quote = parse_icmp_quote(outer + struct.pack("!BBHI", ICMP_TIME_EXCEEDED, 0, 0, 0) + probe)
+    >>> quote.destination, struct.unpack("!HH", quote.header[:4])
+    ('192.0.2.7', (40000, 33434))
+    """
+    if len(data) < 20 or data[0] >> 4 != 4:
+        return None
+    icmp = data[(data[0] & 0x0F) * 4:]
+    if len(icmp) < 8:
+        return None
+    kind, code = icmp[0], icmp[1]
+    if kind == ICMP_ECHO_REPLY:
+        return ICMPQuote(kind, code, socket.IPPROTO_ICMP, socket.inet_ntoa(data[12:16]), icmp[:8])
+    if kind not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACHABLE):
+        return None
+    inner = icmp[8:]
+    if len(inner) < 20 or inner[0] >> 4 != 4:
+        return None
+    start = (inner[0] & 0x0F) * 4
+    if len(inner) < start + 8:
+        return None
+    return ICMPQuote(kind, code, inner[9], socket.inet_ntoa(inner[16:20]), inner[start:start + 8])
+
+
+def open_icmp_socket(family: int = socket.AF_INET) -> Tuple[socket.socket, bool]:
+    """
+    Open an ICMP socket, preferring an unprivileged ping socket.
+
+    Parameters
+    ----------
+    family : int, optional
+        ``socket.AF_INET`` or ``socket.AF_INET6`` (default: AF_INET).
+
+    Returns
+    -------
+    tuple
+        ``(sock, raw)`` where ``raw`` is True for a raw socket.
+
+    Raises
+    ------
+    PermissionError
+        If neither a ping socket nor a raw socket may be opened.
+    """
+    proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+    errors = []
+    for kind in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            return socket.socket(family, kind, proto), kind == socket.SOCK_RAW
+        except OSError as e:
+            errors.append(e)
+    raise PermissionError(f"ICMP sockets unavailable: {errors[-1]}")
+
+
+class ICMPEngine:
+    """
+    ICMP echo sender/receiver for one address family.
+
+    Parameters
+    ----------
+    family : int, optional
+        ``socket.AF_INET`` or ``socket.AF_INET6`` (default: AF_INET).
+    payload_size : int, optional
+        Echo payload size in bytes (default: 56, as ping(8)).
+
+    Raises
+    ------
+    PermissionError
+        If the process may not open ICMP sockets.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.icmp import ICMPEngine
+    >>> engine = ICMPEngine()
+    >>> asyncio.run(engine.probe("127.0.0.1", timeout=1.0))
+    0.041
+    >>> engine.close()
+    """
+
+    def __init__(self, family: int = socket.AF_INET, payload_size: int = 56) -> None:
+        self.family = family
+        self.sock, self.raw = open_icmp_socket(family)
+        self.sock.setblocking(False)
+        if family == socket.AF_INET:
+            self._request_type, self._reply_type = ICMP_ECHO_REQUEST, ICMP_ECHO_REPLY
+        else:
+            self._request_type, self._reply_type = ICMPV6_ECHO_REQUEST, ICMPV6_ECHO_REPLY
+        if self.raw:
+            self.ident = next(_RAW_IDENTS) & 0xFFFF
+        else:
+            # Linux rewrites the identifier of ping sockets to their local "port"
+            self.sock.bind(("0.0.0.0", 0) if family == socket.AF_INET else ("::", 0))
+            self.ident = self.sock.getsockname()[1] or (next(_RAW_IDENTS) & 0xFFFF)
+        self._kernel_stamps = False
+        if _SO_TIMESTAMPNS is not None:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                self._kernel_stamps = True
+            except OSError:
+                pass
+        self._payload = bytes(i & 0xFF for i in range(payload_size))
+        self._seq = 0
+        # seq -> (address, send timestamp ns, future or None)
+        self._pending: Dict[int, Tuple[str, int, Optional[asyncio.Future]]] = {}
+        self._reading: Optional[asyncio.AbstractEventLoop] = None
+
+    def __enter__(self) -> "ICMPEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the socket and abandon outstanding probes."""
+        if self._reading is not None:
+            self._reading.remove_reader(self.sock.fileno())
+            self._reading = None
+        for _addr, _sent, fut in self._pending.values():
+            if fut is not None and not fut.done():
+                fut.set_result(None)
+        self._pending.clear()
+        self.sock.close()
+
+    def _now(self) -> int:
+        return time.time_ns() if self._kernel_stamps else time.perf_counter_ns()
+
+    def _next_seq(self) -> int:
+        for _ in range(0x10000):
+            self._seq = (self._seq + 1) & 0xFFFF
+            if self._seq not in self._pending:
+                return self._seq
+        raise RuntimeError("too many ICMP probes in flight")
+
+    def _packet(self, seq: int) -> bytes:
+        header = _HEADER.pack(self._request_type, 0, 0, self.ident, seq)
+        checksum = _checksum(header + self._payload)
+        return _HEADER.pack(self._request_type, 0, checksum, self.ident, seq) + self._payload
+
+    def send(self, address: str, future: Optional[asyncio.Future] = None) -> int:
+        """
+        Send one echo request to ``address`` (an IP literal).
+
+        Returns
+        -------
+        int
+            Sequence number of the request, used to match its reply.
+        """
+        seq = self._next_seq()
+        packet = self._packet(seq)
+        self._pending[seq] = (address, self._now(), future)
+        try:
+            self.sock.sendto(packet, (address, 0))
+        except OSError:
+            del self._pending[seq]
+            raise
+        return seq
+
+    def cancel(self, seq: int) -> None:
+        """Forget an outstanding request; a late reply to it is ignored."""
+        self._pending.pop(seq, None)
+
+    def _parse(self, data: bytes) -> Optional[int]:
+        if self.family == socket.AF_INET and data and data[0] >> 4 == 4:
+            # Raw sockets (and ping sockets on macOS) include the IP header
+            data = data[(data[0] & 0x0F) * 4:]
+        if len(data) < _HEADER.size:
+            return None
+        kind, _code, _checksum, ident, seq = _HEADER.unpack_from(data)
+        if kind != self._reply_type or ident != self.ident:
+            return None
+        return seq
+
+    def _read_one(self) -> Optional[Tuple[bytes, str, int]]:
+        try:
+            if self._kernel_stamps:
+                data, ancdata, _flags, source = self.sock.recvmsg(2048, socket.CMSG_SPACE(_TIMESPEC.size))
+                stamp = None
+                for level, kind, value in ancdata:
+                    if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(value) >= _TIMESPEC.size:
+                        sec, nsec = _TIMESPEC.unpack_from(value)
+                        stamp = sec * 1_000_000_000 + nsec
+                return data, source[0], stamp if stamp is not None else time.time_ns()
+            data, source = self.sock.recvfrom(2048)
+            return data, source[0], time.perf_counter_ns()
+        except (BlockingIOError, InterruptedError):
+            return None
+
+    def drain(self) -> List[Tuple[int, str, float]]:
+        """
+        Read every queued reply without blocking.
+
+        Returns
+        -------
+        list of (seq, address, rtt_ms)
+            Replies matched to outstanding requests; matched requests are
+            removed, and their futures (if any) resolved with the RTT.
+        """
+        matched = []
+        while True:
+            item = self._read_one()
+            if item is None:
+                return matched
+            data, source, received = item
+            seq = self._parse(data)
+            entry = self._pending.get(seq) if seq is not None else None
+            # The target may carry a scope ("fe80::1%eth0") that the reply source lacks
+            if entry is None or _host_key(entry[0]) != _host_key(source):
+                continue
+            del self._pending[seq]
+            address, sent, fut = entry
+            rtt = max(received - sent, 0) / 1e6
+            if fut is not None and not fut.done():
+                fut.set_result(rtt)
+            matched.append((seq, address, rtt))
+
+    def ping(self, address: str, count: int = 4, timeout: float = 2.0, interval: float = 1.0) -> List[Optional[float]]:
+        """
+        Ping ``address`` synchronously.
+
+        Parameters
+        ----------
+        address : str
+            Destination IP address.
+        count : int, optional
+            Number of echo requests (default: 4).
+        timeout : float, optional
+            Seconds to wait for each reply (default: 2.0).
+        interval : float, optional
+            Seconds between requests (default: 1.0).
+
+        Returns
+        -------
+        list of float or None
+            RTT in milliseconds per request, None for lost ones.
+        """
+        rtts: List[Optional[float]] = [None] * count
+        order: Dict[int, int] = {}
+        deadlines: Dict[int, float] = {}
+        next_send = time.monotonic()
+        sent = 0
+        while sent < count or deadlines:
+            now = time.monotonic()
+            if sent < count and now >= next_send:
+                try:
+                    seq = self.send(address)
+                    order[seq] = sent
+                    deadlines[seq] = now + timeout
+                except OSError:
+                    pass
+                sent += 1
+                next_send = now + interval
+            for seq in [s for s, d in deadlines.items() if d <= now]:
+                del deadlines[seq]
+                self.cancel(seq)
+            if not deadlines and sent >= count:
+                break
+            wake = min(deadlines.values(), default=next_send)
+            if sent < count:
+                wake = min(wake, next_send)
+            select.select([self.sock], [], [], max(0.0, wake - time.monotonic()))
+            for seq, _address, rtt in self.drain():
+                if seq in deadlines:
+                    del deadlines[seq]
+                    rtts[order[seq]] = rtt
+        return rtts
+
+    def _on_readable(self) -> None:
+        self.drain()
+        if not self._pending and self._reading is not None:
+            self._reading.remove_reader(self.sock.fileno())
+            self._reading = None
+
+    async def probe(self, address: str, timeout: float = 2.0) -> Optional[float]:
+        """
+        Send one echo request and await its reply.
+
+        Any number of probes, to any hosts, may be awaited concurrently on
+        the same engine.
+
+        Returns
+        -------
+        float or None
+            RTT in milliseconds, or None on timeout or send error.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        try:
+            seq = self.send(address, fut)
+        except OSError:
+            return None
+        if self._reading is None:
+            loop.add_reader(self.sock.fileno(), self._on_readable)
+            self._reading = loop
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.cancel(seq)
+            if not self._pending and self._reading is not None:
+                self._reading.remove_reader(self.sock.fileno())
+                self._reading = None
+
+    async def async_ping(self, address: str, count: int = 4, timeout: float = 2.0, interval: float = 1.0) -> List[Optional[float]]:
+        """Asynchronous counterpart of :meth:`ping`; requests overlap like ping(8)."""
+        tasks = []
+        for i in range(count):
+            if i:
+                await asyncio.sleep(interval)
+            tasks.append(asyncio.ensure_future(self.probe(address, timeout)))
+        return list(await asyncio.gather(*tasks))
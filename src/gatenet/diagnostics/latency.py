@@ -0,0 +1,326 @@
+"""
+latency.py
+
+Continuous latency monitoring with constant-memory streaming statistics.
+
+:class:`LatencyMonitor` pings a set of targets on a schedule (through
+:func:`gatenet.diagnostics.ping.ping_many`) and keeps, per host, a
+log-bucketed histogram for percentiles (in the spirit of HDR histograms:
+fixed relative error, bounded bucket count), an EWMA of the RTT, RFC 3550
+interarrival jitter, and packet loss over a sliding window. Snapshots are
+plain dicts computed from that state, so the dashboard and hook listeners
+can read them at any time without sending probes.
+
+Example:
+    import asyncio
+    from gatenet.diagnostics.latency import LatencyMonitor
+
+    monitor = LatencyMonitor(["1.1.1.1", "8.8.8.8"], interval=5.0)
+    asyncio.run(monitor.run(cycles=12))
+    monitor.snapshot("1.1.1.1")["p99"]
+"""
+
+import asyncio
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from gatenet.core import hooks, events
+
+
+class LatencyHistogram:
+    """
+    Streaming histogram with fixed relative precision.
+
+    Values land in logarithmic buckets whose width is ``precision`` times
+    their lower bound, so any quantile is reported within that relative
+    error while memory stays bounded by the value range, not the sample
+    count (about 1,400 buckets at most for 1 µs to 60 s at 1%).
+
+    Parameters
+    ----------
+    precision : float, optional
+        Relative bucket width (default: 0.01, i.e. 1%).
+    min_value : float, optional
+        Smallest distinguishable value; smaller ones share the first bucket
+        (default: 0.001, i.e. 1 µs when recording milliseconds).
+
+    Example
+    -------
+    >>> h = LatencyHistogram()
+    >>> for v in range(1, 101):
+    ...     h.record(float(v))
+    >>> round(h.quantile(0.5))
+    50
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 0.001) -> None:
+        if precision <= 0 or min_value <= 0:
+            raise ValueError("precision and min_value must be positive")
+        self.precision = precision
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float) -> None:
+        """Add one sample."""
+        index = int(math.log(max(value, self.min_value) / self.min_value) / self._log_base)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the ``q``-quantile (0 <= q <= 1), or None if empty.
+
+        The result is the midpoint of the bucket holding the quantile,
+        clamped to the observed min/max.
+        """
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Return several quantiles in one pass over the buckets."""
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        out: List[Optional[float]] = [self.max] * len(qs)
+        seen = 0
+        pending = iter(order)
+        current = next(pending, None)
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            low = self.min_value * math.exp(index * self._log_base)
+            value = min(max(low * (1 + self.precision / 2), self.min), self.max)
+            while current is not None and seen > qs[current] * (self.count - 1):
+                out[current] = value
+                current = next(pending, None)
+            if current is None:
+                break
+        return out
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class HostLatency:
+    """
+    Streaming latency statistics for one host.
+
+    Parameters
+    ----------
+    window : int, optional
+        Number of recent probes used for windowed loss (default: 100).
+    alpha : float, optional
+        EWMA gain for the smoothed RTT (default: 0.125).
+    precision : float, optional
+        Relative precision of the percentile histogram (default: 0.01).
+    """
+
+    def __init__(self, window: int = 100, alpha: float = 0.125, precision: float = 0.01) -> None:
+        self.alpha = alpha
+        self.histogram = LatencyHistogram(precision)
+        self.sent = 0
+        self.received = 0
+        self.ewma: Optional[float] = None
+        self.jitter = 0.0
+        self.last_rtt: Optional[float] = None
+        self.last_seen: Optional[float] = None
+        self._window: Deque[bool] = deque(maxlen=window)
+
+    def record(self, rtt: Optional[float]) -> None:
+        """Record one probe: its RTT in milliseconds, or None if it was lost."""
+        self.sent += 1
+        self._window.append(rtt is not None)
+        if rtt is None:
+            return
+        self.received += 1
+        self.last_seen = time.time()
+        self.histogram.record(rtt)
+        if self.ewma is None:
+            self.ewma = rtt
+        else:
+            self.ewma += self.alpha * (rtt - self.ewma)
+        if self.last_rtt is not None:
+            # RFC 3550 interarrival jitter estimator
+            self.jitter += (abs(rtt - self.last_rtt) - self.jitter) / 16
+        self.last_rtt = rtt
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current statistics.
+
+        Returns
+        -------
+        dict
+            ``sent``, ``received``, ``loss`` (%, all time), ``window_loss``
+            (%, last ``window`` probes), ``rtt_min``, ``rtt_max``, ``rtt_ewma``,
+            ``last_rtt``, ``p50``, ``p95``, ``p99``, ``jitter`` (ms) and
+            ``last_seen`` (epoch seconds).
+        """
+        p50, p95, p99 = self.histogram.quantiles((0.5, 0.95, 0.99))
+        window = len(self._window)
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "loss": 100.0 * (1 - self.received / self.sent) if self.sent else 0.0,
+            "window_loss": 100.0 * self._window.count(False) / window if window else 0.0,
+            "rtt_min": self.histogram.min if self.received else None,
+            "rtt_max": self.histogram.max if self.received else None,
+            "rtt_ewma": self.ewma,
+            "last_rtt": self.last_rtt,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "jitter": self.jitter,
+            "last_seen": self.last_seen,
+        }
+
+
+class _TargetMonitor(ABC):
+    """
+    Target set and fixed-cadence cycle loop shared by the monitors.
+
+    Subclasses create the per-host state in :meth:`_new_state` (an object
+    with a ``snapshot()`` method) and run one cycle in :meth:`probe_once`.
+    The state map is guarded by ``_lock`` so snapshots can be read from
+    other threads while :meth:`run` is active.
+    """
+
+    def __init__(self, targets: Iterable[str], interval: float) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._states: Dict[str, Any] = {}
+        self._running = False
+        for host in targets:
+            self.add(host)
+
+    @abstractmethod
+    def _new_state(self) -> Any:
+        """Return a fresh per-host state object."""
+
+    @property
+    def targets(self) -> List[str]:
+        with self._lock:
+            return list(self._states)
+
+    def add(self, host: str) -> None:
+        """Start monitoring ``host`` (no-op if already monitored)."""
+        with self._lock:
+            if host not in self._states:
+                self._states[host] = self._new_state()
+
+    def remove(self, host: str) -> None:
+        """Stop monitoring ``host`` and drop its state."""
+        with self._lock:
+            self._states.pop(host, None)
+
+    def snapshot(self, host: Optional[str] = None) -> Any:
+        """
+        Return the snapshot for ``host``, or ``{host: snapshot}`` for all hosts.
+
+        Returns None for a host that is not monitored.
+        """
+        with self._lock:
+            if host is not None:
+                state = self._states.get(host)
+                return state.snapshot() if state is not None else None
+            return {name: state.snapshot() for name, state in self._states.items()}
+
+    @abstractmethod
+    async def probe_once(self) -> None:
+        """Probe every target once and record the results."""
+
+    async def run(self, cycles: Optional[int] = None) -> None:
+        """
+        Run a cycle every ``interval`` seconds until :meth:`stop` is called or
+        ``cycles`` cycles have run.
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        start = loop.time()
+        cycle = 0
+        try:
+            while self._running and (cycles is None or cycle < cycles):
+                await self.probe_once()
+                cycle += 1
+                if cycles is not None and cycle >= cycles:
+                    break
+                # Keep a fixed cadence regardless of how long the cycle took
+                await asyncio.sleep(max(0.0, start + cycle * self.interval - loop.time()))
+        finally:
+            self._running = False
+
+    def stop(self) -> None:
+        """Ask :meth:`run` to return after the current cycle."""
+        self._running = False
+
+
+class LatencyMonitor(_TargetMonitor):
+    """
+    Probe targets on a schedule and keep streaming latency statistics.
+
+    Each cycle pings every target once with
+    :func:`~gatenet.diagnostics.ping.ping_many`, records the outcome, and
+    emits ``events.LATENCY_SNAPSHOT`` with the latest snapshots. Snapshots
+    are safe to read from other threads while the monitor runs.
+
+    Parameters
+    ----------
+    targets : iterable of str
+        Hosts to monitor.
+    interval : float, optional
+        Seconds between probe cycles (default: 1.0).
+    timeout : float, optional
+        Seconds to wait for each reply (default: 1.0).
+    window : int, optional
+        Probes per host used for windowed loss (default: 100).
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.latency import LatencyMonitor
+    >>> monitor = LatencyMonitor(["127.0.0.1"], interval=0.1)
+    >>> asyncio.run(monitor.run(cycles=10))
+    >>> monitor.snapshot("127.0.0.1")["sent"]
+    10
+    """
+
+    def __init__(self, targets: Iterable[str], interval: float = 1.0, timeout: float = 1.0, window: int = 100) -> None:
+        self.timeout = timeout
+        self.window = window
+        super().__init__(targets, interval)
+
+    def _new_state(self) -> HostLatency:
+        return HostLatency(self.window)
+
+    def record(self, host: str, rtt: Optional[float]) -> None:
+        """Record an externally measured probe for a monitored host."""
+        with self._lock:
+            stats = self._states.get(host)
+            if stats is not None:
+                stats.record(rtt)
+
+    async def probe_once(self) -> None:
+        """Run one probe cycle over all targets."""
+        from gatenet.diagnostics.ping import ping_many
+
+        targets = self.targets
+        if not targets:
+            return
+        async for result in ping_many(targets, count=1, interval=self.interval, timeout=self.timeout):
+            rtts = result.get("rtts") or []
+            self.record(result["host"], rtts[0] if rtts else None)
+        try:
+            hooks.emit(events.LATENCY_SNAPSHOT, snapshots=self.snapshot())
+        except Exception:
+            pass
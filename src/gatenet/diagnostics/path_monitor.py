@@ -0,0 +1,298 @@
+"""
+path_monitor.py
+
+Continuous traceroute monitoring with path-change detection.
+
+:class:`PathMonitor` re-traces a set of destinations on a schedule and
+keeps, per destination, the current hop list, a smoothed RTT per hop and a
+run-length encoded history of the distinct paths seen. After the first
+full trace each cycle is incremental: one Paris probe per hop, only up to
+one hop past the known destination, all sent at once through
+:class:`~gatenet.diagnostics.traceroute.TraceProber`; the rest of the TTL
+range is probed only if the destination has moved further away. Hop names
+are looked up only for responders that are new to the path, and a hop that
+merely lost its probe keeps its previous responder. When the path changes,
+``events.PATH_CHANGE`` is emitted.
+
+Example:
+    import asyncio
+    from gatenet.core import hooks, events
+    from gatenet.diagnostics.path_monitor import PathMonitor
+
+    hooks.on(events.PATH_CHANGE, lambda host, changed, **kw: print(host, changed))
+    monitor = PathMonitor(["1.1.1.1", "8.8.8.8"], interval=300.0)
+    asyncio.run(monitor.run())
+"""
+
+import asyncio
+import socket
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from gatenet.core import hooks, events
+from gatenet.diagnostics.latency import _TargetMonitor
+from gatenet.diagnostics.rdns import reverse_resolver
+from gatenet.diagnostics.resolver import resolver_cache
+from gatenet.diagnostics.traceroute import TraceProber, _probe_ttls
+
+
+class PathState:
+    """
+    Monitoring state for one destination.
+
+    Parameters
+    ----------
+    history : int, optional
+        Distinct consecutive paths remembered (default: 32).
+    alpha : float, optional
+        EWMA gain for per-hop RTTs (default: 0.25).
+    """
+
+    def __init__(self, history: int = 32, alpha: float = 0.25) -> None:
+        self.alpha = alpha
+        self.ip: Optional[str] = None
+        # Responder per TTL (index 0 is hop 1), None if never answered
+        self.hops: List[Optional[str]] = []
+        self.rtts: List[Optional[float]] = []
+        self.names: Dict[str, str] = {}
+        self.reached = False
+        self.cycles = 0
+        self.probes_sent = 0
+        self.changes = 0
+        self.last_probe: Optional[float] = None
+        self.last_change: Optional[float] = None
+        # (first seen, last seen, path) per run of identical paths
+        self.history: Deque[Tuple[float, float, Tuple[Optional[str], ...]]] = deque(maxlen=history)
+
+    def update(self, replies: Dict[int, Tuple[str, float]], length: int, reached: bool, now: float) -> Optional[Dict[str, Any]]:
+        """
+        Merge one cycle's replies (``{ttl: (address, rtt_ms)}``) into the path.
+
+        Returns
+        -------
+        dict or None
+            ``previous`` and ``path`` (tuples of responders) and ``changed``
+            (hop numbers) if the path changed, else None.
+        """
+        previous = tuple(self.hops)
+        hops: List[Optional[str]] = []
+        rtts: List[Optional[float]] = []
+        for ttl in range(1, length + 1):
+            old = self.hops[ttl - 1] if ttl <= len(self.hops) else None
+            old_rtt = self.rtts[ttl - 1] if ttl <= len(self.rtts) else None
+            if ttl not in replies:
+                # A lost probe is not a new path
+                hops.append(old)
+                rtts.append(old_rtt)
+                continue
+            address, rtt = replies[ttl]
+            hops.append(address)
+            if address != old or old_rtt is None:
+                rtts.append(rtt)
+            else:
+                rtts.append(old_rtt + self.alpha * (rtt - old_rtt))
+        self.hops, self.rtts, self.reached = hops, rtts, reached
+        self.cycles += 1
+        self.last_probe = now
+        path = tuple(hops)
+        width = max(len(previous), len(path))
+        changed = [
+            ttl for ttl in range(1, width + 1)
+            if (previous[ttl - 1] if ttl <= len(previous) else None) != (path[ttl - 1] if ttl <= len(path) else None)
+        ]
+        # A hop answering for the first time fills in the path rather than changing it
+        if len(path) == len(previous) and all(previous[ttl - 1] is None for ttl in changed):
+            changed = []
+        if self.history and not changed:
+            first, _last, _path = self.history[-1]
+            self.history[-1] = (first, now, path)
+            return None
+        self.history.append((now, now, path))
+        if not previous:
+            return None
+        self.changes += 1
+        self.last_change = now
+        return {"previous": previous, "path": path, "changed": changed}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current path and statistics.
+
+        Returns
+        -------
+        dict
+            ``ip``, ``reached``, ``hops`` (dicts of ``hop``, ``ip`` (``"*"``
+            if never answered), ``hostname`` and ``rtt_ms``), ``cycles``,
+            ``probes_sent``, ``changes``, ``last_probe``, ``last_change``
+            (epoch seconds) and ``history`` (oldest first, dicts of
+            ``since``, ``until`` and ``path``).
+        """
+        return {
+            "ip": self.ip,
+            "reached": self.reached,
+            "hops": [
+                {"hop": ttl, "ip": address or "*", "hostname": self.names.get(address or "", ""), "rtt_ms": rtt}
+                for ttl, (address, rtt) in enumerate(zip(self.hops, self.rtts), 1)
+            ],
+            "cycles": self.cycles,
+            "probes_sent": self.probes_sent,
+            "changes": self.changes,
+            "last_probe": self.last_probe,
+            "last_change": self.last_change,
+            "history": [
+                {"since": first, "until": last, "path": [address or "*" for address in path]}
+                for first, last, path in self.history
+            ],
+        }
+
+
+class PathMonitor(_TargetMonitor):
+    """
+    Re-trace destinations on a schedule and report path changes.
+
+    Every probe of a destination travels on the same Paris flow, from one
+    reserved source port for the monitor's lifetime, so per-flow load
+    balancing does not register as a path change. Traces run on worker
+    threads, ``concurrency`` destinations at a time. After each cycle
+    ``events.PATH_CHANGE`` is emitted once per destination whose path
+    changed.
+
+    Parameters
+    ----------
+    targets : iterable of str
+        Hosts to monitor.
+    interval : float, optional
+        Seconds between cycles (default: 300).
+    timeout : float, optional
+        Seconds to wait for replies after each burst (default: 2.0).
+    max_hops : int, optional
+        Highest TTL probed (default: 30).
+    protocol : str, optional
+        ``"udp"`` or ``"icmp"`` probes (default: ``"udp"``).
+    concurrency : int, optional
+        Destinations traced at once (default: 16).
+    history : int, optional
+        Distinct consecutive paths remembered per destination (default: 32).
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.path_monitor import PathMonitor
+    >>> monitor = PathMonitor(["127.0.0.1"], interval=0.1, timeout=0.5)
+    >>> asyncio.run(monitor.run(cycles=3))
+    >>> monitor.snapshot("127.0.0.1")["probes_sent"]  # 30 hops, then 2 per cycle
+    34
+    >>> monitor.close()
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[str],
+        interval: float = 300.0,
+        timeout: float = 2.0,
+        max_hops: int = 30,
+        protocol: str = "udp",
+        concurrency: int = 16,
+        history: int = 32,
+    ) -> None:
+        assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
+        self.timeout = timeout
+        self.max_hops = max_hops
+        self.protocol = protocol
+        self.concurrency = concurrency
+        self.history = history
+        self._port_sock: Optional[socket.socket] = None
+        self.source_port = 0
+        super().__init__(targets, interval)
+
+    def _new_state(self) -> PathState:
+        return PathState(self.history)
+
+    def _reserve_port(self) -> int:
+        # Holding the port keeps it ours; probers share it through SO_REUSEADDR
+        with self._lock:
+            if self._port_sock is None and self.protocol == "udp":
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(("0.0.0.0", 0))
+                self._port_sock = sock
+                self.source_port = sock.getsockname()[1]
+            return self.source_port
+
+    def _trace(self, dest_addr: str, known: int) -> Tuple[Dict[int, Tuple[str, float]], int, bool, int]:
+        replies: Dict[int, Tuple[str, float]] = {}
+        last_hop: Optional[int] = None
+        sent = 0
+        # Probe just past the known destination first; fall back to the full range
+        limit = min(known + 1, self.max_hops) if known else self.max_hops
+        passes = [(1, limit)] + ([(limit + 1, self.max_hops)] if limit < self.max_hops else [])
+        with TraceProber(dest_addr, self.protocol, paris=True, source_port=self._reserve_port()) as prober:
+            for first, last in passes:
+                sent += last - first + 1
+                for reply in _probe_ttls(prober, last, 1, self.timeout, first_ttl=first):
+                    replies[reply.ttl] = (reply.address, reply.rtt_ms)
+                    if reply.final:
+                        last_hop = reply.ttl if last_hop is None else min(last_hop, reply.ttl)
+                if last_hop is not None:
+                    break
+        length = last_hop if last_hop is not None else max(known, max(replies, default=0))
+        return {ttl: hop for ttl, hop in replies.items() if ttl <= length}, length, last_hop is not None, sent
+
+    def _probe_host(self, host: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._states.get(host)
+            known = len(state.hops) if state is not None and state.reached else 0
+        if state is None:
+            return None
+        try:
+            _family, dest_addr = resolver_cache.resolve(host, socket.AF_INET)
+        except socket.gaierror:
+            return None
+        replies, length, reached, sent = self._trace(dest_addr, known)
+        with self._lock:
+            state.ip = dest_addr
+            state.probes_sent += sent
+            change = state.update(replies, length, reached, time.time())
+            fresh = {address for address in state.hops if address and address not in state.names}
+        # Only responders new to this path cost a PTR lookup
+        names = reverse_resolver.resolve_many(fresh) if fresh else {}
+        with self._lock:
+            for address, name in names.items():
+                state.names[address] = name or ""
+            if change is None:
+                return None
+            return {"host": host, "ip": dest_addr, "snapshot": state.snapshot(), **change}
+
+    async def probe_once(self) -> None:
+        """Run one cycle over all targets."""
+        targets = self.targets
+        if not targets:
+            return
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def one(host: str) -> Optional[Dict[str, Any]]:
+            async with limit:
+                return await asyncio.to_thread(self._probe_host, host)
+
+        for change in await asyncio.gather(*(one(host) for host in targets)):
+            if change is None:
+                continue
+            try:
+                hooks.emit(
+                    events.PATH_CHANGE,
+                    host=change["host"],
+                    previous=[address or "*" for address in change["previous"]],
+                    path=[address or "*" for address in change["path"]],
+                    changed=change["changed"],
+                    snapshot=change["snapshot"],
+                )
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """Release the reserved source port."""
+        with self._lock:
+            if self._port_sock is not None:
+                self._port_sock.close()
+                self._port_sock = None
@@ -3,37 +3,41 @@ import subprocess
 import asyncio
 import re
 import time
-from typing import Dict, Union
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 import ipaddress
-import re
 import statistics
+from gatenet.diagnostics.icmp import ICMPEngine
+from gatenet.diagnostics.resolver import resolver_cache
+from gatenet.diagnostics.rtt import rtt_estimator
 GENERIC_ERROR_MESSAGE = "An internal error occurred."
 
-def _is_valid_host(host: str) -> bool:
-    """Validate that host is a valid IPv4/IPv6 address or DNS hostname, and does not contain shell-special characters."""
-    import socket
+_HOST_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-.")
+_HOSTNAME_RE = re.compile(
+    r"^(?=.{1,253}$)(?!-)[A-Za-z0-9-]{1,63}(?<!-)(\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*\.?$"
+)
+
+def _is_valid_host_format(host: str) -> bool:
+    """Check that host is syntactically an IP address or DNS hostname, without resolving it."""
     if not host:
         return False
     # Disallow hosts that start with a dash (could be interpreted as an option)
     if host.startswith('-'):
         return False
-    allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-.")
-    if any(c not in allowed for c in host):
+    if not _HOST_CHARS.issuperset(host):
         return False
     try:
         ipaddress.ip_address(host)
         return True
     except ValueError:
         pass
-    if len(host) > 253:
-        return False
-    hostname_regex = re.compile(
-        r"^(?=.{1,253}$)(?!-)[A-Za-z0-9-]{1,63}(?<!-)(\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*\.?$"
-    )
-    if not hostname_regex.match(host):
+    return _HOSTNAME_RE.match(host) is not None
+
+def _is_valid_host(host: str) -> bool:
+    """Validate that host is a valid IPv4/IPv6 address or resolvable DNS hostname, and does not contain shell-special characters."""
+    if not _is_valid_host_format(host):
         return False
     try:
-        socket.gethostbyname(host)
+        resolver_cache.resolve(host)
         return True
     except Exception:
         return False
@@ -98,35 +102,23 @@ def _parse_ping_output(output: str) -> Dict[str, Union[bool, int, float, str, li
 
 PING_INVALID_HOST_ERROR = "Invalid host format"
 
-def _tcp_ping_sync(host: str, count: int, timeout: int) -> Dict[str, Union[str, float, int, bool, list]]:
-    import socket
-    if not _is_valid_host(host):
-        return {
-            "host": host,
-            "success": False,
-            "error": PING_INVALID_HOST_ERROR,
-            "raw_output": ""
-        }
-    rtts = []
-    port = 80
-    for _ in range(count):
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(timeout)
-            start = time.time()
-            s.connect((host, port))
-            rtt = (time.time() - start) * 1000
-            rtts.append(rtt)
-            s.close()
-        except Exception:
-            rtts.append(None)
+# Spacing between echo requests of the in-process ICMP engine, as ping(8)
+ICMP_INTERVAL = 1.0
+# Echo requests ping_many keeps in flight per engine, safely inside its 16-bit sequence space
+_MAX_IN_FLIGHT = 60000
+
+def _resolve_icmp(host: str) -> Tuple[int, str]:
+    """Resolve ``host`` to ``(family, address)`` for the ICMP engine, through the shared cache."""
+    return resolver_cache.resolve(host)
+
+def _ping_result(host: str, rtts: List[Optional[float]], error: str) -> Dict[str, Union[str, float, int, bool, list]]:
+    """Build the ping result dict from per-request RTTs (None = lost)."""
     valid_rtts = [r for r in rtts if r is not None]
-    packet_loss = int(100 * (1 - len(valid_rtts) / count))
-    result = {
+    result: Dict[str, Union[str, float, int, bool, list]] = {
         "host": host,
         "success": bool(valid_rtts),
         "rtts": valid_rtts,
-        "packet_loss": packet_loss,
+        "packet_loss": int(100 * (1 - len(valid_rtts) / len(rtts))) if rtts else 100,
         "raw_output": "",
     }
     if valid_rtts:
@@ -135,10 +127,79 @@ def _tcp_ping_sync(host: str, count: int, timeout: int) -> Dict[str, Union[str,
         result["rtt_avg"] = sum(valid_rtts) / len(valid_rtts)
         result["jitter"] = statistics.stdev(valid_rtts) if len(valid_rtts) > 1 else 0.0
     else:
-        result["error"] = "All TCP pings failed"
+        result["error"] = error
     return result
 
+def _icmp_result(host: str, address: str, rtts: List[Optional[float]]) -> Dict[str, Union[str, float, int, bool, list]]:
+    # Keyed by resolved address, like the scanners and traceroute, so every tool shares one estimate
+    for rtt in rtts:
+        if rtt is not None:
+            rtt_estimator.observe(address, rtt / 1000)
+    return _ping_result(host, rtts, "All ICMP pings failed")
+
+def _tcp_ping_sync(host: str, count: int, timeout: int, port: int = 80) -> Dict[str, Union[str, float, int, bool, list]]:
+    import socket
+    if not _is_valid_host(host):
+        return {
+            "host": host,
+            "success": False,
+            "error": PING_INVALID_HOST_ERROR,
+            "raw_output": ""
+        }
+    try:
+        family, address = resolver_cache.resolve(host)
+    except OSError:
+        return {
+            "host": host,
+            "success": False,
+            "error": "Host unreachable or not found",
+            "raw_output": ""
+        }
+    rtts: List[Optional[float]] = []
+    for _ in range(count):
+        s = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            # Known hosts get a timeout derived from their measured RTT; `timeout` is the ceiling.
+            s.settimeout(rtt_estimator.timeout(address, timeout))
+            start = time.perf_counter_ns()
+            s.connect((address, port))
+            rtt = (time.perf_counter_ns() - start) / 1e6
+            rtts.append(rtt)
+            rtt_estimator.observe(address, rtt / 1000)
+        except OSError:
+            rtts.append(None)
+        finally:
+            s.close()
+    return _ping_result(host, rtts, "All TCP pings failed")
+
 def _icmp_ping_sync(host: str, count: int, timeout: int, system: str) -> Dict[str, Union[str, float, int, bool, list]]:
+    """Ping with the in-process ICMP engine, falling back to the ping command without ICMP socket access."""
+    if not _is_valid_host(host):
+        return {
+            "host": host,
+            "success": False,
+            "error": PING_INVALID_HOST_ERROR,
+            "raw_output": ""
+        }
+    if system == "Windows":
+        return _icmp_ping_subprocess(host, count, timeout, system)
+    try:
+        family, address = _resolve_icmp(host)
+        engine = ICMPEngine(family)
+    except PermissionError:
+        return _icmp_ping_subprocess(host, count, timeout, system)
+    except OSError:
+        return {
+            "host": host,
+            "success": False,
+            "error": "Host unreachable or not found",
+            "raw_output": ""
+        }
+    with engine:
+        rtts = engine.ping(address, count=count, timeout=timeout, interval=ICMP_INTERVAL)
+    return _icmp_result(host, address, rtts)
+
+def _icmp_ping_subprocess(host: str, count: int, timeout: int, system: str) -> Dict[str, Union[str, float, int, bool, list]]:
     # Use a hardcoded allowlist for the ping command and never pass unchecked user input
     if not _is_valid_host(host):
         return {
@@ -181,10 +242,12 @@ def _icmp_ping_sync(host: str, count: int, timeout: int, system: str) -> Dict[st
 from gatenet.core import hooks, events
 
 
-def ping(host: str, count: int = 4, timeout: int = 2, method: str = "icmp") -> Dict[str, Union[str, float, int, bool, list]]:
+def ping(host: str, count: int = 4, timeout: int = 2, method: str = "icmp", port: int = 80) -> Dict[str, Union[str, float, int, bool, list]]:
     """
     Ping a host and return detailed latency statistics, including jitter and all RTTs.
 
+    ``method="tcp"`` times TCP handshakes to ``port`` instead of ICMP echoes.
+
     Example:
         >>> from gatenet.diagnostics.ping import ping
         >>> result = ping("google.com", count=5, method="icmp")
@@ -198,7 +261,7 @@ def ping(host: str, count: int = 4, timeout: int = 2, method: str = "icmp") -> D
     if method == "icmp":
         result = _icmp_ping_sync(host, count, timeout, system)
     elif method == "tcp":
-        result = _tcp_ping_sync(host, count, timeout)
+        result = _tcp_ping_sync(host, count, timeout, port)
     else:
         result = {
             "host": host,
@@ -212,57 +275,94 @@ def ping(host: str, count: int = 4, timeout: int = 2, method: str = "icmp") -> D
         pass
     return result
 
-async def _tcp_ping_async(host: str, count: int) -> Dict[str, Union[str, float, int, bool, list]]:
+async def _tcp_probe(family: int, sockaddr: tuple, timeout: float) -> Optional[float]:
+    """Time one non-blocking TCP handshake; returns the RTT in ms, or None."""
+    import socket
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        start = time.perf_counter_ns()
+        async with asyncio.timeout(timeout):
+            await loop.sock_connect(sock, sockaddr)
+        return (time.perf_counter_ns() - start) / 1e6
+    except OSError:
+        # Covers refused/unreachable connects and (as TimeoutError) timeouts
+        return None
+    finally:
+        sock.close()
+
+async def _tcp_ping_async(host: str, count: int, timeout: float = 2.0, port: int = 80) -> Dict[str, Union[str, float, int, bool, list]]:
     """
-    Asynchronously perform TCP ping to a host using a timeout context manager.
+    Asynchronously perform TCP ping to a host with native asyncio connects.
+
+    All ``count`` handshakes run in parallel on the event loop, so no
+    threads are used and many hosts can be pinged concurrently.
 
     Parameters
     ----------
     host : str
         The hostname or IP address to ping.
     count : int
-        Number of echo requests to send.
+        Number of handshakes to time.
+    timeout : float, optional
+        Per-handshake timeout in seconds, shortened for hosts with a known
+        RTT (default: 2.0).
+    port : int, optional
+        TCP port to connect to (default: 80).
 
     Returns
     -------
     dict
         Dictionary with keys: success, rtt_min, rtt_avg, rtt_max, jitter, rtts (list), packet_loss, error, host, raw_output.
     """
-    import socket
-    import functools
-    rtts = []
-    port = 80
-    loop = asyncio.get_event_loop()
-    for _ in range(count):
-        try:
-            async with asyncio.timeout(2):  # Default timeout of 2 seconds per ping
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                start = time.time()
-                await loop.run_in_executor(None, functools.partial(s.connect, (host, port)))
-                rtt = (time.time() - start) * 1000
-                rtts.append(rtt)
-                s.close()
-        except Exception:
-            rtts.append(None)
-    valid_rtts = [r for r in rtts if r is not None]
-    packet_loss = int(100 * (1 - len(valid_rtts) / count))
-    result = {
-        "host": host,
-        "success": bool(valid_rtts),
-        "rtts": valid_rtts,
-        "packet_loss": packet_loss,
-        "raw_output": "",
-    }
-    if valid_rtts:
-        result["rtt_min"] = min(valid_rtts)
-        result["rtt_max"] = max(valid_rtts)
-        result["rtt_avg"] = sum(valid_rtts) / len(valid_rtts)
-        result["jitter"] = statistics.stdev(valid_rtts) if len(valid_rtts) > 1 else 0.0
-    else:
-        result["error"] = "All TCP pings failed"
-    return result
+    try:
+        # Cached names and IP literals skip getaddrinfo, which would run in the thread pool
+        family, address = await resolver_cache.resolve_async(host)
+    except OSError:
+        return {
+            "host": host,
+            "success": False,
+            "error": "Host unreachable or not found",
+            "raw_output": ""
+        }
+    sockaddr = (address, port)
+    probe_timeout = rtt_estimator.timeout(address, timeout)
+    rtts = await asyncio.gather(*(_tcp_probe(family, sockaddr, probe_timeout) for _ in range(count)))
+    for rtt in rtts:
+        if rtt is not None:
+            rtt_estimator.observe(address, rtt / 1000)
+    return _ping_result(host, list(rtts), "All TCP pings failed")
+
+async def _icmp_ping_async(host: str, count: int, system: str, timeout: float = 2.0) -> Dict[str, Union[str, float, int, bool, list]]:
+    """Async ping with the in-process ICMP engine, falling back to the ping command without ICMP socket access."""
+    if not _is_valid_host_format(host):
+        return {
+            "host": host,
+            "success": False,
+            "error": PING_INVALID_HOST_ERROR,
+            "raw_output": ""
+        }
+    if system == "Windows":
+        # The proactor event loop cannot watch raw sockets
+        return await _icmp_ping_subprocess_async(host, count, system)
+    try:
+        family, address = await resolver_cache.resolve_async(host)
+        engine = ICMPEngine(family)
+    except PermissionError:
+        return await _icmp_ping_subprocess_async(host, count, system)
+    except OSError:
+        return {
+            "host": host,
+            "success": False,
+            "error": "Host unreachable or not found",
+            "raw_output": ""
+        }
+    with engine:
+        rtts = await engine.async_ping(address, count=count, timeout=timeout, interval=ICMP_INTERVAL)
+    return _icmp_result(host, address, rtts)
 
-async def _icmp_ping_async(host: str, count: int, system: str) -> Dict[str, Union[str, float, int, bool, list]]:
+async def _icmp_ping_subprocess_async(host: str, count: int, system: str) -> Dict[str, Union[str, float, int, bool, list]]:
     if system == "Windows":
         cmd = ["ping", "-n", str(count), host]
     else:
@@ -292,11 +392,17 @@ async def _icmp_ping_async(host: str, count: int, system: str) -> Dict[str, Unio
 async def async_ping(
     host: str,
     count: int = 4,
-    method: str = "icmp"
+    method: str = "icmp",
+    timeout: float = 2.0,
+    port: int = 80,
 ) -> Dict[str, Union[str, float, int, bool, list]]:
     """
     Asynchronously ping a host and return detailed latency statistics, including jitter and all RTTs.
 
+    ``timeout`` bounds each probe. With ``method="tcp"`` the handshakes to
+    ``port`` run in parallel without threads, so thousands of hosts can be
+    pinged concurrently with ``asyncio.gather``.
+
     Example:
         >>> from gatenet.diagnostics.ping import async_ping
         >>> import asyncio
@@ -309,11 +415,12 @@ async def async_ping(
     except Exception:
         pass
     try:
-        async with asyncio.timeout(10):
+        # Overall guard against a wedged ping subprocess; probes have their own timeouts
+        async with asyncio.timeout(max(10.0, count * ICMP_INTERVAL + timeout)):
             if method == "icmp":
-                result = await _icmp_ping_async(host, count, system)
+                result = await _icmp_ping_async(host, count, system, timeout)
             elif method == "tcp":
-                result = await _tcp_ping_async(host, count)
+                result = await _tcp_ping_async(host, count, timeout, port)
             else:
                 result = {
                     "host": host,
@@ -337,4 +444,131 @@ async def async_ping(
             hooks.emit(events.PING_AFTER, host=host, result=result)
         except Exception:
             pass
-        return result
\ No newline at end of file
+        return result
+
+async def ping_many(
+    hosts: Iterable[str],
+    count: int = 3,
+    interval: float = 1.0,
+    timeout: float = 2.0,
+    resolve_concurrency: int = 64,
+) -> AsyncIterator[Dict[str, Union[str, float, int, bool, list]]]:
+    """
+    Ping many hosts at once over shared ICMP sockets, fping-style.
+
+    All echo requests go through one :class:`~gatenet.diagnostics.icmp.ICMPEngine`
+    per address family. Each round sends one request to every host, spread
+    evenly across ``interval`` so the send rate stays smooth instead of
+    bursting, and results are yielded per host as soon as its last reply
+    arrives or times out. Hosts that do not resolve are yielded first, with
+    an error.
+
+    Parameters
+    ----------
+    hosts : iterable of str
+        Hostnames or IP addresses.
+    count : int, optional
+        Echo requests per host (default: 3).
+    interval : float, optional
+        Seconds between requests to the same host (default: 1.0).
+    timeout : float, optional
+        Seconds to wait for each reply (default: 2.0).
+    resolve_concurrency : int, optional
+        Maximum number of concurrent hostname lookups (default: 64).
+
+    Yields
+    ------
+    dict
+        Same keys as :func:`ping`, plus ``address``, in completion order.
+
+    Raises
+    ------
+    ValueError
+        If ``count`` is less than 1.
+    PermissionError
+        If the process may not open ICMP sockets.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.ping import ping_many
+    >>> async def main():
+    ...     async for r in ping_many(["10.0.0.1", "10.0.0.2"], count=2):
+    ...         print(r["host"], r["packet_loss"], r.get("rtt_avg"))
+    >>> asyncio.run(main())
+    """
+    if count < 1:
+        # No probe would ever finish, so no result would ever be yielded
+        raise ValueError("count must be at least 1")
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(resolve_concurrency)
+
+    async def resolve(host: str) -> Optional[Tuple[int, str]]:
+        async with limit:
+            try:
+                return await resolver_cache.resolve_async(host)
+            except OSError:
+                return None
+
+    names = list(hosts)
+    resolved = await asyncio.gather(*(resolve(host) for host in names))
+    targets = []
+    for host, target in zip(names, resolved):
+        if target is None:
+            yield {"host": host, "success": False, "error": "Host unreachable or not found", "raw_output": ""}
+        else:
+            targets.append((host, target[0], target[1]))
+    if not targets:
+        return
+
+    engines: Dict[int, ICMPEngine] = {}
+    try:
+        for _host, family, _address in targets:
+            if family not in engines:
+                engines[family] = ICMPEngine(family)
+        done: "asyncio.Queue[Dict[str, Union[str, float, int, bool, list]]]" = asyncio.Queue()
+        rtts = [[None] * count for _ in targets]
+        remaining = [count] * len(targets)
+        probes = set()
+        slots = {family: asyncio.Semaphore(_MAX_IN_FLIGHT) for family in engines}
+
+        def finish(i: int, r: int, task: "asyncio.Task") -> None:
+            probes.discard(task)
+            slots[targets[i][1]].release()
+            if task.cancelled():
+                return
+            # A probe that raised (e.g. no free sequence number) counts as lost
+            rtts[i][r] = None if task.exception() is not None else task.result()
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                host, _family, address = targets[i]
+                result = _icmp_result(host, address, rtts[i])
+                result["address"] = address
+                done.put_nowait(result)
+
+        async def schedule() -> None:
+            start = loop.time()
+            gap = interval / len(targets)
+            for r in range(count):
+                for i, (_host, family, address) in enumerate(targets):
+                    delay = start + r * interval + i * gap - loop.time()
+                    # Sub-millisecond gaps are below timer resolution; send in bursts instead
+                    if delay > 0.001:
+                        await asyncio.sleep(delay)
+                    await slots[family].acquire()
+                    task = asyncio.ensure_future(engines[family].probe(address, timeout))
+                    task.add_done_callback(lambda t, i=i, r=r: finish(i, r, t))
+                    probes.add(task)
+
+        scheduler = asyncio.ensure_future(schedule())
+        try:
+            for _ in targets:
+                yield await done.get()
+        finally:
+            scheduler.cancel()
+            for task in list(probes):
+                task.cancel()
+            await asyncio.gather(scheduler, *probes, return_exceptions=True)
+    finally:
+        for engine in engines.values():
+            engine.close()
@@ -1,7 +1,78 @@
+"""
+port_scan.py
+
+TCP port scanning utilities for gatenet.
+
+Asynchronous scanners delegate to :class:`ScanEngine`, an asyncio
+connect-scan engine with a bounded worker pool, per-host in-flight limits,
+optional token-bucket rate limiting and adaptive per-host timeouts driven by
+the shared :data:`gatenet.diagnostics.rtt.rtt_estimator`.
+:func:`scan_network` streams results for whole CIDR blocks or address ranges
+through the same engine. The synchronous :func:`scan_ports` uses
+:class:`SelectorScanner`, which multiplexes non-blocking connects with
+:mod:`selectors` so callers without an event loop get the same throughput.
+
+Example:
+    from gatenet.diagnostics.port_scan import scan_ports
+    print(scan_ports("127.0.0.1", ports=[22, 80, 443]))
+"""
+
+import asyncio
+import contextlib
+import errno
+import heapq
+import ipaddress
+import selectors
 import socket
-from typing import List, Tuple
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
 from gatenet.utils import COMMON_PORTS
-import asyncio
+from gatenet.diagnostics.resolver import resolver_cache, sockaddr
+from gatenet.diagnostics.rtt import RTTEstimator, rtt_estimator
+
+# Port states reported by the scan engine
+OPEN = "open"            # connect() succeeded
+CLOSED = "closed"        # the host answered with a reset (ECONNREFUSED)
+FILTERED = "filtered"    # no answer before the timeout, or host/network unreachable
+ERROR = "error"          # the target could not be resolved or a local socket error occurred
+
+
+class ScanResult(NamedTuple):
+    """
+    Outcome of probing one TCP port.
+
+    A plain tuple underneath, so millions of results stay compact and can be
+    unpacked as ``host, port, state, rtt_ms, errno = result``.
+
+    Attributes
+    ----------
+    host : str
+        Probed host, as given by the caller.
+    port : int
+        Probed port.
+    state : str
+        One of ``OPEN``, ``CLOSED``, ``FILTERED`` or ``ERROR``.
+    rtt_ms : float or None
+        Connect latency in milliseconds, or None if the host did not answer.
+        Closed ports have an RTT too, since a reset is an answer.
+    errno : int or None
+        Socket error reported by the connect, or None for success and for
+        timeouts.
+    """
+
+    host: str
+    port: int
+    state: str
+    rtt_ms: Optional[float] = None
+    errno: Optional[int] = None
+
+    @property
+    def is_open(self) -> bool:
+        """True if the port accepted the connection."""
+        return self.state == OPEN
+
 
 def check_public_port(host: str = "1.1.1.1", port: int = 53, timeout: float = 2.0) -> bool:
     """
@@ -17,30 +88,671 @@ def check_public_port(host: str = "1.1.1.1", port: int = 53, timeout: float = 2.
             return True
     except OSError:
         return False
-    
-def scan_ports(host: str, ports: List[int] = COMMON_PORTS, timeout: float = 2.0) -> List[Tuple[int, bool]]:
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``. Callers
+    reserve a token with :meth:`reserve`, which never blocks, or wait for one
+    with :meth:`acquire` from a coroutine.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second.
+    burst : int, optional
+        Bucket capacity (default: ``max(1, int(rate))``).
+
+    Example
+    -------
+    >>> bucket = TokenBucket(rate=1000, burst=50)
+    >>> bucket.reserve()
+    0.0
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns
+        -------
+        float
+            ``0.0`` if a token was taken, otherwise the number of seconds to
+            wait before trying again.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.reserve()
+
+
+def _rtt_key(host: str) -> str:
+    # The estimator is shared with ping and traceroute, which key it by resolved address
+    try:
+        return resolver_cache.resolve(host)[1]
+    except OSError:
+        return host
+
+
+class _HostState:
+    """Per-host bookkeeping used by :class:`ScanEngine`."""
+
+    __slots__ = ("semaphore", "bucket", "lock", "addrinfo", "resolved", "inflight")
+
+    def __init__(self, per_host: int, per_host_rate: Optional[float]) -> None:
+        self.semaphore = asyncio.Semaphore(per_host)
+        self.bucket = TokenBucket(per_host_rate) if per_host_rate else None
+        self.lock = asyncio.Lock()
+        # (family, sockaddr, resolved address)
+        self.addrinfo: Optional[Tuple[int, Any, str]] = None
+        self.resolved = False
+        self.inflight = 0
+
+
+class ScanEngine:
+    """
+    Bounded-concurrency asynchronous TCP connect scan engine.
+
+    A fixed pool of ``concurrency`` workers pulls ``(host, port)`` targets from
+    a shared iterator, so the number of open sockets never exceeds the global
+    limit no matter how many targets are queued. Each host additionally gets
+    its own in-flight limit and optional rate limit, and its connect timeout
+    follows the host's measured RTT once it has answered a probe.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Maximum number of connects in flight across all hosts (default: 256).
+    per_host : int, optional
+        Maximum number of connects in flight to a single host (default: 64).
+    rate : float, optional
+        Global connect attempts per second, or None for unlimited.
+    burst : int, optional
+        Global token-bucket capacity (default: one second's worth of ``rate``).
+    per_host_rate : float, optional
+        Connect attempts per second to a single host, or None for unlimited.
+    timeout : float, optional
+        Upper bound on the connect timeout in seconds (default: 1.0).
+    min_timeout : float, optional
+        Lower bound on the adaptive connect timeout in seconds (default: 0.1).
+    adaptive : bool, optional
+        If True, derive each host's timeout from ``estimator`` (default: True).
+    estimator : RTTEstimator, optional
+        RTT estimator to learn from and feed (default: the shared
+        ``rtt_estimator``).
+    max_hosts : int, optional
+        Number of idle host states (resolved addresses) kept (default: 4096).
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.port_scan import ScanEngine
+    >>> engine = ScanEngine(concurrency=500, rate=2000)
+    >>> asyncio.run(engine.scan("127.0.0.1", [22, 80]))
+    [(22, False), (80, True)]
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 256,
+        per_host: int = 64,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        per_host_rate: Optional[float] = None,
+        timeout: float = 1.0,
+        min_timeout: float = 0.1,
+        adaptive: bool = True,
+        estimator: Optional[RTTEstimator] = None,
+        max_hosts: int = 4096,
+    ) -> None:
+        if concurrency < 1 or per_host < 1:
+            raise ValueError("concurrency and per_host must be at least 1")
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.per_host_rate = per_host_rate
+        self.timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.adaptive = adaptive
+        self.estimator = estimator if estimator is not None else rtt_estimator
+        self.max_hosts = max_hosts
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._hosts: "OrderedDict[str, _HostState]" = OrderedDict()
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.per_host, self.per_host_rate)
+            self._hosts[host] = state
+            if len(self._hosts) > self.max_hosts:
+                self._evict_idle()
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _evict_idle(self) -> None:
+        for name in list(self._hosts):
+            if len(self._hosts) <= self.max_hosts:
+                break
+            if self._hosts[name].inflight == 0:
+                del self._hosts[name]
+
+    def host_timeout(self, host: str) -> float:
+        """
+        Return the connect timeout currently used for ``host``.
+
+        The estimate is kept per resolved address, so a name and its
+        address (and ping or traceroute runs against either) share it.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+
+        Returns
+        -------
+        float
+            Timeout in seconds.
+        """
+        return self._timeout(_rtt_key(host))
+
+    def _timeout(self, address: str) -> float:
+        if not self.adaptive:
+            return self.timeout
+        return self.estimator.timeout(address, self.timeout, self.min_timeout)
+
+    async def _resolve(self, host: str, state: _HostState) -> Optional[Tuple[int, Any, str]]:
+        if state.resolved:
+            return state.addrinfo
+        async with state.lock:
+            if not state.resolved:
+                try:
+                    # IP literals (the common case for network sweeps) and names
+                    # resolved recently skip getaddrinfo, which would otherwise
+                    # occupy a thread-pool slot per host.
+                    family, address = await resolver_cache.resolve_async(host)
+                    state.addrinfo = (family, sockaddr(family, address), address)
+                except OSError:
+                    state.addrinfo = None
+                state.resolved = True
+        return state.addrinfo
+
+    async def _connect(
+        self, family: int, sockaddr: Any, port: int, timeout: float
+    ) -> Tuple[str, Optional[float], Optional[int]]:
+        loop = asyncio.get_running_loop()
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError as exc:
+            return ERROR, None, exc.errno
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (sockaddr[0], port) + tuple(sockaddr[2:])), timeout)
+            return OPEN, (time.perf_counter() - start) * 1000, None
+        except ConnectionRefusedError as exc:
+            # A refusal is a real answer from the host, so its latency counts.
+            return CLOSED, (time.perf_counter() - start) * 1000, exc.errno
+        except asyncio.TimeoutError:
+            return FILTERED, None, None
+        except OSError as exc:
+            return FILTERED, None, exc.errno
+        finally:
+            sock.close()
+
+    async def probe(self, host: str, port: int) -> ScanResult:
+        """
+        Probe a single TCP port, honouring all engine limits.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+        port : int
+            Target port.
+
+        Returns
+        -------
+        ScanResult
+            State, connect latency and errno of the probe.
+        """
+        state = self._host(host)
+        state.inflight += 1
+        try:
+            addrinfo = await self._resolve(host, state)
+            if addrinfo is None:
+                return ScanResult(host, port, ERROR)
+            async with state.semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                if state.bucket is not None:
+                    await state.bucket.acquire()
+                port_state, rtt, err = await self._connect(addrinfo[0], addrinfo[1], port, self._timeout(addrinfo[2]))
+            if rtt is not None:
+                self.estimator.observe(addrinfo[2], rtt / 1000)
+            return ScanResult(host, port, port_state, rtt, err)
+        finally:
+            state.inflight -= 1
+
+    async def _drain(
+        self,
+        targets: Iterable[Tuple[str, int]],
+        sink: Callable[[int, ScanResult], Awaitable[None]],
+    ) -> None:
+        indexed = enumerate(targets)
+
+        async def worker() -> None:
+            # The iterator is shared; next() never yields control, so workers
+            # cannot observe the same target twice.
+            for index, (host, port) in indexed:
+                await sink(index, await self.probe(host, port))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def scan(
+        self, host: str, ports: Iterable[int], detailed: bool = False
+    ) -> Union[List[Tuple[int, bool]], List[ScanResult]]:
+        """
+        Scan ``ports`` on ``host`` and return results in input order.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+        ports : iterable of int
+            Ports to probe.
+        detailed : bool, optional
+            If True, return :class:`ScanResult` records instead of
+            ``(port, is_open)`` pairs (default: False).
+
+        Returns
+        -------
+        list
+            ``(port, is_open)`` pairs, or :class:`ScanResult` records.
+        """
+        port_list = list(ports)
+        results: List[Any] = [None] * len(port_list)
+
+        async def collect(index: int, result: ScanResult) -> None:
+            results[index] = result if detailed else (result.port, result.state == OPEN)
+
+        await self._drain(((host, port) for port in port_list), collect)
+        return results
+
+    async def stream(self, targets: Iterable[Tuple[str, int]]) -> AsyncIterator[ScanResult]:
+        """
+        Probe ``(host, port)`` targets and yield results as they complete.
+
+        Targets are pulled lazily, and workers pause while the consumer is
+        behind, so memory use stays bounded by ``concurrency`` regardless of
+        how many targets the iterable produces.
+
+        Parameters
+        ----------
+        targets : iterable of tuple
+            ``(host, port)`` pairs to probe.
+
+        Yields
+        ------
+        ScanResult
+            One record per target, in completion order.
+        """
+        queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=self.concurrency)
+        done = object()
+        errors: List[BaseException] = []
+
+        async def publish(_index: int, result: ScanResult) -> None:
+            await queue.put(result)
+
+        async def run() -> None:
+            try:
+                await self._drain(targets, publish)
+            except Exception as exc:
+                errors.append(exc)
+            await queue.put(done)
+
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            if errors:
+                raise errors[0]
+        finally:
+            if not task.done():
+                # The consumer stopped early: stop the workers and release their sockets.
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+
+_CONNECT_PENDING = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EALREADY,
+    getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK),
+}
+_CONNECT_REFUSED = {errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", errno.ECONNREFUSED)}
+_FD_EXHAUSTED = {errno.EMFILE, errno.ENFILE}
+
+
+def _connect_result(host: str, port: int, err: int, start: float) -> ScanResult:
+    """Build a :class:`ScanResult` from a completed connect() errno."""
+    if err == 0:
+        return ScanResult(host, port, OPEN, (time.perf_counter() - start) * 1000)
+    if err in _CONNECT_REFUSED:
+        return ScanResult(host, port, CLOSED, (time.perf_counter() - start) * 1000, err)
+    return ScanResult(host, port, FILTERED, None, err)
+
+
+class _PendingConnect:
+    """A non-blocking connect registered with :class:`SelectorScanner`."""
+
+    __slots__ = ("sock", "index", "host", "address", "port", "start", "seq")
+
+    def __init__(self, sock: socket.socket, index: int, host: str, address: str, port: int, start: float, seq: int) -> None:
+        self.sock = sock
+        self.index = index
+        self.host = host
+        self.address = address
+        self.port = port
+        self.start = start
+        self.seq = seq
+
+
+class SelectorScanner:
+    """
+    Synchronous TCP connect scanner built on non-blocking sockets.
+
+    Up to ``concurrency`` connects are started at once and their completions
+    are multiplexed with :mod:`selectors` (epoll on Linux, kqueue on BSD and
+    macOS), giving event-loop throughput to callers that cannot run asyncio,
+    such as the CLI and the dashboard's sync routes. Timeouts adapt per host
+    like :class:`ScanEngine`'s, and if the process runs out of file
+    descriptors the scanner lowers its concurrency instead of failing.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Maximum number of connects in flight (default: 256).
+    rate : float, optional
+        Connect attempts per second, or None for unlimited.
+    burst : int, optional
+        Token-bucket capacity (default: one second's worth of ``rate``).
+    timeout : float, optional
+        Upper bound on the connect timeout in seconds (default: 1.0).
+    min_timeout : float, optional
+        Lower bound on the adaptive connect timeout in seconds (default: 0.1).
+    adaptive : bool, optional
+        If True, derive each host's timeout from ``estimator`` (default: True).
+    estimator : RTTEstimator, optional
+        RTT estimator to learn from and feed (default: the shared
+        ``rtt_estimator``).
+
+    Example
+    -------
+    >>> from gatenet.diagnostics.port_scan import SelectorScanner
+    >>> SelectorScanner(concurrency=100).scan("127.0.0.1", [22, 80])
+    [(22, False), (80, True)]
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 256,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        timeout: float = 1.0,
+        min_timeout: float = 0.1,
+        adaptive: bool = True,
+        estimator: Optional[RTTEstimator] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.adaptive = adaptive
+        self.estimator = estimator if estimator is not None else rtt_estimator
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._addresses: Dict[str, Optional[Tuple[int, Any, str]]] = {}
+
+    def _resolve(self, host: str) -> Optional[Tuple[int, Any, str]]:
+        if host in self._addresses:
+            return self._addresses[host]
+        try:
+            family, address = resolver_cache.resolve(host)
+            addrinfo: Optional[Tuple[int, Any, str]] = (family, sockaddr(family, address), address)
+        except OSError:
+            addrinfo = None
+        self._addresses[host] = addrinfo
+        return addrinfo
+
+    def host_timeout(self, host: str) -> float:
+        """
+        Return the connect timeout currently used for ``host``.
+
+        The estimate is kept per resolved address, so a name and its
+        address (and ping or traceroute runs against either) share it.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+
+        Returns
+        -------
+        float
+            Timeout in seconds.
+        """
+        return self._timeout(_rtt_key(host))
+
+    def _timeout(self, address: str) -> float:
+        if not self.adaptive:
+            return self.timeout
+        return self.estimator.timeout(address, self.timeout, self.min_timeout)
+
+    def _completed(self, host: str, address: str, port: int, err: int, start: float) -> ScanResult:
+        result = _connect_result(host, port, err, start)
+        if result.rtt_ms is not None:
+            self.estimator.observe(address, result.rtt_ms / 1000)
+        return result
+
+    def _probe_all(self, targets: Iterable[Tuple[str, int]]) -> Iterator[Tuple[int, ScanResult]]:
+        selector = selectors.DefaultSelector()
+        pending: Dict[int, _PendingConnect] = {}
+        deadlines: List[Tuple[float, int, int]] = []  # (deadline, seq, fd)
+        indexed = enumerate(targets)
+        backlog: Optional[Tuple[int, Tuple[str, int]]] = None
+        exhausted = False
+        limit = self.concurrency
+        seq = 0
+        try:
+            while True:
+                throttle = 0.0
+                while not exhausted and len(pending) < limit:
+                    if backlog is None:
+                        backlog = next(indexed, None)
+                        if backlog is None:
+                            exhausted = True
+                            break
+                    index, (host, port) = backlog
+                    addrinfo = self._resolve(host)
+                    if addrinfo is None:
+                        backlog = None
+                        yield index, ScanResult(host, port, ERROR)
+                        continue
+                    # Only a connect attempt spends a token; lookups are cached per host
+                    if self._bucket is not None:
+                        throttle = self._bucket.reserve()
+                        if throttle > 0:
+                            break
+                    try:
+                        sock = socket.socket(addrinfo[0], socket.SOCK_STREAM)
+                    except OSError as exc:
+                        if exc.errno in _FD_EXHAUSTED and pending:
+                            # Keep the target and hold no more sockets than we managed to open.
+                            limit = len(pending)
+                            break
+                        backlog = None
+                        yield index, ScanResult(host, port, ERROR, None, exc.errno)
+                        continue
+                    backlog = None
+                    sock.setblocking(False)
+                    start = time.perf_counter()
+                    err = sock.connect_ex((addrinfo[1][0], port) + tuple(addrinfo[1][2:]))
+                    if err not in _CONNECT_PENDING:
+                        sock.close()
+                        yield index, self._completed(host, addrinfo[2], port, err, start)
+                        continue
+                    seq += 1
+                    pending[sock.fileno()] = _PendingConnect(sock, index, host, addrinfo[2], port, start, seq)
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    deadline = time.monotonic() + self._timeout(addrinfo[2])
+                    heapq.heappush(deadlines, (deadline, seq, sock.fileno()))
+
+                if not pending:
+                    if exhausted:
+                        return
+                    time.sleep(throttle)
+                    continue
+
+                wait = max(0.0, deadlines[0][0] - time.monotonic())
+                if throttle > 0:
+                    wait = min(wait, throttle)
+                for key, _events in selector.select(wait):
+                    probe = pending.pop(key.fd)
+                    selector.unregister(probe.sock)
+                    err = probe.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    probe.sock.close()
+                    yield probe.index, self._completed(probe.host, probe.address, probe.port, err, probe.start)
+
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _deadline, probe_seq, fd = heapq.heappop(deadlines)
+                    probe = pending.get(fd)
+                    if probe is None or probe.seq != probe_seq:
+                        continue  # completed earlier; the fd may belong to a newer probe
+                    del pending[fd]
+                    selector.unregister(probe.sock)
+                    probe.sock.close()
+                    yield probe.index, ScanResult(probe.host, probe.port, FILTERED)
+        finally:
+            for probe in pending.values():
+                probe.sock.close()
+            selector.close()
+
+    def stream(self, targets: Iterable[Tuple[str, int]]) -> Iterator[ScanResult]:
+        """
+        Probe ``(host, port)`` targets and yield results as they complete.
+
+        Parameters
+        ----------
+        targets : iterable of tuple
+            ``(host, port)`` pairs to probe; consumed lazily.
+
+        Yields
+        ------
+        ScanResult
+            One record per target, in completion order.
+        """
+        for _index, result in self._probe_all(targets):
+            yield result
+
+    def scan(
+        self, host: str, ports: Iterable[int], detailed: bool = False
+    ) -> Union[List[Tuple[int, bool]], List[ScanResult]]:
+        """
+        Scan ``ports`` on ``host`` and return results in input order.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+        ports : iterable of int
+            Ports to probe.
+        detailed : bool, optional
+            If True, return :class:`ScanResult` records instead of
+            ``(port, is_open)`` pairs (default: False).
+
+        Returns
+        -------
+        list
+            ``(port, is_open)`` pairs, or :class:`ScanResult` records.
+        """
+        port_list = list(ports)
+        results: List[Any] = [None] * len(port_list)
+        for index, result in self._probe_all((host, port) for port in port_list):
+            results[index] = result if detailed else (result.port, result.state == OPEN)
+        return results
+
+
+def scan_ports(
+    host: str,
+    ports: List[int] = COMMON_PORTS,
+    timeout: float = 2.0,
+    concurrency: int = 256,
+    rate: Optional[float] = None,
+    detailed: bool = False,
+) -> Union[List[Tuple[int, bool]], List[ScanResult]]:
     """
     Scan a list of ports on a given host to check if they are open.
 
+    Ports are probed concurrently by a :class:`SelectorScanner`, so the call
+    takes roughly one ``timeout`` rather than one per port and does not need
+    an event loop.
+
+    Parameters
+    ----------
+    host : str
+        Target host.
+    ports : list of int, optional
+        Ports to scan (default: ``COMMON_PORTS``).
+    timeout : float, optional
+        Maximum connect timeout per port in seconds (default: 2.0).
+    concurrency : int, optional
+        Maximum number of connects in flight (default: 256).
+    rate : float, optional
+        Maximum connect attempts per second, or None for unlimited.
+    detailed : bool, optional
+        If True, return :class:`ScanResult` records that distinguish closed
+        from filtered ports and carry RTT and errno (default: False).
+
     Example:
         >>> from gatenet.diagnostics.port_scan import scan_ports
         >>> scan_ports("localhost", ports=[22, 80, 443])
         [(22, False), (80, True), (443, True)]
     """
-    results = []
-    for port in ports:
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(timeout)
-                result = sock.connect_ex((host, port))
-                results.append((port, result == 0))
-        except Exception:
-            results.append((port, False))
-    return results
+    return SelectorScanner(concurrency=concurrency, rate=rate, timeout=timeout).scan(host, ports, detailed)
 
-import contextlib
 
-async def check_port(host: str, port: int) -> Tuple[int, bool]:
+async def check_port(host: str, port: int, timeout: float = 1.0) -> Tuple[int, bool]:
     """
     Asynchronously check if a TCP port is open on a given host.
 
@@ -50,25 +762,157 @@ async def check_port(host: str, port: int) -> Tuple[int, bool]:
         >>> asyncio.run(check_port("localhost", 22))
         (22, False)
     """
-    try:
-        async with asyncio.timeout(1.0):
-            _reader, writer = await asyncio.open_connection(host, port)
-            writer.close()
-            await writer.wait_closed()
-            return port, True
-    except (asyncio.TimeoutError, ConnectionRefusedError):
-        return port, False
-    
-async def scan_ports_async(host: str, ports: List[int] = COMMON_PORTS) -> List[Tuple[int, bool]]:
+    result = await ScanEngine(concurrency=1, timeout=timeout, adaptive=False).probe(host, port)
+    return port, result.is_open
+
+
+async def scan_ports_async(
+    host: str,
+    ports: List[int] = COMMON_PORTS,
+    timeout: float = 1.0,
+    concurrency: int = 256,
+    per_host: int = 256,
+    rate: Optional[float] = None,
+    engine: Optional[ScanEngine] = None,
+    detailed: bool = False,
+) -> Union[List[Tuple[int, bool]], List[ScanResult]]:
     """
     Asynchronously scan a list of ports on a given host.
 
+    Parameters
+    ----------
+    host : str
+        Target host.
+    ports : list of int, optional
+        Ports to scan (default: ``COMMON_PORTS``).
+    timeout : float, optional
+        Maximum connect timeout per port in seconds (default: 1.0).
+    concurrency : int, optional
+        Maximum number of connects in flight (default: 256).
+    per_host : int, optional
+        Maximum number of connects in flight to ``host`` (default: 256).
+    rate : float, optional
+        Maximum connect attempts per second, or None for unlimited.
+    engine : ScanEngine, optional
+        Pre-configured engine to use instead of the keyword limits, e.g. to
+        share limits and learned timeouts between scans.
+    detailed : bool, optional
+        If True, return :class:`ScanResult` records instead of
+        ``(port, is_open)`` pairs (default: False).
+
     Example:
         >>> import asyncio
         >>> from gatenet.diagnostics.port_scan import scan_ports_async
         >>> asyncio.run(scan_ports_async("localhost", ports=[22, 80]))
         [(22, False), (80, True)]
     """
-    tasks = [check_port(host, port) for port in ports]
-    results = await asyncio.gather(*tasks)
-    return results
\ No newline at end of file
+    if engine is None:
+        engine = ScanEngine(concurrency=concurrency, per_host=per_host, rate=rate, timeout=timeout)
+    return await engine.scan(host, ports, detailed)
+
+
+def _expand_hosts(spec: Union[str, Iterable[str]]) -> Iterator[str]:
+    """
+    Lazily expand a target specification into individual hosts.
+
+    ``spec`` may be a CIDR block (``"10.0.0.0/24"``), an address range
+    (``"10.0.0.10-10.0.0.20"`` or ``"10.0.0.10-20"``), a single address or
+    hostname, or an iterable mixing any of these. Network and broadcast
+    addresses are skipped for CIDR blocks, as with ``ip_network().hosts()``.
+    """
+    if not isinstance(spec, str):
+        for item in spec:
+            yield from _expand_hosts(item)
+        return
+    spec = spec.strip()
+    if "/" in spec:
+        for addr in ipaddress.ip_network(spec, strict=False).hosts():
+            yield str(addr)
+        return
+    if "-" in spec:
+        start_text, _, end_text = spec.partition("-")
+        try:
+            start = ipaddress.ip_address(start_text.strip())
+        except ValueError:
+            start = None  # a hostname containing a dash
+        if start is not None:
+            end_text = end_text.strip()
+            if end_text.isdigit() and start.version == 4:
+                end = ipaddress.ip_address(start_text.rsplit(".", 1)[0] + "." + end_text)
+            else:
+                end = ipaddress.ip_address(end_text)
+            if end.version != start.version or end < start:
+                raise ValueError(f"Invalid address range: {spec}")
+            address_type = type(start)
+            for value in range(int(start), int(end) + 1):
+                yield str(address_type(value))
+            return
+    yield spec
+
+
+async def scan_network(
+    targets: Union[str, Iterable[str]],
+    ports: List[int] = COMMON_PORTS,
+    timeout: float = 1.0,
+    concurrency: int = 512,
+    per_host: int = 16,
+    rate: Optional[float] = None,
+    engine: Optional[ScanEngine] = None,
+) -> AsyncIterator[ScanResult]:
+    """
+    Sweep ports across a network and stream results as they complete.
+
+    Hosts are expanded lazily from ``targets`` and probes are interleaved
+    port-major (every host on the first port, then every host on the next),
+    so consecutive connects spread across hosts and no per-host limit is hit
+    early. Only ``concurrency`` targets are held in memory at once, which
+    keeps /16 sweeps cheap.
+
+    Parameters
+    ----------
+    targets : str or iterable of str
+        CIDR block (``"10.0.0.0/24"``), address range (``"10.0.0.10-20"``
+        or ``"10.0.0.10-10.0.0.20"``), single host, or an iterable of these.
+    ports : list of int, optional
+        Ports to probe on every host (default: ``COMMON_PORTS``).
+    timeout : float, optional
+        Maximum connect timeout per probe in seconds (default: 1.0).
+    concurrency : int, optional
+        Maximum number of connects in flight (default: 512).
+    per_host : int, optional
+        Maximum number of connects in flight to one host (default: 16).
+    rate : float, optional
+        Maximum connect attempts per second, or None for unlimited.
+    engine : ScanEngine, optional
+        Pre-configured engine to use instead of the keyword limits.
+
+    Yields
+    ------
+    ScanResult
+        ``(host, port, state, rtt_ms, errno)`` records, where ``state`` is one
+        of ``OPEN``, ``CLOSED``, ``FILTERED`` or ``ERROR``.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.diagnostics.port_scan import scan_network, OPEN
+    >>> async def main():
+    ...     async for result in scan_network("192.168.1.0/24", ports=[22, 80]):
+    ...         if result.state == OPEN:
+    ...             print(result.host, result.port, result.rtt_ms)
+    >>> asyncio.run(main())
+    """
+    if engine is None:
+        engine = ScanEngine(concurrency=concurrency, per_host=per_host, rate=rate, timeout=timeout)
+    port_list = list(ports)
+    specs = [targets] if isinstance(targets, str) else list(targets)
+    for spec in specs:
+        # Surface malformed specifications before any probe is sent.
+        next(_expand_hosts(spec), None)
+    pairs = ((host, port) for port in port_list for host in _expand_hosts(specs))
+    results = engine.stream(pairs)
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
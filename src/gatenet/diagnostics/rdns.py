@@ -0,0 +1,316 @@
+"""
+rdns.py
+
+Batch reverse-DNS enrichment with a shared PTR cache.
+
+:class:`ReverseResolver` resolves IP addresses to names in the background,
+so sync tools can hand it addresses and keep probing while lookups run, and
+async code can await many at once. Lookups are bounded by a concurrency
+limit and a per-lookup deadline; answers (and failures, which are usually
+the slow part) are cached for their TTL, and concurrent requests for one
+address share a lookup. By default the system resolver is used on a small
+thread pool (honouring /etc/hosts); give ``server`` to pipeline PTR queries
+to that nameserver through :class:`gatenet.diagnostics.dns.DNSResolver`
+instead. The shared ``reverse_resolver`` backs traceroute hop names.
+
+Example:
+    from gatenet.diagnostics.rdns import reverse_resolver
+
+    names = reverse_resolver.resolve_many(["1.1.1.1", "8.8.8.8", "192.0.2.1"])
+    # -> {'1.1.1.1': 'one.one.one.one', '8.8.8.8': 'dns.google', '192.0.2.1': None}
+
+    # In async code, e.g. to label hosts found by scan_network:
+    names = await reverse_resolver.lookup_many({r.host for r in results})
+"""
+
+import asyncio
+import concurrent.futures
+import heapq
+import ipaddress
+import itertools
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from gatenet.diagnostics.dns import DNSError, DNSResolver
+
+
+class ReverseResolver:
+    """
+    Parallel PTR lookups with deadlines and a TTL cache.
+
+    Every lookup is represented by a :class:`concurrent.futures.Future`
+    that completes with the name, or with None once the lookup fails or its
+    deadline passes. A lookup that answers after its deadline still fills
+    the cache for later callers; one still queued at its deadline is
+    dropped without being cached. The cache, the in-flight table and the
+    concurrency limit are shared by every caller, sync or async, on any
+    thread.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Maximum number of lookups in progress (default: 32).
+    timeout : float, optional
+        Deadline for each lookup in seconds, counted from submission
+        (default: 1.0).
+    ttl : float, optional
+        Seconds a name is cached; DNS answers use their record TTL when it
+        is shorter (default: 3600).
+    negative_ttl : float, optional
+        Seconds a failed lookup, or one that ran past its deadline, is
+        cached (default: 300).
+    max_entries : int, optional
+        Maximum number of cached addresses (default: 65536).
+    server : str, optional
+        Nameserver to query directly; None uses the system resolver.
+
+    Example
+    -------
+    >>> from gatenet.diagnostics.rdns import ReverseResolver
+    >>> resolver = ReverseResolver(timeout=0.5)
+    >>> resolver.resolve_many(["127.0.0.1"])
+    {'127.0.0.1': 'localhost'}
+    >>> resolver.close()
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 32,
+        timeout: float = 1.0,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        max_entries: int = 65536,
+        server: Optional[str] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.server = server
+        # ip -> (expiry, name or None)
+        self._cache: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._inflight: Dict[str, "concurrent.futures.Future[Optional[str]]"] = {}
+        # Lookups that have left the queue and are talking to a resolver
+        self._started: Set["concurrent.futures.Future[Optional[str]]"] = set()
+        self._lock = threading.Lock()
+        # Deadline heap of (when, tiebreak, ip, future), served by one reaper thread
+        self._deadlines: List[tuple] = []
+        self._tiebreak = itertools.count()
+        self._wakeup = threading.Condition(self._lock)
+        self._reaper: Optional[threading.Thread] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._dns: Optional[DNSResolver] = None
+        self._closed = False
+
+    def _cached(self, ip: str) -> Tuple[bool, Optional[str]]:
+        entry = self._cache.get(ip)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._cache[ip]
+            return False, None
+        self._cache.move_to_end(ip)
+        return True, entry[1]
+
+    def _store(self, ip: str, name: Optional[str], ttl: float) -> None:
+        self._cache[ip] = (time.monotonic() + ttl, name)
+        self._cache.move_to_end(ip)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _begin(self, fut: "concurrent.futures.Future[Optional[str]]") -> bool:
+        # False once the deadline has passed while the lookup was still queued
+        with self._lock:
+            if fut.done():
+                return False
+            self._started.add(fut)
+            return True
+
+    def _settle(self, ip: str, fut: "concurrent.futures.Future[Optional[str]]", name: Optional[str], ttl: float, late: bool = False) -> None:
+        with self._lock:
+            self._started.discard(fut)
+            # A late answer may still improve on the negative entry left by the deadline
+            if not late or name is not None:
+                self._store(ip, name, ttl)
+            if fut.done():
+                return
+            fut.set_result(name)
+            if self._inflight.get(ip) is fut:
+                del self._inflight[ip]
+
+    def _reap(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._deadlines:
+                    self._wakeup.wait()
+                    continue
+                when, _n, ip, fut = self._deadlines[0]
+                delay = when - time.monotonic()
+                if delay > 0 and not fut.done():
+                    self._wakeup.wait(delay)
+                    continue
+                heapq.heappop(self._deadlines)
+                if not fut.done():
+                    # Only a lookup that actually ran counts as a failure
+                    if fut in self._started:
+                        self._store(ip, None, self.negative_ttl)
+                    fut.set_result(None)
+                    if self._inflight.get(ip) is fut:
+                        del self._inflight[ip]
+
+    def _start_workers(self) -> None:
+        # Called with the lock held
+        if self._reaper is None:
+            self._closed = False
+            self._reaper = threading.Thread(target=self._reap, name="gatenet-rdns-deadlines", daemon=True)
+            self._reaper.start()
+        if self.server is None:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.concurrency, thread_name_prefix="gatenet-rdns")
+        elif self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="gatenet-rdns", daemon=True)
+            self._loop_thread.start()
+
+    def _system_lookup(self, ip: str, fut: "concurrent.futures.Future[Optional[str]]") -> None:
+        if not self._begin(fut):
+            return
+        try:
+            name: Optional[str] = socket.gethostbyaddr(ip)[0]
+            ttl = self.ttl
+        except OSError:
+            name, ttl = None, self.negative_ttl
+        self._settle(ip, fut, name, ttl, late=fut.done())
+
+    async def _dns_lookup(self, ip: str, fut: "concurrent.futures.Future[Optional[str]]") -> None:
+        if not self._begin(fut):
+            return
+        if self._dns is None:
+            self._dns = DNSResolver(self.server, timeout=self.timeout, retries=0, max_inflight=max(1, self.concurrency))
+        name: Optional[str] = None
+        ttl = self.negative_ttl
+        try:
+            response = await self._dns.query(ipaddress.ip_address(ip).reverse_pointer, "PTR")
+            for record in response.answers:
+                if record.type == "PTR":
+                    name, ttl = record.value, min(self.ttl, record.ttl)
+                    break
+        except (DNSError, TimeoutError, OSError):
+            pass
+        self._settle(ip, fut, name, ttl, late=fut.done())
+
+    def submit(self, ip: str) -> "concurrent.futures.Future[Optional[str]]":
+        """
+        Start a lookup for ``ip`` without waiting for it.
+
+        Safe to call from any thread. Cached answers, and values that are
+        not IP addresses (such as traceroute's ``"*"``), complete at once.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the name, or None if there is none or the lookup
+            missed its deadline.
+        """
+        fut: "concurrent.futures.Future[Optional[str]]" = concurrent.futures.Future()
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            fut.set_result(None)
+            return fut
+        with self._lock:
+            hit, name = self._cached(ip)
+            if hit:
+                fut.set_result(name)
+                return fut
+            pending = self._inflight.get(ip)
+            if pending is not None:
+                return pending
+            self._inflight[ip] = fut
+            self._start_workers()
+            heapq.heappush(self._deadlines, (time.monotonic() + self.timeout, next(self._tiebreak), ip, fut))
+            self._wakeup.notify()
+            if self.server is None:
+                assert self._executor is not None
+                self._executor.submit(self._system_lookup, ip, fut)
+            else:
+                assert self._loop is not None
+                asyncio.run_coroutine_threadsafe(self._dns_lookup(ip, fut), self._loop)
+        return fut
+
+    async def lookup(self, ip: str) -> Optional[str]:
+        """Return the name for ``ip``, or None, from any event loop."""
+        # Shielded: one caller giving up must not cancel a shared lookup
+        return await asyncio.shield(asyncio.wrap_future(self.submit(ip)))
+
+    async def lookup_many(self, ips: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve many addresses concurrently.
+
+        Returns
+        -------
+        dict
+            ``{ip: name or None}`` for each distinct address.
+        """
+        unique = list(dict.fromkeys(ips))
+        names = await asyncio.gather(*(self.lookup(ip) for ip in unique))
+        return dict(zip(unique, names))
+
+    def resolve_many(self, ips: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Blocking :meth:`lookup_many`; returns within about one ``timeout``.
+        """
+        futures = {ip: self.submit(ip) for ip in dict.fromkeys(ips)}
+        return {ip: fut.result() for ip, fut in futures.items()}
+
+    def forget(self, ip: Optional[str] = None) -> None:
+        """Drop the cached name for ``ip``, or every cached name if None."""
+        with self._lock:
+            if ip is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(ip, None)
+
+    def close(self) -> None:
+        """
+        Stop the worker threads; outstanding lookups complete with None.
+
+        A later lookup starts new workers.
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+            reaper, executor, loop, loop_thread, dns = self._reaper, self._executor, self._loop, self._loop_thread, self._dns
+            self._reaper = self._executor = self._loop = self._loop_thread = self._dns = None
+            for _when, _n, _ip, fut in self._deadlines:
+                if not fut.done():
+                    fut.set_result(None)
+            self._deadlines.clear()
+            self._inflight.clear()
+            self._started.clear()
+        if reaper is not None:
+            reaper.join()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if loop is not None:
+            def stop() -> None:
+                if dns is not None:
+                    dns.close()
+                loop.stop()
+
+            loop.call_soon_threadsafe(stop)
+            loop_thread.join()
+            loop.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Shared default instance for the diagnostics package
+reverse_resolver = ReverseResolver()
@@ -0,0 +1,251 @@
+"""
+resolver.py
+
+Shared, bounded host-resolution cache for the diagnostics tools.
+
+:class:`ResolverCache` wraps ``getaddrinfo`` with positive and negative
+caching: successful lookups are kept for ``ttl`` seconds (or the record TTL
+when one is supplied through :meth:`ResolverCache.put`), failures for
+``negative_ttl`` seconds (only answers that the name does not exist;
+transient errors such as ``EAI_AGAIN`` are retried), and the least recently
+used entries are evicted beyond ``max_entries``. Concurrent async lookups of the same name share a
+single query. IP literals are returned without touching the cache. The
+module-level ``resolver_cache`` is shared by ping, traceroute and the port
+scanners, so monitoring the same hostnames repeatedly costs one DNS query
+per TTL instead of one or more per probe.
+
+Example:
+    from gatenet.diagnostics.resolver import resolver_cache
+    family, address = resolver_cache.resolve("example.com")
+"""
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Address = Tuple[int, str]
+
+# Answers that the name has no address; anything else (EAI_AGAIN, EAI_FAIL, ...) may pass
+_PERMANENT_ERRORS = {socket.EAI_NONAME} | ({socket.EAI_NODATA} if hasattr(socket, "EAI_NODATA") else set())
+
+
+def _literal(host: str, family: int) -> Optional[Address]:
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+    ip_family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+    if family not in (socket.AF_UNSPEC, ip_family):
+        raise socket.gaierror(socket.EAI_FAMILY, "Address family mismatch")
+    return ip_family, str(ip)
+
+
+def sockaddr(family: int, address: str) -> Tuple[Any, ...]:
+    """
+    Return the socket address for a resolved ``(family, address)``.
+
+    IPv6 addresses come back as the full 4-tuple so a scope such as
+    ``fe80::1%eth0`` survives into ``connect()``; the port is left at 0.
+    """
+    if family != socket.AF_INET6:
+        return (address, 0)
+    # Numeric only: parses the literal and its scope, never queries DNS
+    return socket.getaddrinfo(address, 0, family, socket.SOCK_STREAM, 0, socket.AI_NUMERICHOST)[0][4]
+
+
+class ResolverCache:
+    """
+    TTL cache in front of ``getaddrinfo``.
+
+    The cache is thread-safe and can be shared between sync and async
+    callers.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        Seconds a successful lookup is reused when no record TTL is known
+        (default: 300).
+    negative_ttl : float, optional
+        Seconds a lookup of a non-existent name is remembered (default: 30).
+    max_entries : int, optional
+        Maximum number of cached names (default: 4096).
+
+    Example
+    -------
+    >>> cache = ResolverCache(ttl=60)
+    >>> cache.put("gateway.lan", ["192.168.1.1"])
+    >>> cache.resolve("gateway.lan")
+    (<AddressFamily.AF_INET: 2>, '192.168.1.1')
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 30.0, max_entries: int = 4096) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (name, family) -> (expiry, addresses or None for a cached failure, errno)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Optional[List[Address]], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Futures belong to one event loop, so lookups are shared per (loop, name, family)
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str, int], "asyncio.Future[List[Address]]"] = {}
+
+    @staticmethod
+    def _key(host: str, family: int) -> Tuple[str, int]:
+        return host.lower().rstrip("."), family
+
+    def _get(self, key: Tuple[str, int]) -> Optional[List[Address]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        expiry, addresses, err = entry
+        if addresses is None:
+            raise socket.gaierror(err, f"Name resolution failed for {key[0]} (cached)")
+        return addresses
+
+    def _store(self, key: Tuple[str, int], addresses: Optional[List[Address]], ttl: float, err: int = 0) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, addresses, err)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _addresses(infos: Sequence[tuple]) -> List[Address]:
+        seen: List[Address] = []
+        for family, _type, _proto, _name, info in infos:
+            host = info[0]
+            # Keep the scope of link-local answers, which the bare address loses
+            if family == socket.AF_INET6 and info[3] and "%" not in host:
+                host = f"{host}%{info[3]}"
+            address = (family, host)
+            if address not in seen:
+                seen.append(address)
+        return seen
+
+    def _fail(self, key: Tuple[str, int], exc: BaseException) -> socket.gaierror:
+        err = exc.errno if isinstance(exc, OSError) and exc.errno else socket.EAI_NONAME
+        # Transient failures are retried on the next lookup instead of for negative_ttl
+        if err in _PERMANENT_ERRORS:
+            self._store(key, None, self.negative_ttl, err)
+        return exc if isinstance(exc, socket.gaierror) else socket.gaierror(err, str(exc))
+
+    def resolve_all(self, host: str, family: int = socket.AF_UNSPEC) -> List[Address]:
+        """
+        Return every ``(family, address)`` for ``host``, resolving if needed.
+
+        Raises
+        ------
+        socket.gaierror
+            If the name does not resolve (possibly a cached failure).
+        """
+        literal = _literal(host, family)
+        if literal is not None:
+            return [literal]
+        key = self._key(host, family)
+        addresses = self._get(key)
+        if addresses is not None:
+            return addresses
+        try:
+            addresses = self._addresses(socket.getaddrinfo(host, None, family, socket.SOCK_STREAM))
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f"No addresses for {host}")
+        except (OSError, UnicodeError) as exc:
+            raise self._fail(key, exc) from None
+        self._store(key, addresses, self.ttl)
+        return addresses
+
+    def resolve(self, host: str, family: int = socket.AF_UNSPEC) -> Address:
+        """
+        Return the preferred ``(family, address)`` for ``host``.
+
+        Raises
+        ------
+        socket.gaierror
+            If the name does not resolve (possibly a cached failure).
+        """
+        return self.resolve_all(host, family)[0]
+
+    async def resolve_all_async(self, host: str, family: int = socket.AF_UNSPEC) -> List[Address]:
+        """Async :meth:`resolve_all`; concurrent lookups of one name share a query."""
+        literal = _literal(host, family)
+        if literal is not None:
+            return [literal]
+        key = self._key(host, family)
+        addresses = self._get(key)
+        if addresses is not None:
+            return addresses
+        loop = asyncio.get_running_loop()
+        flight = (loop,) + key
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        fut: "asyncio.Future[List[Address]]" = loop.create_future()
+        self._inflight[flight] = fut
+        try:
+            try:
+                addresses = self._addresses(await loop.getaddrinfo(host, None, family=family, type=socket.SOCK_STREAM))
+                if not addresses:
+                    raise socket.gaierror(socket.EAI_NONAME, f"No addresses for {host}")
+            except (OSError, UnicodeError) as exc:
+                error = self._fail(key, exc)
+                fut.set_exception(error)
+                # Mark retrieved so waiter-less failures don't log "never retrieved"
+                fut.exception()
+                raise error from None
+            self._store(key, addresses, self.ttl)
+            fut.set_result(addresses)
+            return addresses
+        finally:
+            if not fut.done():
+                fut.cancel()
+            self._inflight.pop(flight, None)
+
+    async def resolve_async(self, host: str, family: int = socket.AF_UNSPEC) -> Address:
+        """Async :meth:`resolve`."""
+        return (await self.resolve_all_async(host, family))[0]
+
+    def put(self, host: str, addresses: Sequence[str], ttl: Optional[float] = None, family: int = socket.AF_UNSPEC) -> None:
+        """
+        Seed the cache, e.g. with records whose TTL is known.
+
+        Parameters
+        ----------
+        host : str
+            Hostname.
+        addresses : sequence of str
+            IP addresses for the name.
+        ttl : float, optional
+            Record TTL in seconds (default: the cache's ``ttl``).
+        family : int, optional
+            Family the entry answers lookups for (default: AF_UNSPEC).
+        """
+        entries = [(socket.AF_INET if ipaddress.ip_address(a).version == 4 else socket.AF_INET6, a) for a in addresses]
+        self._store(self._key(host, family), entries, self.ttl if ttl is None else ttl)
+
+    def forget(self, host: Optional[str] = None) -> None:
+        """Drop cached entries for ``host`` (all families), or everything if None."""
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+                return
+            name = host.lower().rstrip(".")
+            for key in [k for k in self._entries if k[0] == name]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared default cache for the diagnostics package
+resolver_cache = ResolverCache()
@@ -0,0 +1,152 @@
+"""
+rtt.py
+
+Per-host round-trip-time estimation for adaptive timeouts.
+
+:class:`RTTEstimator` keeps a smoothed RTT (SRTT) and RTT variance (RTTVAR)
+per host using the same update rules TCP uses for its retransmission timer
+(RFC 6298), and turns them into a timeout of ``SRTT + K * RTTVAR`` clamped
+between a floor and the caller's configured timeout. The module-level
+``rtt_estimator`` is shared by the port scanners, ping and traceroute,
+which all key it by the host's resolved address, so what one tool learns
+about a host shortens the next tool's waits.
+
+Example:
+    from gatenet.diagnostics.rtt import rtt_estimator
+    rtt_estimator.observe("192.168.1.1", 0.0008)
+    rtt_estimator.timeout("192.168.1.1", 2.0)  # -> 0.1 (the floor)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class RTTEstimator:
+    """
+    SRTT/RTTVAR estimator keyed by host.
+
+    All times are in seconds. The estimator is thread-safe and keeps at most
+    ``max_hosts`` entries, discarding the least recently used.
+
+    Parameters
+    ----------
+    alpha : float, optional
+        Gain applied to new samples when updating SRTT (default: 1/8).
+    beta : float, optional
+        Gain applied when updating RTTVAR (default: 1/4).
+    k : float, optional
+        Number of RTTVARs added to SRTT to form the timeout (default: 4).
+    min_timeout : float, optional
+        Lowest timeout ever returned, absorbing scheduler jitter (default: 0.1).
+    max_hosts : int, optional
+        Maximum number of hosts tracked (default: 65536).
+
+    Example
+    -------
+    >>> est = RTTEstimator(min_timeout=0.01)
+    >>> est.observe("10.0.0.1", 0.020)
+    >>> round(est.timeout("10.0.0.1", 2.0), 3)
+    0.06
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.125,
+        beta: float = 0.25,
+        k: float = 4.0,
+        min_timeout: float = 0.1,
+        max_hosts: int = 65536,
+    ) -> None:
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.min_timeout = min_timeout
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, Tuple[float, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, host: str, rtt: float) -> None:
+        """
+        Feed a measured round-trip time for ``host``.
+
+        Parameters
+        ----------
+        host : str
+            Host the sample was measured against.
+        rtt : float
+            Round-trip time in seconds.
+        """
+        if rtt < 0:
+            return
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                srtt, rttvar, samples = rtt, rtt / 2, 1
+            else:
+                srtt, rttvar, samples = entry
+                rttvar = (1 - self.beta) * rttvar + self.beta * abs(srtt - rtt)
+                srtt = (1 - self.alpha) * srtt + self.alpha * rtt
+                samples += 1
+            self._hosts[host] = (srtt, rttvar, samples)
+            self._hosts.move_to_end(host)
+            if len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+
+    def timeout(self, host: str, default: float, min_timeout: Optional[float] = None) -> float:
+        """
+        Return the timeout to use for the next probe to ``host``.
+
+        Parameters
+        ----------
+        host : str
+            Target host.
+        default : float
+            Timeout used for unknown hosts, and the upper bound for known ones.
+        min_timeout : float, optional
+            Per-call floor overriding the estimator's ``min_timeout``.
+
+        Returns
+        -------
+        float
+            Timeout in seconds.
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+        if entry is None:
+            return default
+        srtt, rttvar, _samples = entry
+        floor = self.min_timeout if min_timeout is None else min_timeout
+        return min(default, max(floor, srtt + self.k * rttvar))
+
+    def get(self, host: str) -> Optional[Dict[str, float]]:
+        """
+        Return the current estimate for ``host``.
+
+        Returns
+        -------
+        dict or None
+            ``{"srtt": ..., "rttvar": ..., "samples": ...}`` in seconds, or
+            None if the host has no samples.
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+        if entry is None:
+            return None
+        srtt, rttvar, samples = entry
+        return {"srtt": srtt, "rttvar": rttvar, "samples": samples}
+
+    def forget(self, host: Optional[str] = None) -> None:
+        """Drop the estimate for ``host``, or for every host if None."""
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host, None)
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+# Shared default estimator for the diagnostics package
+rtt_estimator = RTTEstimator()
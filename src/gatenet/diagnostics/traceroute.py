@@ -1,6 +1,579 @@
+import asyncio
+import concurrent.futures
+import math
+import select
 import socket
+import struct
 import time
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
+
+from gatenet.diagnostics.icmp import (
+    ICMP_DEST_UNREACHABLE,
+    ICMP_ECHO_REPLY,
+    ICMP_ECHO_REQUEST,
+    _RAW_IDENTS,
+    _SO_TIMESTAMPNS,
+    _TIMESPEC,
+    _checksum,
+    parse_icmp_quote,
+)
+from gatenet.diagnostics.rdns import reverse_resolver
+from gatenet.diagnostics.resolver import resolver_cache
+from gatenet.diagnostics.rtt import rtt_estimator
+
+BASE_PORT = 33434  # Default port used by traceroute
+_RECV_BUFFER = 1 << 20
+# How often streaming traces check for finished hop-name lookups
+_NAME_POLL = 0.05
+# Distinct payload lengths per flow for Paris UDP probes
+_MAX_PARIS_PAYLOAD = 512
+_ECHO = struct.Struct("!BBHHH")
+
+
+class ProbeReply(NamedTuple):
+    """
+    A reply matched to a traceroute probe.
+
+    ``final`` is True when the probe reached the destination, or was
+    refused with Destination Unreachable, so no later hop will answer.
+    ``flow`` is the flow the probe was sent on.
+    """
+
+    probe: int
+    ttl: int
+    address: str
+    rtt_ms: float
+    icmp_type: int
+    icmp_code: int
+    final: bool
+    flow: int = 0
+
+
+class TraceProber:
+    """
+    Send TTL-limited probes to one destination and match the replies.
+
+    Probes leave on one socket and every reply arrives on one raw ICMP
+    socket, so any number of probes, at any TTLs, can be in flight at once.
+    Routers quote the start of the probe in their Time Exceeded message,
+    and the quoted headers identify which probe, and so which TTL, the
+    reply belongs to.
+
+    By default each UDP probe gets its own destination port (counting up
+    from ``port``) and each ICMP probe its own sequence number, as in
+    classic traceroute. Load balancers hash those fields, so consecutive
+    probes may take different paths. With ``paris=True`` every probe of a
+    flow carries the same flow identifier (Paris traceroute): UDP probes
+    keep their ports and are told apart by payload length, ICMP probes keep
+    their checksum by adjusting a payload word. The ``flow`` passed to
+    :meth:`send` selects the destination port, or the checksum, so
+    different flows can be sent on purpose to enumerate the branches of a
+    load-balanced path.
+
+    Parameters
+    ----------
+    dest_addr : str
+        Destination IPv4 address.
+    protocol : str, optional
+        ``"udp"`` or ``"icmp"`` probes (default: ``"udp"``).
+    port : int, optional
+        First UDP destination port (default: 33434).
+    paris : bool, optional
+        Keep the flow identifier constant within a flow (default: False).
+    source_port : int, optional
+        Local UDP port to send from; 0 picks a free one (default: 0). The
+        port is part of every UDP flow, so probers that share a port (it is
+        bound with ``SO_REUSEADDR``) send the same flows.
+
+    Raises
+    ------
+    PermissionError
+        If raw sockets may not be opened.
+
+    Example
+    -------
+    >>> with TraceProber("127.0.0.1") as prober:
+    ...     probe = prober.send(ttl=1)
+    ...     [(r.address, r.final) for r in prober.receive(1.0)]
+    [('127.0.0.1', True)]
+    """
+
+    def __init__(
+        self,
+        dest_addr: str,
+        protocol: str = "udp",
+        port: int = BASE_PORT,
+        paris: bool = False,
+        source_port: int = 0,
+    ) -> None:
+        assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
+        self.dest_addr = dest_addr
+        self.protocol = protocol
+        self.port = port
+        self.paris = paris
+        try:
+            self.recv_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        except PermissionError:
+            raise PermissionError("Raw sockets require admin/root privileges.")
+        self.recv_sock.setblocking(False)
+        # Replies to a whole burst arrive together; don't drop them at the socket
+        try:
+            self.recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECV_BUFFER)
+        except OSError:
+            pass
+        # Kernel arrival stamps keep RTTs honest while the rest of a burst is still being sent
+        self._kernel_stamps = False
+        if _SO_TIMESTAMPNS is not None:
+            try:
+                self.recv_sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                self._kernel_stamps = True
+            except OSError:
+                pass
+        if protocol == "udp":
+            self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            if source_port:
+                self.send_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                self.send_sock.bind(("0.0.0.0", source_port))
+            except OSError:
+                self.close()
+                raise
+            self.ident = self.send_sock.getsockname()[1]
+            # Varying payload lengths (Paris) or destination ports (classic)
+            self._key_space = _MAX_PARIS_PAYLOAD if paris else 0x10000 - port
+        else:
+            self.send_sock = self.recv_sock
+            self.ident = next(_RAW_IDENTS) & 0xFFFF
+            self._key_space = 0x10000
+        self._ttl = 0
+        self._next_probe = 0
+        # flow (or None when keys are shared by all flows) -> next key counter
+        self._counters: Dict[Optional[int], int] = {}
+        # on-the-wire key -> probe id, and probe id -> (ttl, flow, key, send timestamp ns)
+        self._keys: Dict[Tuple[int, ...], int] = {}
+        self._sent: Dict[int, Tuple[int, int, Tuple[int, ...], int]] = {}
+
+    def __enter__(self) -> "TraceProber":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the sockets."""
+        if self.send_sock is not self.recv_sock:
+            self.send_sock.close()
+        self.recv_sock.close()
+
+    def _now(self) -> int:
+        return time.time_ns() if self._kernel_stamps else time.perf_counter_ns()
+
+    def _wire_key(self, flow: int) -> Tuple[int, ...]:
+        # UDP probes are keyed by (destination port, payload length), ICMP by sequence
+        scope = flow if self.paris and self.protocol == "udp" else None
+        for _ in range(self._key_space):
+            n = self._counters.get(scope, 0)
+            self._counters[scope] = (n + 1) % self._key_space
+            if self.protocol == "icmp":
+                key: Tuple[int, ...] = (n,)
+            elif self.paris:
+                key = (self.port + flow, n)
+            else:
+                key = (self.port + n, 0)
+            if key not in self._keys:
+                return key
+        raise RuntimeError("too many traceroute probes in flight")
+
+    def _echo(self, seq: int, flow: int) -> bytes:
+        if not self.paris:
+            header = _ECHO.pack(ICMP_ECHO_REQUEST, 0, 0, self.ident, seq)
+            return _ECHO.pack(ICMP_ECHO_REQUEST, 0, _checksum(header), self.ident, seq)
+        # Fix the checksum per flow and make it valid with a trailing payload word
+        checksum = 0xFFFF - flow % 0xFFFF
+        header = _ECHO.pack(ICMP_ECHO_REQUEST, 0, checksum, self.ident, seq)
+        return header + struct.pack("!H", _checksum(header))
+
+    def send(self, ttl: int, flow: int = 0) -> int:
+        """
+        Send one probe with the given TTL.
+
+        Parameters
+        ----------
+        ttl : int
+            IP time-to-live of the probe.
+        flow : int, optional
+            Flow to send the probe on; only used with ``paris=True``
+            (default: 0).
+
+        Returns
+        -------
+        int
+            The probe id reported in its :class:`ProbeReply`.
+        """
+        key = self._wire_key(flow)
+        probe = self._next_probe
+        self._next_probe += 1
+        if ttl != self._ttl:
+            self.send_sock.setsockopt(socket.SOL_IP, socket.IP_TTL, ttl)
+            self._ttl = ttl
+        self._keys[key] = probe
+        self._sent[probe] = (ttl, flow, key, self._now())
+        try:
+            if self.protocol == "udp":
+                self.send_sock.sendto(bytes(key[1]), (self.dest_addr, key[0]))
+            else:
+                self.send_sock.sendto(self._echo(key[0], flow), (self.dest_addr, 0))
+        except OSError:
+            self.forget(probe)
+            raise
+        return probe
+
+    def _read_one(self) -> Optional[Tuple[bytes, str, int]]:
+        try:
+            if self._kernel_stamps:
+                data, ancdata, _flags, source = self.recv_sock.recvmsg(2048, socket.CMSG_SPACE(_TIMESPEC.size))
+                for level, kind, value in ancdata:
+                    if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(value) >= _TIMESPEC.size:
+                        sec, nsec = _TIMESPEC.unpack_from(value)
+                        return data, source[0], sec * 1_000_000_000 + nsec
+                return data, source[0], time.time_ns()
+            data, source = self.recv_sock.recvfrom(2048)
+            return data, source[0], time.perf_counter_ns()
+        except (BlockingIOError, InterruptedError):
+            return None
+
+    def _match(self, data: bytes) -> Optional[Tuple[Tuple[int, ...], int, int]]:
+        quote = parse_icmp_quote(data)
+        if quote is None or quote.destination != self.dest_addr:
+            return None
+        if self.protocol == "udp":
+            if quote.type == ICMP_ECHO_REPLY or quote.protocol != socket.IPPROTO_UDP:
+                return None
+            sport, dport, length = struct.unpack_from("!HHH", quote.header)
+            if sport != self.ident:
+                return None
+            key: Tuple[int, ...] = (dport, length - 8 if self.paris else 0)
+        else:
+            if quote.protocol != socket.IPPROTO_ICMP:
+                return None
+            kind, _code, _sum, ident, seq = _ECHO.unpack(quote.header)
+            if ident != self.ident or (quote.type != ICMP_ECHO_REPLY and kind != ICMP_ECHO_REQUEST):
+                return None
+            key = (seq,)
+        return key, quote.type, quote.code
+
+    def receive(self, timeout: float) -> List[ProbeReply]:
+        """
+        Wait up to ``timeout`` seconds for replies and return those queued.
+
+        Each probe is reported at most once; replies that match no
+        outstanding probe are discarded.
+        """
+        replies: List[ProbeReply] = []
+        if not select.select([self.recv_sock], [], [], max(0.0, timeout))[0]:
+            return replies
+        while True:
+            item = self._read_one()
+            if item is None:
+                return replies
+            data, source, received = item
+            matched = self._match(data)
+            if matched is None:
+                continue
+            key, kind, code = matched
+            probe = self._keys.pop(key, None)
+            if probe is None:
+                continue
+            ttl, flow, _key, stamp = self._sent.pop(probe)
+            final = source == self.dest_addr or kind == ICMP_DEST_UNREACHABLE
+            replies.append(ProbeReply(probe, ttl, source, max(received - stamp, 0) / 1e6, kind, code, final, flow))
+
+    def forget(self, probe: int) -> None:
+        """Stop waiting for ``probe``; a late reply to it is ignored."""
+        sent = self._sent.pop(probe, None)
+        if sent is not None:
+            self._keys.pop(sent[2], None)
+
+
+class _Burst:
+    """
+    Probes for every TTL of some flows, sent at once, and the replies still
+    awaited.
+
+    Each flow's path ends at its first final hop; probes past it are
+    dropped. The burst is done once every remaining probe has answered, or
+    ``timeout`` seconds after the last probe was sent.
+    """
+
+    def __init__(
+        self,
+        prober: TraceProber,
+        max_hops: int,
+        probes: int,
+        timeout: float,
+        flows: Iterable[int] = (0,),
+        first_ttl: int = 1,
+    ) -> None:
+        self.prober = prober
+        self.outstanding: Dict[int, Tuple[int, int]] = {}
+        self.last_hop: Dict[int, int] = {}
+        for flow in flows:
+            self.last_hop[flow] = max_hops
+            for ttl in range(first_ttl, max_hops + 1):
+                for _ in range(probes):
+                    self.outstanding[prober.send(ttl, flow)] = (ttl, flow)
+        self.deadline = time.monotonic() + timeout
+
+    @property
+    def done(self) -> bool:
+        return not self.outstanding or time.monotonic() >= self.deadline
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def accept(self, replies: Iterable[ProbeReply]) -> List[ProbeReply]:
+        """Return the replies that belong to the burst, in arrival order."""
+        accepted = []
+        for reply in replies:
+            if self.outstanding.pop(reply.probe, None) is None or reply.ttl > self.last_hop[reply.flow]:
+                continue
+            if reply.final and reply.ttl < self.last_hop[reply.flow]:
+                # Probes past the destination can only repeat its answer
+                self.last_hop[reply.flow] = reply.ttl
+                beyond = [p for p, (t, f) in self.outstanding.items() if f == reply.flow and t > reply.ttl]
+                for probe in beyond:
+                    del self.outstanding[probe]
+                    self.prober.forget(probe)
+            accepted.append(reply)
+        return accepted
+
+    def close(self) -> None:
+        """Stop waiting for the remaining probes."""
+        for probe in self.outstanding:
+            self.prober.forget(probe)
+        self.outstanding.clear()
+
+
+def _probe_ttls(
+    prober: TraceProber,
+    max_hops: int,
+    probes: int,
+    timeout: float,
+    flows: Iterable[int] = (0,),
+    first_ttl: int = 1,
+) -> Iterator[ProbeReply]:
+    """
+    Send ``probes`` probes per flow for every TTL from ``first_ttl`` to
+    ``max_hops`` at once and yield replies as they arrive (see
+    :class:`_Burst`).
+    """
+    burst = _Burst(prober, max_hops, probes, timeout, flows, first_ttl)
+    try:
+        while not burst.done:
+            yield from burst.accept(prober.receive(burst.remaining()))
+    finally:
+        burst.close()
+
+
+class _HopStream:
+    """
+    Assemble hop dicts from one flow's replies and release each hop as
+    soon as it is settled.
+
+    A hop is settled once all its probes have answered and its name lookup
+    has finished. The destination's hop is also held until the hop before
+    it has answered from a router, which proves no earlier TTL reaches the
+    destination. Silent and partly answered hops are settled by
+    :meth:`ready` with ``finished=True``.
+    """
+
+    def __init__(self, max_hops: int, probes: int) -> None:
+        self.max_hops = max_hops
+        self.probes = probes
+        self.hops: Dict[int, dict] = {}
+        self.lookups: Dict[int, "concurrent.futures.Future[Optional[str]]"] = {}
+        self.finals: Dict[int, bool] = {}
+        self.last_hop: Optional[int] = None
+        self.emitted: set = set()
+
+    def add(self, reply: ProbeReply) -> None:
+        hop_info = self.hops.get(reply.ttl)
+        if hop_info is None:
+            hop_info = {"hop": reply.ttl, "ip": reply.address, "hostname": "", "rtt_ms": reply.rtt_ms, "rtts": []}
+            self.hops[reply.ttl] = hop_info
+            self.finals[reply.ttl] = reply.final
+            # Start the name lookup while other hops are still answering
+            self.lookups[reply.ttl] = reverse_resolver.submit(reply.address)
+        hop_info["rtts"].append(reply.rtt_ms)
+        if reply.final and (self.last_hop is None or reply.ttl < self.last_hop):
+            self.last_hop = reply.ttl
+
+    def waiting_on_names(self) -> List["concurrent.futures.Future[Optional[str]]"]:
+        """Lookups of unreleased hops that have not finished yet."""
+        return [f for ttl, f in self.lookups.items() if ttl not in self.emitted and not f.done()]
+
+    def _release(self, ttl: int) -> dict:
+        self.emitted.add(ttl)
+        hop_info = self.hops.get(ttl)
+        if hop_info is None:
+            return {"hop": ttl, "ip": "*", "hostname": "", "rtt_ms": None, "rtts": [None] * self.probes}
+        lookup = self.lookups[ttl]
+        hop_info["hostname"] = (lookup.result() if lookup.done() else None) or ""
+        hop_info["rtts"] += [None] * (self.probes - len(hop_info["rtts"]))
+        return hop_info
+
+    def ready(self, finished: bool = False) -> List[dict]:
+        """Hops settled since the last call, in hop order."""
+        limit = self.last_hop or self.max_hops
+        out = []
+        for ttl in range(1, limit + 1):
+            if ttl in self.emitted:
+                continue
+            if finished:
+                out.append(self._release(ttl))
+                continue
+            hop_info = self.hops.get(ttl)
+            if hop_info is None or len(hop_info["rtts"]) < self.probes or not self.lookups[ttl].done():
+                continue
+            if self.finals[ttl] and ttl > 1 and self.finals.get(ttl - 1, True):
+                continue
+            out.append(self._release(ttl))
+        return out
+
+
+def _resolve_target(host: str) -> str:
+    try:
+        return resolver_cache.resolve(host, socket.AF_INET)[1]
+    except socket.gaierror:
+        raise ValueError(f"Unable to resolve host: {host}")
+
+
+def traceroute_stream(
+    host: str,
+    max_hops: int = 30,
+    timeout: float = 2.0,
+    protocol: str = "udp",
+    probes: int = 1,
+    paris: bool = False,
+) -> Iterator[dict]:
+    """
+    Trace the route to ``host``, yielding each hop as soon as it is known.
+
+    Probes for every TTL are sent at once, as with
+    ``traceroute(..., parallel=True)``, and a hop is yielded once all its
+    probes have answered and its name has been looked up, so the first hops
+    arrive after about one round trip. Silent hops (``"*"``) and hops with
+    lost probes follow when ``timeout`` expires. Hops are therefore not
+    necessarily in hop order; each dict has the same keys as a
+    :func:`traceroute` hop.
+
+    Parameters
+    ----------
+    host : str
+        Hostname or IPv4 address to trace.
+    max_hops : int, optional
+        Highest TTL probed (default: 30).
+    timeout : float, optional
+        Seconds to wait for replies after the probes are sent (default: 2.0).
+    protocol : str, optional
+        ``"udp"`` or ``"icmp"`` probes (default: ``"udp"``).
+    probes : int, optional
+        Probes per hop (default: 1).
+    paris : bool, optional
+        Send every probe on the same flow (default: False).
+
+    Example:
+        >>> from gatenet.diagnostics.traceroute import traceroute_stream
+        >>> for hop in traceroute_stream("google.com"):
+        ...     print(hop["hop"], hop["ip"], hop["rtt_ms"])
+        1 192.168.1.1 2.34
+    """
+    assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
+    if probes < 1:
+        raise ValueError("probes must be at least 1")
+    dest_addr = _resolve_target(host)
+    stream = _HopStream(max_hops, probes)
+    with TraceProber(dest_addr, protocol, paris=paris) as prober:
+        burst = _Burst(prober, max_hops, probes, timeout)
+        try:
+            while not burst.done:
+                wait = burst.remaining()
+                if stream.waiting_on_names():
+                    wait = min(wait, _NAME_POLL)
+                for reply in burst.accept(prober.receive(wait)):
+                    stream.add(reply)
+                    if reply.address == dest_addr:
+                        rtt_estimator.observe(dest_addr, reply.rtt_ms / 1000)
+                yield from stream.ready()
+        finally:
+            burst.close()
+    concurrent.futures.wait(stream.waiting_on_names())
+    yield from stream.ready(finished=True)
+
+
+async def async_traceroute_stream(
+    host: str,
+    max_hops: int = 30,
+    timeout: float = 2.0,
+    protocol: str = "udp",
+    probes: int = 1,
+    paris: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    Asynchronous counterpart of :func:`traceroute_stream`.
+
+    Replies are read from the event loop (no worker thread is held while
+    waiting), so many traces can stream concurrently, e.g. from a web
+    server.
+
+    Example:
+        >>> import asyncio
+        >>> from gatenet.diagnostics.traceroute import async_traceroute_stream
+        >>> async def main():
+        ...     async for hop in async_traceroute_stream("google.com"):
+        ...         print(hop["hop"], hop["ip"])
+        >>> asyncio.run(main())
+        1 192.168.1.1
+    """
+    assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
+    if probes < 1:
+        raise ValueError("probes must be at least 1")
+    try:
+        _family, dest_addr = await resolver_cache.resolve_async(host, socket.AF_INET)
+    except socket.gaierror:
+        raise ValueError(f"Unable to resolve host: {host}")
+    loop = asyncio.get_running_loop()
+    stream = _HopStream(max_hops, probes)
+    with TraceProber(dest_addr, protocol, paris=paris) as prober:
+        readable = asyncio.Event()
+        fd = prober.recv_sock.fileno()
+        loop.add_reader(fd, readable.set)
+        burst = _Burst(prober, max_hops, probes, timeout)
+        try:
+            while not burst.done:
+                wait = burst.remaining()
+                if stream.waiting_on_names():
+                    wait = min(wait, _NAME_POLL)
+                try:
+                    await asyncio.wait_for(readable.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                readable.clear()
+                for reply in burst.accept(prober.receive(0)):
+                    stream.add(reply)
+                    if reply.address == dest_addr:
+                        rtt_estimator.observe(dest_addr, reply.rtt_ms / 1000)
+                for hop_info in stream.ready():
+                    yield hop_info
+        finally:
+            loop.remove_reader(fd)
+            burst.close()
+    waiting = stream.waiting_on_names()
+    if waiting:
+        await asyncio.wait([asyncio.wrap_future(f) for f in waiting])
+    for hop_info in stream.ready(finished=True):
+        yield hop_info
+
 
 def _create_sockets(ttl: int, protocol: str, port: int, timeout: float, bind_ip: str = "127.0.0.1"):
     if protocol == "udp":
@@ -34,13 +607,13 @@ def _receive_probe(recv_sock, start_time):
         rtt = None
     return curr_addr, rtt
 
-def _resolve_hostname(ip: str) -> str:
-    if ip == "*":
-        return ""
-    try:
-        return socket.gethostbyaddr(ip)[0]
-    except Exception:
-        return ""
+def _flush_hops(pending: list, print_output: bool, wait: bool) -> None:
+    """Fill in hop hostnames from finished lookups, printing hops in order."""
+    while pending and (wait or pending[0][1].done()):
+        hop_info, lookup = pending.pop(0)
+        hop_info["hostname"] = lookup.result() or ""
+        if print_output:
+            _print_hop(hop_info["hop"], hop_info["ip"], hop_info["hostname"], hop_info["rtt_ms"])
 
 def _print_hop(ttl: int, curr_addr: str, host_name: str, rtt: Optional[float]):
     display_addr = f"{curr_addr} ({host_name})" if host_name else curr_addr
@@ -51,31 +624,82 @@ def traceroute(
     max_hops: int = 30,
     timeout: float = 2.0,
     protocol: str = "udp",
-    print_output: bool = True
+    print_output: bool = True,
+    parallel: bool = False,
+    probes: int = 1,
+    paris: bool = False,
 ) -> List[dict]:
     """
     Perform a traceroute to the given host using UDP or ICMP.
 
+    By default one probe is sent per hop, waiting for each hop before the
+    next. With ``parallel=True`` the probes for every TTL (``probes`` per
+    hop) are sent at once through a :class:`TraceProber` and matched to
+    their hops as replies arrive, so the whole trace takes about one
+    round trip plus ``timeout`` instead of up to ``max_hops`` timeouts.
+    ``paris=True`` additionally keeps every probe on one flow (Paris
+    traceroute), so per-flow load balancers cannot splice hops of different
+    paths into one; use :func:`multipath_traceroute` to map every branch.
+
+    Hop names are looked up in the background by the shared
+    :data:`~gatenet.diagnostics.rdns.reverse_resolver` while later hops are
+    probed, so slow or missing PTR records do not stall the trace.
+
+    Parameters
+    ----------
+    host : str
+        Hostname or IPv4 address to trace.
+    max_hops : int, optional
+        Highest TTL probed (default: 30).
+    timeout : float, optional
+        Seconds to wait for a hop, or in parallel mode for all hops after
+        the last probe is sent (default: 2.0).
+    protocol : str, optional
+        ``"udp"`` or ``"icmp"`` probes (default: ``"udp"``).
+    print_output : bool, optional
+        Print hops as they complete (default: True).
+    parallel : bool, optional
+        Probe every TTL at once (default: False).
+    probes : int, optional
+        Probes per hop in parallel mode (default: 1).
+    paris : bool, optional
+        Send every probe on the same flow; implies ``parallel``
+        (default: False).
+
+    Returns
+    -------
+    list of dict
+        One dict per hop with ``hop``, ``ip`` (``"*"`` if no reply),
+        ``hostname``, ``rtt_ms`` and ``rtts`` (every probe's RTT in ms,
+        None for lost probes). Stops at the destination.
+
     Example:
         >>> from gatenet.diagnostics.traceroute import traceroute
         >>> hops = traceroute("google.com", protocol="udp", print_output=False)
         >>> for hop in hops:
         ...     print(hop)
-        {'hop': 1, 'ip': '192.168.1.1', 'hostname': 'router.local', 'rtt_ms': 2.34}
+        {'hop': 1, 'ip': '192.168.1.1', 'hostname': 'router.local', 'rtt_ms': 2.34, 'rtts': [2.34]}
     """
     assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
-    try:
-        dest_addr = socket.gethostbyname(host)
-    except socket.gaierror:
-        raise ValueError(f"Unable to resolve host: {host}")
+    dest_addr = _resolve_target(host)
 
-    port = 33434  # Default port used by traceroute
+    port = BASE_PORT
     result = []
+    pending: list = []
 
     if print_output:
         print(f"Traceroute to {host} ({dest_addr}), {max_hops} hops max:")
 
+    if parallel or paris:
+        result = sorted(traceroute_stream(dest_addr, max_hops, timeout, protocol, probes, paris), key=lambda hop: hop["hop"])
+        if print_output:
+            for hop_info in result:
+                _print_hop(hop_info["hop"], hop_info["ip"], hop_info["hostname"], hop_info["rtt_ms"])
+        return result
+
     for ttl in range(1, max_hops + 1):
+        # Hops keep the caller's timeout: routers nearer than the destination
+        # say nothing about how long the farther ones take to answer.
         send_sock, recv_sock = _create_sockets(ttl, protocol, port, timeout)
         start_time = time.time()
         try:
@@ -84,24 +708,168 @@ def traceroute(
         finally:
             send_sock.close()
             recv_sock.close()
-
-        host_name = _resolve_hostname(curr_addr)
+        if rtt is not None and curr_addr == dest_addr:
+            # Only the destination's own replies describe its RTT
+            rtt_estimator.observe(dest_addr, rtt / 1000)
 
         hop_info = {
             "hop": ttl,
             "ip": curr_addr,
-            "hostname": host_name,
-            "rtt_ms": rtt
+            "hostname": "",
+            "rtt_ms": rtt,
+            "rtts": [rtt],
         }
-        if print_output:
-            _print_hop(ttl, curr_addr, host_name, rtt)
-
         result.append(hop_info)
+        pending.append((hop_info, reverse_resolver.submit(curr_addr)))
+        _flush_hops(pending, print_output, wait=False)
 
         if curr_addr == dest_addr:
             break
 
+    _flush_hops(pending, print_output, wait=True)
     return result
 
+
+def _stop_count(interfaces: int, confidence: float) -> int:
+    """
+    Flows that must answer at a hop with ``interfaces`` known next hops
+    before ruling out one more, by the MDA stopping rule.
+    """
+    k = max(interfaces, 1)
+    return math.ceil(math.log((1 - confidence) / (k + 1)) / math.log(k / (k + 1)))
+
+
+def _hop_replies(paths: Dict[int, Dict[int, Tuple[str, float]]], reach: Dict[int, int], ttl: int) -> List[Tuple[str, float]]:
+    # A flow's replies past its own destination hop are just the destination again
+    return [path[ttl] for flow, path in paths.items() if ttl in path and reach.get(flow, ttl) >= ttl]
+
+
+def _print_graph(graph: dict) -> None:
+    print(f"Multipath traceroute to {graph['host']} ({graph['ip']}), {graph['flows']} flows:")
+    for hop in graph["hops"]:
+        for i, node in enumerate(hop["nodes"]):
+            label = f"{node['ip']} ({node['hostname']})" if node["hostname"] else node["ip"]
+            rtt = node["rtt_ms"]
+            print(f"{hop['hop'] if i == 0 else '':>2}  {label:20}  {f'{rtt:.2f} ms' if rtt is not None else '*'}  [{node['flows']} flows]")
+
+
+def multipath_traceroute(
+    host: str,
+    max_hops: int = 30,
+    timeout: float = 2.0,
+    protocol: str = "udp",
+    confidence: float = 0.95,
+    max_flows: int = 64,
+    print_output: bool = True,
+) -> dict:
+    """
+    Map every load-balanced branch of the path to ``host``.
+
+    A multipath detection algorithm (MDA) traceroute over Paris probes:
+    each round sends a batch of new flows through every TTL at once with a
+    :class:`TraceProber`, and every flow's probes keep that flow's
+    identifier, so per-flow load balancers send them down one branch. The
+    responders a flow meets at consecutive TTLs give the edges of the hop
+    graph. Rounds continue until each hop has answered on enough flows to
+    rule out an undiscovered next hop at the requested ``confidence``
+    (6 flows for one next hop, 11 for two, 16 for three, ...), or until
+    ``max_flows`` flows have been used.
+
+    Parameters
+    ----------
+    host : str
+        Hostname or IPv4 address to trace.
+    max_hops : int, optional
+        Highest TTL probed (default: 30).
+    timeout : float, optional
+        Seconds to wait for replies after each round is sent (default: 2.0).
+    protocol : str, optional
+        ``"udp"`` or ``"icmp"`` probes (default: ``"udp"``).
+    confidence : float, optional
+        Probability of having found every next hop (default: 0.95).
+    max_flows : int, optional
+        Upper bound on flows probed (default: 64).
+    print_output : bool, optional
+        Print the graph when done (default: True).
+
+    Returns
+    -------
+    dict
+        ``host``, ``ip``, ``reached`` (whether any flow reached the
+        destination), ``flows`` (flows probed), ``hops`` (one entry per
+        TTL with ``hop`` and ``nodes``, each node a dict of ``ip``,
+        ``hostname``, ``rtt_ms`` (lowest seen) and ``flows``; a hop nobody
+        answered has a single ``"*"`` node) and ``edges`` (dicts of
+        ``hop``, ``from`` and ``to`` linking responders at ``hop`` and
+        ``hop + 1``).
+
+    Example:
+        >>> from gatenet.diagnostics.traceroute import multipath_traceroute
+        >>> graph = multipath_traceroute("example.com", print_output=False)
+        >>> [len(hop["nodes"]) for hop in graph["hops"]]
+        [1, 1, 2, 2, 1, 1]
+    """
+    assert protocol in ("udp", "icmp"), "protocol must be 'udp' or 'icmp'"
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    dest_addr = _resolve_target(host)
+
+    # flow -> ttl -> (responder, rtt_ms)
+    paths: Dict[int, Dict[int, Tuple[str, float]]] = {}
+    reach: Dict[int, int] = {}
+    lookups = {}
+    depth = max_hops
+    flows = 0
+    wanted = _stop_count(1, confidence)
+    with TraceProber(dest_addr, protocol, paris=True) as prober:
+        while flows < min(wanted, max_flows):
+            batch = range(flows, min(wanted, max_flows))
+            flows = batch.stop
+            for flow in batch:
+                paths[flow] = {}
+            for reply in _probe_ttls(prober, depth, 1, timeout, batch):
+                paths[reply.flow][reply.ttl] = (reply.address, reply.rtt_ms)
+                if reply.final:
+                    reach[reply.flow] = min(reach.get(reply.flow, reply.ttl), reply.ttl)
+                if reply.address not in lookups:
+                    lookups[reply.address] = reverse_resolver.submit(reply.address)
+                if reply.address == dest_addr:
+                    rtt_estimator.observe(dest_addr, reply.rtt_ms / 1000)
+            if reach:
+                # Leave room for branches one hop longer than any seen so far
+                depth = min(max_hops, max(reach.values()) + 1)
+            for ttl in range(1, depth + 1):
+                seen = [address for address, _rtt in _hop_replies(paths, reach, ttl)]
+                if seen:
+                    missing = _stop_count(len(set(seen)), confidence) - len(seen)
+                    wanted = max(wanted, flows + missing)
+
+    last = max(reach.values()) if reach else max((max(path, default=0) for path in paths.values()), default=0)
+    hops = []
+    for ttl in range(1, last + 1):
+        nodes: Dict[str, dict] = {}
+        for address, rtt in _hop_replies(paths, reach, ttl):
+            node = nodes.setdefault(address, {"ip": address, "hostname": "", "rtt_ms": rtt, "flows": 0})
+            node["rtt_ms"] = min(node["rtt_ms"], rtt)
+            node["flows"] += 1
+        if not nodes:
+            nodes["*"] = {"ip": "*", "hostname": "", "rtt_ms": None, "flows": 0}
+        hops.append({"hop": ttl, "nodes": list(nodes.values())})
+    edges = []
+    for flow, path in paths.items():
+        for ttl in range(1, min(last, reach.get(flow, last))):
+            if ttl in path and ttl + 1 in path:
+                edge = {"hop": ttl, "from": path[ttl][0], "to": path[ttl + 1][0]}
+                if edge not in edges:
+                    edges.append(edge)
+    for hop in hops:
+        for node in hop["nodes"]:
+            if node["ip"] in lookups:
+                node["hostname"] = lookups[node["ip"]].result() or ""
+    graph = {"host": host, "ip": dest_addr, "reached": bool(reach), "flows": flows, "hops": hops, "edges": edges}
+    if print_output:
+        _print_graph(graph)
+    return graph
+
 # Example usage:
 # traceroute("example.com", bind_ip="192.168.1.1")
\ No newline at end of file
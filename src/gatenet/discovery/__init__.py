@@ -31,16 +31,33 @@ from .ssh import (
     register_detectors,
     clear_detectors,
     get_detectors,
+    enable_service_cache,
+    disable_service_cache,
+    clear_service_cache,
+    service_cache_info,
+    identify_services,
+    load_detector_plugins,
 )
 from .detectors import (
     HTTPDetector,
     FTPDetector,
     SMTPDetector,
+    IMAPDetector,
+    POP3Detector,
+    MQTTDetector,
+    CoAPDetector,
+    SIPDetector,
     PortMappingDetector,
     BannerKeywordDetector,
     GenericServiceDetector,
     FallbackDetector,
 )
+from .banner import (
+    BannerResult,
+    grab_banner,
+    grab_banners,
+    scan_and_fingerprint,
+)
 
 __all__ = [
     "discover_mdns_services",
@@ -53,6 +70,11 @@ __all__ = [
     "HTTPDetector",
     "FTPDetector",
     "SMTPDetector",
+    "IMAPDetector",
+    "POP3Detector",
+    "MQTTDetector",
+    "CoAPDetector",
+    "SIPDetector",
     "PortMappingDetector",
     "BannerKeywordDetector",
     "GenericServiceDetector",
@@ -61,4 +83,14 @@ __all__ = [
     "register_detectors",
     "clear_detectors",
     "get_detectors",
+    "enable_service_cache",
+    "disable_service_cache",
+    "clear_service_cache",
+    "service_cache_info",
+    "identify_services",
+    "load_detector_plugins",
+    "BannerResult",
+    "grab_banner",
+    "grab_banners",
+    "scan_and_fingerprint",
 ]
\ No newline at end of file
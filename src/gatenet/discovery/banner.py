@@ -0,0 +1,342 @@
+"""
+banner.py
+---------
+Concurrent banner grabbing that feeds the service detector registry.
+
+Connects to open ports, optionally sends a protocol probe, reads the reply
+with byte and time caps, and classifies the banners in batches with the
+registered detectors. Chains directly off the port scanner's result stream
+for one-shot scan-and-fingerprint runs.
+
+Public API:
+    - BannerResult
+    - grab_banner
+    - grab_banners
+    - scan_and_fingerprint
+"""
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from gatenet.diagnostics.port_scan import OPEN, ScanResult, scan_network
+from gatenet.utils import COMMON_PORTS
+from .ssh import identify_services
+
+_HTTP_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+
+# Services that wait for the client to speak first, keyed by port.
+CLIENT_FIRST_PROBES: Dict[int, bytes] = {
+    80: _HTTP_PROBE,
+    8000: _HTTP_PROBE,
+    8008: _HTTP_PROBE,
+    8080: _HTTP_PROBE,
+    8888: _HTTP_PROBE,
+    9000: _HTTP_PROBE,
+}
+
+# Sent when a server stays silent after connect; most line-based protocols
+# (and HTTP on non-standard ports) answer a blank request with an error banner.
+GENERIC_PROBE = b"\r\n\r\n"
+
+
+class BannerResult(NamedTuple):
+    """
+    Banner and identified service for one open port.
+
+    Attributes
+    ----------
+    host : str
+        Host the banner was read from.
+    port : int
+        Port the banner was read from.
+    banner : str or None
+        Decoded banner text, or None if the connection failed or the service
+        sent nothing.
+    service : str
+        Service name from the detector registry.
+    """
+
+    host: str
+    port: int
+    banner: Optional[str]
+    service: str
+
+
+async def _read_capped(reader: asyncio.StreamReader, max_bytes: int, deadline: float, idle: float) -> bytes:
+    """Read until ``max_bytes``, EOF, ``deadline`` or ``idle`` seconds without new data."""
+    loop = asyncio.get_running_loop()
+    data = b""
+    while len(data) < max_bytes:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        wait = min(remaining, idle) if data else remaining
+        try:
+            chunk = await asyncio.wait_for(reader.read(max_bytes - len(data)), wait)
+        except asyncio.TimeoutError:
+            break
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+async def grab_banner(
+    host: str,
+    port: int,
+    probe: Optional[bytes] = None,
+    timeout: float = 2.0,
+    read_timeout: float = 2.0,
+    wait: float = 0.5,
+    max_bytes: int = 1024,
+) -> Optional[str]:
+    """
+    Connect to ``host:port`` and read its banner.
+
+    Server-first protocols (SSH, FTP, SMTP, ...) are read straight away. If
+    ``probe`` is given it is sent right after connecting; otherwise, if the
+    server stays silent for ``wait`` seconds, :data:`GENERIC_PROBE` is sent to
+    coax a reply.
+
+    Parameters
+    ----------
+    host : str
+        Target host.
+    port : int
+        Target port.
+    probe : bytes, optional
+        Payload to send immediately after connecting.
+    timeout : float, optional
+        Connect timeout in seconds (default: 2.0).
+    read_timeout : float, optional
+        Total time allowed for reading in seconds (default: 2.0).
+    wait : float, optional
+        How long to wait for a server-first banner before probing (default: 0.5).
+    max_bytes : int, optional
+        Maximum number of bytes read (default: 1024).
+
+    Returns
+    -------
+    str or None
+        Decoded, stripped banner, or None if nothing was received.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.discovery.banner import grab_banner
+    >>> asyncio.run(grab_banner("127.0.0.1", 22))
+    'SSH-2.0-OpenSSH_8.9p1 Ubuntu-3'
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (asyncio.TimeoutError, OSError):
+        return None
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + read_timeout
+    try:
+        if probe is not None:
+            writer.write(probe)
+            await writer.drain()
+            data = await _read_capped(reader, max_bytes, deadline, idle=0.2)
+        else:
+            data = await _read_capped(reader, max_bytes, min(deadline, loop.time() + wait), idle=0.2)
+            if not data and not reader.at_eof():
+                writer.write(GENERIC_PROBE)
+                await writer.drain()
+                data = await _read_capped(reader, max_bytes, deadline, idle=0.2)
+    except OSError:
+        data = b""
+    finally:
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+    text = data.decode("utf-8", errors="replace").strip()
+    return text or None
+
+
+def _classify(batch: List[Tuple[str, int, Optional[str]]]) -> List[BannerResult]:
+    services = identify_services((port, banner or "") for _host, port, banner in batch)
+    return [BannerResult(host, port, banner, service) for (host, port, banner), service in zip(batch, services)]
+
+
+async def grab_banners(
+    targets: Union[Iterable[Any], AsyncIterator[Any]],
+    concurrency: int = 64,
+    probes: Optional[Dict[int, bytes]] = None,
+    timeout: float = 2.0,
+    read_timeout: float = 2.0,
+    wait: float = 0.5,
+    max_bytes: int = 1024,
+    batch_size: int = 64,
+) -> AsyncIterator[BannerResult]:
+    """
+    Grab banners concurrently and yield identified services as they complete.
+
+    ``targets`` may be a sync or async iterable of ``(host, port)`` pairs or
+    :class:`~gatenet.diagnostics.port_scan.ScanResult` records; scan results
+    that are not open are skipped, so the output of
+    :func:`~gatenet.diagnostics.port_scan.scan_network` can be passed in
+    directly. Finished banners are classified in batches of up to
+    ``batch_size`` with :func:`~gatenet.discovery.ssh.identify_services`
+    whenever they are available, keeping detector overhead low without
+    delaying results; each batch emits one ``DISCOVERY_BATCH_DETECT`` event.
+
+    Parameters
+    ----------
+    targets : iterable or async iterable
+        ``(host, port)`` pairs or ``ScanResult`` records.
+    concurrency : int, optional
+        Maximum number of banner connections open at once (default: 64).
+    probes : dict, optional
+        Extra ``{port: payload}`` client-first probes, merged over
+        :data:`CLIENT_FIRST_PROBES`.
+    timeout, read_timeout, wait, max_bytes
+        Passed to :func:`grab_banner`.
+    batch_size : int, optional
+        Maximum number of banners classified together (default: 64).
+
+    Yields
+    ------
+    BannerResult
+        One record per open target, in completion order.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.discovery.banner import grab_banners
+    >>> async def main():
+    ...     async for r in grab_banners([("127.0.0.1", 22), ("127.0.0.1", 80)]):
+    ...         print(r.port, r.service)
+    >>> asyncio.run(main())
+    """
+    port_probes = dict(CLIENT_FIRST_PROBES)
+    if probes:
+        port_probes.update(probes)
+    pending: "asyncio.Queue[Optional[Tuple[str, int]]]" = asyncio.Queue(maxsize=concurrency)
+    grabbed: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max(concurrency, batch_size))
+    done = object()
+    errors: List[BaseException] = []
+
+    async def worker() -> None:
+        while True:
+            target = await pending.get()
+            if target is None:
+                return
+            host, port = target
+            banner = await grab_banner(host, port, port_probes.get(port), timeout, read_timeout, wait, max_bytes)
+            await grabbed.put((host, port, banner))
+
+    async def submit(item: Any) -> None:
+        if isinstance(item, ScanResult):
+            if item.state != OPEN:
+                return
+            await pending.put((item.host, item.port))
+        else:
+            await pending.put((item[0], item[1]))
+
+    async def run() -> None:
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        try:
+            if hasattr(targets, "__aiter__"):
+                async for item in targets:
+                    await submit(item)
+            else:
+                for item in targets:
+                    await submit(item)
+            for _ in workers:
+                await pending.put(None)
+            await asyncio.gather(*workers)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            for task in workers:
+                task.cancel()
+            aclose = getattr(targets, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        await grabbed.put(done)
+
+    task = asyncio.ensure_future(run())
+    try:
+        finished = False
+        while not finished:
+            batch = [await grabbed.get()]
+            while len(batch) < batch_size and not grabbed.empty():
+                batch.append(grabbed.get_nowait())
+            if batch[-1] is done:
+                # run() enqueues the sentinel last, after every worker has finished.
+                batch.pop()
+                finished = True
+                if not batch:
+                    break
+            for result in _classify(batch):
+                yield result
+        if errors:
+            raise errors[0]
+    finally:
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+async def scan_and_fingerprint(
+    targets: Union[str, Iterable[str]],
+    ports: List[int] = COMMON_PORTS,
+    timeout: float = 1.0,
+    concurrency: int = 512,
+    banner_concurrency: int = 64,
+    banner_timeout: float = 2.0,
+    max_bytes: int = 1024,
+) -> AsyncIterator[BannerResult]:
+    """
+    Port-scan ``targets`` and fingerprint every open port in one pass.
+
+    Open ports flow from :func:`~gatenet.diagnostics.port_scan.scan_network`
+    straight into :func:`grab_banners`, so banner grabbing starts while the
+    sweep is still running.
+
+    Parameters
+    ----------
+    targets : str or iterable of str
+        CIDR block, address range, single host, or an iterable of these.
+    ports : list of int, optional
+        Ports to scan (default: ``COMMON_PORTS``).
+    timeout : float, optional
+        Maximum connect timeout for the port scan in seconds (default: 1.0).
+    concurrency : int, optional
+        Maximum number of scan connects in flight (default: 512).
+    banner_concurrency : int, optional
+        Maximum number of banner connections open at once (default: 64).
+    banner_timeout : float, optional
+        Connect and read budget for each banner in seconds (default: 2.0).
+    max_bytes : int, optional
+        Maximum number of banner bytes read per port (default: 1024).
+
+    Yields
+    ------
+    BannerResult
+        One record per open port.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from gatenet.discovery.banner import scan_and_fingerprint
+    >>> async def main():
+    ...     async for r in scan_and_fingerprint("192.168.1.0/24", ports=[22, 80]):
+    ...         print(r.host, r.port, r.service)
+    >>> asyncio.run(main())
+    """
+    scan = scan_network(targets, ports, timeout=timeout, concurrency=concurrency)
+    results = grab_banners(
+        scan,
+        concurrency=banner_concurrency,
+        timeout=banner_timeout,
+        read_timeout=banner_timeout,
+        max_bytes=max_bytes,
+    )
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
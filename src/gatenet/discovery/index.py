@@ -0,0 +1,118 @@
+"""
+index.py
+--------
+Compiled, single-pass dispatch over the service detector chain.
+
+Detectors may declare the ``ports`` they can match on and the banner
+``keywords`` one of which must be present for them to match (see
+:class:`~gatenet.service_detectors.ServiceDetector`). :class:`DetectorIndex`
+turns those declarations into a port -> detector index and one combined
+keyword regex, so identifying a banner scans it once and only calls the
+detectors that could possibly match, in registry order. Detectors that
+declare neither are always called, so custom detectors keep working
+unchanged.
+
+Public API:
+    - DetectorIndex
+"""
+import re
+from typing import Dict, FrozenSet, List, Optional, Pattern, Sequence, Set
+
+from gatenet.service_detectors import ServiceDetector
+
+
+class DetectorIndex:
+    """
+    Candidate-detector index for a fixed detector chain.
+
+    The index is immutable; build a new one whenever the chain changes (the
+    registry in :mod:`gatenet.discovery.ssh` does this automatically).
+
+    Parameters
+    ----------
+    detectors : sequence of ServiceDetector
+        Detector chain in priority order.
+
+    Example
+    -------
+    >>> from gatenet.discovery import get_detectors
+    >>> from gatenet.discovery.index import DetectorIndex
+    >>> index = DetectorIndex(get_detectors())
+    >>> index.identify(2222, "ssh-2.0-openssh_9.6")
+    'OpenSSH 9.6'
+    """
+
+    def __init__(self, detectors: Sequence[ServiceDetector]) -> None:
+        self.detectors: List[ServiceDetector] = list(detectors)
+        always: Set[int] = set()
+        by_port: Dict[int, Set[int]] = {}
+        by_keyword: Dict[str, Set[int]] = {}
+        for position, detector in enumerate(self.detectors):
+            ports = getattr(detector, "ports", None)
+            keywords = getattr(detector, "keywords", None)
+            if ports is None and keywords is None:
+                always.add(position)
+                continue
+            for port in ports or ():
+                by_port.setdefault(port, set()).add(position)
+            for keyword in keywords or ():
+                if keyword:
+                    by_keyword.setdefault(keyword.lower(), set()).add(position)
+        self._always: FrozenSet[int] = frozenset(always)
+        self._by_port: Dict[int, FrozenSet[int]] = {port: frozenset(p | always) for port, p in by_port.items()}
+        # A lookahead alternation reports a match at every offset where some
+        # keyword starts, but only the first (longest) alternative per offset.
+        # Shorter keywords that are prefixes of it are folded into its hits.
+        ordered = sorted(by_keyword, key=len, reverse=True)
+        self._hits: Dict[str, FrozenSet[int]] = {
+            keyword: frozenset().union(*(by_keyword[k] for k in ordered if keyword.startswith(k)))
+            for keyword in ordered
+        }
+        self._pattern: Optional[Pattern[str]] = (
+            re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))") if ordered else None
+        )
+
+    def candidates(self, port: int, banner: str) -> List[ServiceDetector]:
+        """
+        Return the detectors that could match, in chain order.
+
+        Parameters
+        ----------
+        port : int
+            Port number.
+        banner : str
+            Lower-cased banner text.
+
+        Returns
+        -------
+        list of ServiceDetector
+            Candidate detectors.
+        """
+        positions = self._by_port.get(port, self._always)
+        if self._pattern is not None and banner:
+            matched = {m.group(1) for m in self._pattern.finditer(banner)}
+            if matched:
+                positions = positions.union(*(self._hits[k] for k in matched))
+        return [self.detectors[i] for i in sorted(positions)]
+
+    def identify(self, port: int, banner: str) -> Optional[str]:
+        """
+        Run the candidate detectors and return the first result.
+
+        Parameters
+        ----------
+        port : int
+            Port number.
+        banner : str
+            Lower-cased banner text.
+
+        Returns
+        -------
+        str or None
+            The first non-empty detector result, or None.
+        """
+        for detector in self.candidates(port, banner):
+            result = detector.detect(port, banner)
+            if result:
+                return result
+        return None
@@ -1,4 +1,8 @@
-from typing import Optional, Iterable, List
+import bisect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Iterable, List, Set, Tuple
 from gatenet.core import hooks, events
 from .detectors import (
     ServiceDetector,
@@ -6,42 +10,102 @@ from .detectors import (
     HTTPDetector,
     FTPDetector,
     SMTPDetector,
+    IMAPDetector,
+    POP3Detector,
+    MQTTDetector,
+    CoAPDetector,
+    SIPDetector,
     PortMappingDetector,
     BannerKeywordDetector,
     GenericServiceDetector,
     FallbackDetector,
 )
+from .index import DetectorIndex
 
-_REGISTRY: List[ServiceDetector] = [
-    SSHDetector(),
-    HTTPDetector(), 
-    FTPDetector(),
-    SMTPDetector(),
-    PortMappingDetector(),
-    BannerKeywordDetector(),
-    GenericServiceDetector(),
-    FallbackDetector(),  # Always returns a result
-]
-
-def register_detector(detector: ServiceDetector, *, append: bool = True) -> None:
+# Entry point group scanned by load_detector_plugins()
+DETECTOR_ENTRY_POINT_GROUP = "gatenet.service_detectors"
+
+# Priorities for detectors that don't declare one
+_PREPEND_PRIORITY = 25  # after SSH and HTTP
+_APPEND_PRIORITY = 900  # before the fallback
+
+def _default_detectors() -> List[ServiceDetector]:
+    return [
+        SSHDetector(),
+        HTTPDetector(),
+        FTPDetector(),
+        SMTPDetector(),
+        IMAPDetector(),
+        POP3Detector(),
+        PortMappingDetector(),
+        MQTTDetector(),
+        CoAPDetector(),
+        SIPDetector(),
+        BannerKeywordDetector(),
+        GenericServiceDetector(),
+        FallbackDetector(),  # Always returns a result
+    ]
+
+# The detector chain, kept sorted by _PRIORITIES (parallel list)
+_REGISTRY: List[ServiceDetector] = _default_detectors()
+_PRIORITIES: List[int] = [d.priority for d in _REGISTRY]
+_LOADED_PLUGINS: Set[str] = set()
+
+# Compiled view of _REGISTRY, rebuilt lazily after every registry change
+_INDEX: Optional[DetectorIndex] = None
+
+# Opt-in (port, banner) -> service memo; None while disabled
+_CACHE: "Optional[OrderedDict[Tuple[int, str], str]]" = None
+_CACHE_MAXSIZE = 0
+_CACHE_HITS = 0
+_CACHE_MISSES = 0
+_CACHE_LOCK = threading.Lock()
+
+def _invalidate_index() -> None:
+    global _INDEX
+    _INDEX = None
+    with _CACHE_LOCK:
+        if _CACHE is not None:
+            _CACHE.clear()
+
+def _get_index() -> DetectorIndex:
+    global _INDEX
+    index = _INDEX
+    if index is None:
+        index = _INDEX = DetectorIndex(_REGISTRY)
+    return index
+
+def register_detector(detector: ServiceDetector, *, append: bool = True, priority: Optional[int] = None) -> None:
     """Register a custom service detector.
 
+    The chain is ordered by priority (lower runs first). The built-in
+    detectors use 10 (SSH) through 120 (generic indicators), and the
+    fallback detector 1000.
+
     Parameters
     ----------
     detector : ServiceDetector
         The detector instance to add to the chain.
     append : bool, optional
-        If True, add to the end; if False, insert near the beginning (after SSH/HTTP).
+        For detectors without a priority: if True, add to the end (before the
+        fallback); if False, insert near the beginning (after SSH/HTTP).
+    priority : int, optional
+        Explicit priority, overriding ``detector.priority``.
     """
-    if append:
-        # Keep fallback last
-        fallback = _REGISTRY.pop() if _REGISTRY and isinstance(_REGISTRY[-1], FallbackDetector) else None
-        _REGISTRY.append(detector)
-        if fallback:
-            _REGISTRY.append(fallback)
+    if priority is None:
+        priority = detector.priority
+    if priority is None:
+        if append:
+            priority = _APPEND_PRIORITY
+            idx = bisect.bisect_right(_PRIORITIES, priority)
+        else:
+            priority = _PREPEND_PRIORITY
+            idx = bisect.bisect_left(_PRIORITIES, priority)
     else:
-        insert_idx = 2  # after SSH, HTTP
-        _REGISTRY.insert(insert_idx, detector)
+        idx = bisect.bisect_right(_PRIORITIES, priority)
+    _REGISTRY.insert(idx, detector)
+    _PRIORITIES.insert(idx, priority)
+    _invalidate_index()
 
 def register_detectors(detectors: Iterable[ServiceDetector]) -> None:
     for d in detectors:
@@ -51,25 +115,246 @@ def clear_detectors(keep_defaults: bool = True) -> None:
     """Clear the registry.
 
     If keep_defaults is True, restore built-ins; otherwise leave empty.
+    Plugins must be loaded again with :func:`load_detector_plugins`.
     """
-    global _REGISTRY
-    if keep_defaults:
-        _REGISTRY = [
-            SSHDetector(),
-            HTTPDetector(),
-            FTPDetector(),
-            SMTPDetector(),
-            PortMappingDetector(),
-            BannerKeywordDetector(),
-            GenericServiceDetector(),
-            FallbackDetector(),
-        ]
-    else:
-        _REGISTRY = []
+    global _REGISTRY, _PRIORITIES
+    _REGISTRY = _default_detectors() if keep_defaults else []
+    _PRIORITIES = [d.priority for d in _REGISTRY]
+    _LOADED_PLUGINS.clear()
+    _invalidate_index()
+
+def load_detector_plugins(group: str = DETECTOR_ENTRY_POINT_GROUP) -> List[ServiceDetector]:
+    """Register detectors advertised by installed packages.
+
+    Each entry point in ``group`` may refer to a :class:`ServiceDetector`
+    subclass (instantiated without arguments), an instance, or an iterable
+    of either. Detectors are placed by their declared ``priority``. Entry
+    points that fail to load are logged and skipped; ones already loaded
+    are not registered twice.
+
+    Parameters
+    ----------
+    group : str, optional
+        Entry point group (default: ``"gatenet.service_detectors"``).
+
+    Returns
+    -------
+    list of ServiceDetector
+        The newly registered detectors.
+
+    Example
+    -------
+    In the plugin's ``pyproject.toml``::
+
+        [project.entry-points."gatenet.service_detectors"]
+        redis = "my_plugin.detectors:RedisDetector"
+
+    >>> from gatenet.discovery import load_detector_plugins
+    >>> load_detector_plugins()
+    [<my_plugin.detectors.RedisDetector object at ...>]
+    """
+    from importlib.metadata import entry_points
+
+    loaded: List[ServiceDetector] = []
+    for ep in entry_points(group=group):
+        key = f"{group}:{ep.name}={ep.value}"
+        if key in _LOADED_PLUGINS:
+            continue
+        try:
+            obj = ep.load()
+            items = obj if isinstance(obj, (list, tuple)) else [obj]
+            detectors = [item() if isinstance(item, type) else item for item in items]
+            for detector in detectors:
+                if not isinstance(detector, ServiceDetector):
+                    raise TypeError(f"{detector!r} is not a ServiceDetector")
+        except Exception as e:
+            import logging
+            logging.error(f"Error loading service detector plugin {ep.name}: {e}")
+            continue
+        for detector in detectors:
+            register_detector(detector)
+        _LOADED_PLUGINS.add(key)
+        loaded.extend(detectors)
+    return loaded
 
 def get_detectors() -> List[ServiceDetector]:
     return list(_REGISTRY)
 
+def enable_service_cache(maxsize: int = 4096) -> None:
+    """Memoize service identification in a bounded LRU cache.
+
+    Banners repeat heavily across hosts (the same server build on every
+    machine), so caching ``(port, banner) -> service`` skips the detector
+    chain for repeats. Hooks are still emitted for every call. The cache is
+    cleared whenever the registry changes. Calling this again resizes the
+    cache and keeps its entries.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of cached entries (default: 4096).
+
+    Example
+    -------
+    >>> from gatenet.discovery.ssh import enable_service_cache, service_cache_info
+    >>> enable_service_cache(maxsize=1024)
+    >>> service_cache_info()["maxsize"]
+    1024
+    """
+    global _CACHE, _CACHE_MAXSIZE
+    if maxsize < 1:
+        raise ValueError("maxsize must be >= 1")
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = OrderedDict()
+        _CACHE_MAXSIZE = maxsize
+        while len(_CACHE) > maxsize:
+            _CACHE.popitem(last=False)
+
+def disable_service_cache() -> None:
+    """Disable and drop the identification cache; counters are kept."""
+    global _CACHE, _CACHE_MAXSIZE
+    with _CACHE_LOCK:
+        _CACHE = None
+        _CACHE_MAXSIZE = 0
+
+def clear_service_cache() -> None:
+    """Empty the identification cache and reset its hit/miss counters."""
+    global _CACHE_HITS, _CACHE_MISSES
+    with _CACHE_LOCK:
+        if _CACHE is not None:
+            _CACHE.clear()
+        _CACHE_HITS = 0
+        _CACHE_MISSES = 0
+
+def service_cache_info() -> Dict[str, int]:
+    """Return identification cache statistics.
+
+    Returns
+    -------
+    dict
+        ``{"hits", "misses", "size", "maxsize"}``; ``maxsize`` is 0 while the
+        cache is disabled.
+    """
+    with _CACHE_LOCK:
+        return {
+            "hits": _CACHE_HITS,
+            "misses": _CACHE_MISSES,
+            "size": len(_CACHE) if _CACHE is not None else 0,
+            "maxsize": _CACHE_MAXSIZE,
+        }
+
+def _classify(port: int, banner: str) -> str:
+    """Run the indexed detector chain, consulting the cache when enabled."""
+    global _CACHE_HITS, _CACHE_MISSES
+    cache = _CACHE
+    if cache is not None:
+        key = (port, banner)
+        with _CACHE_LOCK:
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                _CACHE_HITS += 1
+                return result
+            _CACHE_MISSES += 1
+    index = _get_index()
+    result = index.identify(port, banner)
+    if not result:
+        # Only reached when the FallbackDetector has been removed
+        result = f"Unknown Service (Port {port})"
+    if cache is not None:
+        with _CACHE_LOCK:
+            # Skip storing if the registry changed while we were classifying
+            if cache is _CACHE and index is _INDEX:
+                cache[key] = result
+                if len(cache) > _CACHE_MAXSIZE:
+                    cache.popitem(last=False)
+    return result
+
+def _normalize(port: Any, banner: Any) -> Tuple[int, str]:
+    """Coerce a (port, banner) pair to the (int, lower-cased str) detectors expect."""
+    # Defensive: handle None or non-str banner
+    if banner is None:
+        banner_lower = ""
+    elif not isinstance(banner, str):
+        banner_lower = str(banner).lower().strip()
+    else:
+        banner_lower = banner.lower().strip()
+
+    # Defensive: handle non-int port
+    try:
+        port_int = int(port)
+    except Exception:
+        port_int = -1
+    return port_int, banner_lower
+
+# Detector index used inside ProcessPoolExecutor workers
+_WORKER_INDEX: Optional[DetectorIndex] = None
+
+def _init_worker(detectors: List[ServiceDetector]) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = DetectorIndex(detectors)
+
+def _classify_chunk(chunk: List[Tuple[int, str]]) -> List[str]:
+    index = _WORKER_INDEX or _get_index()
+    return [index.identify(port, banner) or f"Unknown Service (Port {port})" for port, banner in chunk]
+
+def identify_services(
+    pairs: Iterable[Tuple[int, str]],
+    *,
+    processes: Optional[int] = None,
+    chunksize: int = 4096,
+) -> List[str]:
+    """
+    Identify services for many (port, banner) pairs at once.
+
+    Inputs are normalized and de-duplicated, so each distinct pair runs the
+    detector chain once. Instead of the per-item before/after detect hooks,
+    a single ``DISCOVERY_BATCH_DETECT`` event is emitted with the distinct
+    ``(port, banner, result)`` triples.
+
+    Parameters
+    ----------
+    pairs : iterable of (int, str)
+        Port and banner pairs.
+    processes : int, optional
+        Fan distinct pairs out over a ``ProcessPoolExecutor`` with this many
+        workers when there are more than ``chunksize`` of them. Registered
+        detectors must be picklable. Default: classify in-process.
+    chunksize : int, optional
+        Number of pairs sent to a worker at a time (default: 4096).
+
+    Returns
+    -------
+    list of str
+        Identified services, aligned with ``pairs``.
+
+    Example
+    -------
+    >>> from gatenet.discovery.ssh import identify_services
+    >>> identify_services([(22, "SSH-2.0-OpenSSH_8.9p1"), (80, "")])
+    ['OpenSSH 8.9p1', 'HTTP']
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be >= 1")
+    keys = [_normalize(port, banner) for port, banner in pairs]
+    unique = list(dict.fromkeys(keys))
+    if processes and len(unique) > chunksize:
+        chunks = [unique[i:i + chunksize] for i in range(0, len(unique), chunksize)]
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(get_detectors(),)) as pool:
+            results = [result for chunk in pool.map(_classify_chunk, chunks) for result in chunk]
+    else:
+        results = [_classify(port, banner) for port, banner in unique]
+    try:
+        hooks.emit(
+            events.DISCOVERY_BATCH_DETECT,
+            results=[(port, banner, result) for (port, banner), result in zip(unique, results)],
+        )
+    except Exception:
+        pass
+    by_key = dict(zip(unique, results))
+    return [by_key[key] for key in keys]
+
 def _identify_service(port: int, banner: str) -> str:
     """
     Identify service type from port and banner.
@@ -92,19 +377,7 @@ def _identify_service(port: int, banner: str) -> str:
     >>> _identify_service(22, "SSH-2.0-OpenSSH_8.9p1")
     'OpenSSH 8.9p1'
     """
-    # Defensive: handle None or non-str banner
-    if banner is None:
-        banner_lower = ""
-    elif not isinstance(banner, str):
-        banner_lower = str(banner).lower().strip()
-    else:
-        banner_lower = banner.lower().strip()
-
-    # Defensive: handle non-int port
-    try:
-        port_int = int(port)
-    except Exception:
-        port_int = -1
+    port_int, banner_lower = _normalize(port, banner)
 
     # Emit before-detect hook
     try:
@@ -112,18 +385,9 @@ def _identify_service(port: int, banner: str) -> str:
     except Exception:
         pass
 
-    # Chain of responsibility pattern using the registry
-    for detector in get_detectors():
-        result = detector.detect(port_int, banner_lower)
-        if result:
-            try:
-                hooks.emit(events.DISCOVERY_AFTER_DETECT, port=port_int, banner=banner_lower, result=result)
-            except Exception:
-                pass
-            return result
-
-    # This should never be reached due to FallbackDetector
-    result = f"Unknown Service (Port {port_int})"
+    # Chain of responsibility over the registry, restricted by the compiled
+    # index to detectors whose declared ports/keywords can match
+    result = _classify(port_int, banner_lower)
     try:
         hooks.emit(events.DISCOVERY_AFTER_DETECT, port=port_int, banner=banner_lower, result=result)
     except Exception:
@@ -1,13 +1,46 @@
-from typing import Optional
+from typing import Collection, Optional
 from abc import ABC, abstractmethod
 
 class ServiceDetector(ABC):
     """
     Abstract base class for service detection strategies.
+
+    All service detectors must implement the `detect` method. This is the
+    single base class for every detector, including the ones re-exported by
+    :mod:`gatenet.discovery.detectors` and third-party plugins.
+
+    Detectors may also declare how the registry should treat them:
+
+    - ``ports``: ports the detector matches on regardless of the banner.
+    - ``keywords``: lower-case substrings, one of which must appear in the
+      banner for a match on any other port.
+    - ``priority``: position in the registry chain; lower runs first.
+
+    A detector that declares neither ``ports`` nor ``keywords`` is tried for
+    every banner (see :class:`gatenet.discovery.index.DetectorIndex`).
     """
+    ports: Optional[Collection[int]] = None
+    keywords: Optional[Collection[str]] = None
+    priority: Optional[int] = None
+
     @abstractmethod
     def detect(self, port: int, banner: str) -> Optional[str]:
-        pass
+        """
+        Detect service from port and banner.
+
+        Parameters
+        ----------
+        port : int
+            The port number associated with the service.
+        banner : str
+            The lower-cased banner string received from the service.
+
+        Returns
+        -------
+        Optional[str]
+            The detected service name/version, or None if not detected.
+        """
+        raise NotImplementedError
 
 from .banner_keyword import BannerKeywordDetector
 from .coap import CoAPDetector
@@ -2,7 +2,7 @@
 Service detection by banner keywords.
 Detects services by searching for keywords in the banner string.
 """
-from typing import Optional
+from typing import Collection, Optional
 from gatenet.service_detectors import ServiceDetector
 
 class BannerKeywordDetector(ServiceDetector):
@@ -15,6 +15,12 @@ class BannerKeywordDetector(ServiceDetector):
         (['pop3'], "POP3 Server"),
         (['imap'], "IMAP Server"),
     ]
+    priority = 110
+    ports = ()
+
+    @property
+    def keywords(self) -> Collection[str]:
+        return [keyword for keywords, _name in self.BANNER_KEYWORDS for keyword in keywords]
 
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
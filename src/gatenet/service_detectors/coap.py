@@ -6,17 +6,23 @@ Service detection strategy for CoAP protocol.
 Public API:
     - CoAPDetector
 """
+import re
 from typing import Optional
 from gatenet.service_detectors import ServiceDetector
 
+_WORD = re.compile(r'\bcoap\b')
+
 class CoAPDetector(ServiceDetector):
     """
     Service detector for CoAP servers.
     Detects CoAP servers from port and banner.
     """
+    priority = 104
+    ports = (5683,)
+    keywords = ('coap',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
-        if port != 5683 and 'coap' not in banner.lower():
-            return None
-        if 'coap' in banner.lower():
+        # Whole word only, not inside a longer token
+        if _WORD.search(banner.lower()):
             return "CoAP Server"
         return None
@@ -26,6 +26,8 @@ class FallbackDetector(ServiceDetector):
         8080: "HTTP",
         8000: "HTTP"
     }
+    # Always answers, so it must run last
+    priority = 1000
 
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
@@ -10,6 +10,10 @@ class FTPDetector(ServiceDetector):
     Service detector for FTP servers.
     Detects vsftpd, FileZilla, or generic FTP servers from port and banner.
     """
+    priority = 30
+    ports = (21,)
+    keywords = ('ftp', 'filezilla')
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
         Detect FTP service from port and banner string.
@@ -2,7 +2,7 @@
 Service detection by generic indicators.
 Detects services by searching for known software indicators in the banner string.
 """
-from typing import Optional
+from typing import Collection, Optional
 from .ssh import ServiceDetector
 
 from gatenet.service_detectors import ServiceDetector
@@ -24,6 +24,12 @@ class GenericServiceDetector(ServiceDetector):
         'apache': 'Apache Server',
         'nginx': 'Nginx Server'
     }
+    priority = 120
+    ports = ()
+
+    @property
+    def keywords(self) -> Collection[str]:
+        return self.SERVICE_INDICATORS.keys()
 
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
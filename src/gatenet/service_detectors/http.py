@@ -13,6 +13,10 @@ class HTTPDetector(ServiceDetector):
     """
     Service detector for HTTP servers.
     """
+    priority = 20
+    ports = (80, 8080, 8000, 443)
+    keywords = ('apache', 'nginx', 'iis', 'http')
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         if port not in [80, 8080, 8000, 443] and not banner.startswith('http'):
             return None
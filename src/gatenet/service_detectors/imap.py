@@ -14,6 +14,10 @@ class IMAPDetector(ServiceDetector):
     Service detector for IMAP servers.
     Detects IMAP or IMAPS servers from port and banner.
     """
+    priority = 50
+    ports = (143, 993)
+    keywords = ('imap',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         if port not in (143, 993) and 'imap' not in banner.lower():
             return None
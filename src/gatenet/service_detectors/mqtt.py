@@ -6,17 +6,23 @@ Service detection strategy for MQTT protocol.
 Public API:
     - MQTTDetector
 """
+import re
 from typing import Optional
 from gatenet.service_detectors import ServiceDetector
 
+_WORD = re.compile(r'\bmqtt\b')
+
 class MQTTDetector(ServiceDetector):
     """
     Service detector for MQTT brokers.
     Detects MQTT brokers from port and banner.
     """
+    priority = 102
+    ports = (1883,)
+    keywords = ('mqtt',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
-        if port != 1883 and 'mqtt' not in banner.lower():
-            return None
-        if 'mqtt' in banner.lower():
+        # Whole word only, not a fragment of some longer identifier
+        if _WORD.search(banner.lower()):
             return "MQTT Broker"
         return None
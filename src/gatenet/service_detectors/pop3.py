@@ -14,6 +14,10 @@ class POP3Detector(ServiceDetector):
     Service detector for POP3 servers.
     Detects POP3 or POP3S servers from port and banner.
     """
+    priority = 60
+    ports = (110, 995)
+    keywords = ('pop3',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         banner_lc = (banner or "").lower()
         if port == 995 or 'pop3s' in banner_lc:
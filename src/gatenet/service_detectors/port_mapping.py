@@ -2,7 +2,7 @@
 Service detection by direct port mapping.
 Maps well-known ports to common service names.
 """
-from typing import Optional
+from typing import Collection, Optional
 from gatenet.service_detectors import ServiceDetector
 
 class PortMappingDetector(ServiceDetector):
@@ -20,6 +20,12 @@ class PortMappingDetector(ServiceDetector):
         995: "POP3S Server",
         3389: "Remote Desktop Protocol (RDP)"
     }
+    priority = 100
+    keywords = ()
+
+    @property
+    def ports(self) -> Collection[int]:
+        return self.PORT_MAPPING.keys()
 
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
@@ -6,17 +6,23 @@ Service detection strategy for SIP protocol.
 Public API:
     - SIPDetector
 """
+import re
 from typing import Optional
 from gatenet.service_detectors import ServiceDetector
 
+_WORD = re.compile(r'\bsip\b')
+
 class SIPDetector(ServiceDetector):
     """
     Service detector for SIP servers.
     Detects SIP servers from port and banner.
     """
+    priority = 106
+    ports = (5060,)
+    keywords = ('sip',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
-        if port != 5060 and 'sip' not in banner.lower():
-            return None
-        if 'sip' in banner.lower():
+        # Whole word only: 'gossip' in a MySQL banner is not SIP
+        if _WORD.search(banner.lower()):
             return "SIP Server"
         return None
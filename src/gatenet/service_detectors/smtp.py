@@ -18,6 +18,10 @@ class SMTPDetector(ServiceDetector):
     Service detector for SMTP servers.
     Detects Postfix, Sendmail, or generic SMTP servers from port and banner.
     """
+    priority = 40
+    ports = (25,)
+    keywords = ('postfix', 'sendmail', 'smtp')
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         """
         Detect SMTP service from port and banner string.
@@ -14,15 +14,21 @@ from typing import Optional
 import re
 from gatenet.service_detectors import ServiceDetector
 
+_OPENSSH_VERSION = re.compile(r'openssh[_\s]+([\d\.]+p?\d*)')
+
 class SSHDetector(ServiceDetector):
     """
     Service detector for SSH servers.
     """
+    priority = 10
+    ports = (22,)
+    keywords = ('ssh',)
+
     def detect(self, port: int, banner: str) -> Optional[str]:
         if port != 22 and 'ssh' not in banner:
             return None
         if 'openssh' in banner:
-            version_match = re.search(r'openssh[_\s]+([\d\.]+p?\d*)', banner)
+            version_match = _OPENSSH_VERSION.search(banner)
             version = version_match.group(1) if version_match else 'unknown'
             return f"OpenSSH {version}"
         if 'ssh' in banner:
@@ -0,0 +1,82 @@
+"""
+test_bandwidth_cmd.py — Tests for the 'bandwidth' CLI command.
+"""
+import pytest
+from gatenet.cli.commands.bandwidth import cmd_bandwidth
+from unittest.mock import patch
+
+RESULT = {
+    "bandwidth_mbps": 941.5,
+    "bytes_transferred": 588437500,
+    "duration": 5.0,
+    "direction": "download",
+    "streams": 4,
+    "intervals": [930.2, 944.1, 943.8, 944.6, 944.8],
+}
+
+
+def test_cmd_bandwidth_plain(capsys):
+    with patch("gatenet.diagnostics.bandwidth.measure_bandwidth", return_value=RESULT) as mock_bw:
+        class Args:
+            host = "192.168.1.20"
+            output = "plain"
+            color = False
+            streams = 4
+            duration = 5.0
+        cmd_bandwidth(Args())
+        _, kwargs = mock_bw.call_args
+        assert kwargs["streams"] == 4 and kwargs["direction"] == "download"
+        out = capsys.readouterr().out
+        assert "930.2 Mbps" in out
+        assert "941.5 Mbps" in out and "streams=4" in out
+
+
+def test_cmd_bandwidth_error(capsys):
+    with patch("gatenet.diagnostics.bandwidth.measure_bandwidth", side_effect=ConnectionRefusedError("refused")):
+        class Args:
+            host = "192.168.1.20"
+            output = "plain"
+            color = False
+        with pytest.raises(SystemExit):
+            cmd_bandwidth(Args())
+        assert "refused" in capsys.readouterr().out
+
+
+def test_cmd_bandwidth_udp(capsys):
+    udp_result = dict({k: v for k, v in RESULT.items() if k != "streams"}, bitrate=64000, packets_sent=250, packets_received=249,
+                      packets_lost=1, loss_percent=0.4, out_of_order=0, duplicates=0, jitter_ms=0.412)
+    with patch("gatenet.diagnostics.bandwidth.measure_udp", return_value=udp_result) as mock_udp:
+        class Args:
+            host = "192.168.1.20"
+            output = "plain"
+            color = False
+            udp = True
+            bitrate = "64k"
+            datagram_size = 160
+        cmd_bandwidth(Args())
+        _, kwargs = mock_udp.call_args
+        assert kwargs["bitrate"] == 64000 and kwargs["datagram_size"] == 160
+        out = capsys.readouterr().out
+        assert "jitter=0.412 ms" in out and "lost=1/250 (0.40%)" in out
+
+
+def test_cmd_bandwidth_intervals_with_tcp_info(capsys):
+    from array import array
+    result = dict(RESULT, interval=0.5, duration=1.0, intervals=array("d", [812.5, 944.1]), tcp_info={
+        "rtt_ms": array("d", [1.25, 18.5]), "cwnd": array("d", [65536, 262144]), "retransmits": array("d", [0, 3]),
+    })
+    with patch("gatenet.diagnostics.bandwidth.measure_bandwidth", return_value=result) as mock_bw:
+        class Args:
+            host = "192.168.1.20"
+            output = "plain"
+            color = False
+            interval = 0.5
+            omit = 2.0
+        cmd_bandwidth(Args())
+        _, kwargs = mock_bw.call_args
+        assert kwargs["interval"] == 0.5 and kwargs["omit"] == 2.0
+        out = capsys.readouterr().out
+        assert "0.50-1.00 s\t944.1 Mbps\trtt=18.50 ms\tcwnd=256 KiB\tretr=3" in out
+        Args.output = "json"
+        cmd_bandwidth(Args())
+        assert '"rtt_ms": [' in capsys.readouterr().out
@@ -33,3 +33,39 @@ def test_cmd_dns_error(capsys):
         cmd_dns(Args())
         out = capsys.readouterr().out
         assert "error" in out
+
+def _a_record(dns_server, name, ip):
+    import socket
+    dns_server.records[(name, 1)] = [(1, 300, socket.inet_aton(ip))]
+
+def test_cmd_dns_with_server(capsys, dns_server):
+    _a_record(dns_server, "gw.example.test", "192.0.2.1")
+    dns_server.records[("1.2.0.192.in-addr.arpa", 12)] = [(12, 300, b"\x02gw\x07example\x04test\x00")]
+    class Args:
+        query = "gw.example.test"
+        output = "plain"
+        server = f"127.0.0.1:{dns_server.port}"
+        timeout = 1.0
+    cmd_dns(Args())
+    out = capsys.readouterr().out
+    assert "gw.example.test -> 192.0.2.1 -> gw.example.test" in out
+
+def test_cmd_dns_bench(capsys, make_dns_server):
+    stubs = [make_dns_server(), make_dns_server()]
+    for stub in stubs:
+        _a_record(stub, "a.bench.test", "192.0.2.1")
+    specs = [f"127.0.0.1:{stub.port}" for stub in stubs]
+    class Args:
+        query = "bench"
+        output = "plain"
+        servers = specs
+        names = ["a.bench.test"]
+        types = ["A"]
+        rounds = 2
+        concurrency = 4
+        timeout = 1.0
+    cmd_dns(Args())
+    lines = [line for line in capsys.readouterr().out.splitlines() if "qps=" in line]
+    assert len(lines) == 2
+    assert all("timeouts=0" in line and "errors=0" in line for line in lines)
+    assert {line.split("\t")[0] for line in lines} == set(Args.servers)
@@ -32,3 +32,22 @@ def test_cmd_trace_no_hops(capsys):
             cmd_trace(Args())
         out = capsys.readouterr().out
         assert "No hops found" in out or "failed" in out
+
+
+def test_cmd_trace_parallel_passes_options(capsys):
+    with patch("gatenet.diagnostics.traceroute.traceroute") as mock_trace:
+        mock_trace.return_value = [
+            {"hop": 1, "ip": "192.168.1.1", "hostname": "", "rtt_ms": 2.3, "rtts": [2.3, None, 2.5]},
+        ]
+        class Args:
+            host = "example.com"
+            output = "plain"
+            color = False
+            max_hops = 12
+            parallel = True
+            probes = 3
+        cmd_trace(Args())
+        _, kwargs = mock_trace.call_args
+        assert kwargs["max_hops"] == 12 and kwargs["parallel"] is True and kwargs["probes"] == 3
+        out = capsys.readouterr().out
+        assert "2.30 ms  *  2.50 ms" in out
@@ -19,3 +19,144 @@ def mock_subprocess_for_hotspot():
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
             yield
+
+
+class StubDNSServer:
+    """
+    Minimal authoritative DNS server on 127.0.0.1 (UDP and TCP, same port),
+    answering from ``records``: ``{(name, qtype): [(qtype, ttl, rdata)]}``.
+
+    ``rcodes`` maps names to error response codes, names in ``truncate`` get
+    an empty UDP answer with the TC bit set, and the first ``drop`` UDP
+    queries are ignored. With ``cold_delay`` set, the first UDP answer for
+    each question is held back that many seconds, like a recursive
+    resolver's cache miss.
+    """
+
+    def __init__(self):
+        import socket
+        import threading
+        self.records = {}
+        self.rcodes = {}
+        self.truncate = set()
+        self.drop = 0
+        self.cold_delay = 0.0
+        self.queries = 0
+        self.tcp_queries = 0
+        self.clients = set()
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.bind(("127.0.0.1", 0))
+        self.port = self.udp.getsockname()[1]
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp.bind(("127.0.0.1", self.port))
+        self.tcp.listen(16)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _answer(self, query, udp):
+        import struct
+        qid, _flags = struct.unpack_from("!HH", query)
+        offset = 12
+        labels = []
+        while query[offset]:
+            labels.append(query[offset + 1:offset + 1 + query[offset]].decode().lower())
+            offset += 1 + query[offset]
+        qtype = struct.unpack_from("!H", query, offset + 1)[0]
+        question = query[12:offset + 5]
+        name = ".".join(labels)
+        rcode = self.rcodes.get(name, 0)
+        answers = [] if rcode else self.records.get((name, qtype), [])
+        if not rcode and not answers and not any(key[0] == name for key in self.records):
+            rcode = 3
+        truncated = udp and name in self.truncate
+        if truncated:
+            answers = []
+        flags = 0x8180 | rcode | (0x0200 if truncated else 0)
+        message = struct.pack("!HHHHHH", qid, flags, 1, len(answers), 0, 0) + question
+        for rtype, ttl, rdata in answers:
+            message += struct.pack("!HHHIH", 0xC00C, rtype, 1, ttl, len(rdata)) + rdata
+        return message
+
+    def _serve(self):
+        import select
+        import struct
+        import time
+        seen = set()
+        delayed = []
+        while not self._stop.is_set():
+            wait = min([0.05] + [max(0.0, when - time.monotonic()) for when, _a, _c in delayed])
+            readable, _, _ = select.select([self.udp, self.tcp], [], [], wait)
+            now = time.monotonic()
+            for item in [d for d in delayed if d[0] <= now]:
+                delayed.remove(item)
+                self.udp.sendto(item[1], item[2])
+            if self.udp in readable:
+                query, client = self.udp.recvfrom(4096)
+                self.queries += 1
+                self.clients.add(client)
+                if self.drop:
+                    self.drop -= 1
+                    continue
+                answer = self._answer(query, True)
+                question = query[12:].lower()
+                if self.cold_delay and question not in seen:
+                    seen.add(question)
+                    delayed.append((now + self.cold_delay, answer, client))
+                    continue
+                self.udp.sendto(answer, client)
+            if self.tcp in readable:
+                conn, _addr = self.tcp.accept()
+                with conn:
+                    conn.settimeout(2)
+                    length = struct.unpack("!H", conn.recv(2))[0]
+                    query = b""
+                    while len(query) < length:
+                        query += conn.recv(length - len(query))
+                    self.tcp_queries += 1
+                    answer = self._answer(query, False)
+                    conn.sendall(struct.pack("!H", len(answer)) + answer)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.udp.close()
+        self.tcp.close()
+
+
+@pytest.fixture
+def make_dns_server():
+    """Factory for running :class:`StubDNSServer` instances, closed after the test."""
+    servers = []
+
+    def make():
+        server = StubDNSServer()
+        servers.append(server)
+        return server
+
+    try:
+        yield make
+    finally:
+        for server in servers:
+            server.close()
+
+
+@pytest.fixture
+def dns_server(make_dns_server):
+    """A running :class:`StubDNSServer`; its ``port`` is the UDP/TCP port."""
+    return make_dns_server()
+
+
+@pytest.fixture(autouse=True)
+def fresh_resolver_caches():
+    """Keep cached DNS answers (and monkeypatched ones) from leaking between tests."""
+    from gatenet.diagnostics.rdns import reverse_resolver
+    from gatenet.diagnostics.resolver import resolver_cache
+    resolver_cache.forget()
+    reverse_resolver.forget()
+    try:
+        yield
+    finally:
+        resolver_cache.forget()
+        reverse_resolver.forget()
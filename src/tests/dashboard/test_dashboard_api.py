@@ -53,3 +53,26 @@ def test_traceroute_stream():
         if len(lines) > 2:
             break
     assert any(b"data:" in l for l in lines)
+
+def test_traceroute_stream_sends_hops_as_json(monkeypatch):
+    import json
+    import gatenet.dashboard.app as dashboard_app
+
+    async def fake_stream(host):
+        yield {"hop": 1, "ip": "10.0.0.1", "hostname": "gw", "rtt_ms": 1.5, "rtts": [1.5]}
+        yield {"hop": 2, "ip": host, "hostname": "", "rtt_ms": 9.0, "rtts": [9.0]}
+
+    monkeypatch.setattr(dashboard_app, "async_traceroute_stream", fake_stream)
+    resp = client.get("/api/traceroute/stream", params={"host": "192.0.2.9"})
+    assert resp.status_code == 200
+    events = [json.loads(line[len(b"data: "):]) for line in resp.content.splitlines() if line.startswith(b"data: ")]
+    assert [hop["ip"] for hop in events] == ["10.0.0.1", "192.0.2.9"]
+    assert events[0]["hostname"] == "gw"
+
+def test_reverse_dns(monkeypatch):
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (f"host-{ip}", [], [ip]))
+    resp = client.get("/api/reverse_dns", params={"ips": "192.0.2.1, 192.0.2.2,not-an-ip"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["ok"] is True
+    assert data["names"] == {"192.0.2.1": "host-192.0.2.1", "192.0.2.2": "host-192.0.2.2", "not-an-ip": None}
@@ -35,8 +35,8 @@ def test_port_scan_invalid_ports():
     assert data["open_ports"] == []
 
 def test_traceroute_stream_error():
-    # Simulate error in traceroute by patching traceroute to raise
-    with patch("gatenet.dashboard.app.traceroute", side_effect=Exception("fail")):
+    # Simulate error in traceroute by patching the hop stream to raise
+    with patch("gatenet.dashboard.app.async_traceroute_stream", side_effect=Exception("fail")):
         resp = client.get("/api/traceroute/stream", params={"host": "8.8.8.8"})
         assert resp.status_code == 200
         assert resp.headers["content-type"].startswith("text/event-stream")
@@ -0,0 +1,239 @@
+"""
+Tests for the bundled bandwidth server and the multi-stream client.
+"""
+import socket
+import sys
+import threading
+from array import array
+
+import pytest
+
+from gatenet.diagnostics.bandwidth import REPORT_INTERVAL, BandwidthServer, measure_bandwidth
+
+
+@pytest.fixture
+def server():
+    with BandwidthServer(host="127.0.0.1", port=0) as srv:
+        yield srv
+
+
+def test_download_multiple_streams(server):
+    result = measure_bandwidth("127.0.0.1", port=server.port, duration=1.5, streams=3)
+    assert result["streams"] == 3 and result["direction"] == "download"
+    assert result["bytes_transferred"] > 0 and result["bandwidth_mbps"] > 0
+    assert result["duration"] == pytest.approx(1.5, abs=0.1)
+    # One full interval plus the remaining half
+    assert len(result["intervals"]) == 2
+    assert all(mbps > 0 for mbps in result["intervals"])
+
+
+@pytest.mark.parametrize("sendfile", [False, True])
+def test_upload(server, sendfile):
+    result = measure_bandwidth("127.0.0.1", port=server.port, duration=0.5, direction="upload", streams=2, sendfile=sendfile)
+    assert result["direction"] == "upload"
+    assert result["bytes_transferred"] > 0
+    assert len(result["intervals"]) == 1 and REPORT_INTERVAL > 0.5
+
+
+def test_zero_duration(server):
+    result = measure_bandwidth("127.0.0.1", port=server.port, duration=0)
+    assert result["bandwidth_mbps"] == 0.0 and len(result["intervals"]) == 0
+
+
+def test_short_intervals_with_warmup_omitted(server):
+    result = measure_bandwidth("127.0.0.1", port=server.port, duration=0.5, direction="upload", interval=0.1, omit=0.2)
+    assert isinstance(result["intervals"], array) and result["intervals"].typecode == "d"
+    assert len(result["intervals"]) == 5
+    assert result["duration"] == pytest.approx(0.5, abs=0.05) and result["omit"] == 0.2
+    # Warm-up bytes are left out of the total
+    measured = sum(mbps * 0.1 for mbps in result["intervals"]) * 1_000_000 / 8
+    assert result["bytes_transferred"] == pytest.approx(measured, rel=0.1)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="TCP_INFO is Linux-only")
+def test_tcp_info_series(server):
+    result = measure_bandwidth("127.0.0.1", port=server.port, duration=0.3, direction="upload", streams=2, interval=0.1)
+    info = result["tcp_info"]
+    assert set(info) == {"rtt_ms", "cwnd", "retransmits"}
+    assert all(len(series) == len(result["intervals"]) for series in info.values())
+    assert all(cwnd > 0 for cwnd in info["cwnd"])
+    assert all(rtt >= 0 for rtt in info["rtt_ms"])
+
+
+def test_server_stop_closes_connections():
+    srv = BandwidthServer(host="127.0.0.1", port=0)
+    srv.start()
+    threading.Timer(0.3, srv.stop).start()
+    result = measure_bandwidth("127.0.0.1", port=srv.port, duration=5.0)
+    # The stream ends when the server goes away instead of running the full duration
+    assert result["duration"] < 2.0
+    with pytest.raises(OSError):
+        socket.create_connection(("127.0.0.1", srv.port), timeout=1).recv(1)
+
+
+def test_plain_sender_without_handshake():
+    # Any server that just streams data works for downloads
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+
+    def send():
+        conn, _ = listener.accept()
+        try:
+            while True:
+                conn.sendall(b"1" * 65536)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=send, daemon=True)
+    thread.start()
+    try:
+        result = measure_bandwidth("127.0.0.1", port=listener.getsockname()[1], duration=0.5)
+    finally:
+        listener.close()
+    thread.join(2)
+    assert result["bytes_transferred"] > 0
+
+
+def test_udp_stats_loss_reorder_and_jitter():
+    from gatenet.diagnostics.bandwidth import _UdpStats
+    stats = _UdpStats(duration=1.0, expected=6)
+    ms = 1_000_000
+    # seq 2 is lost, 4 arrives before 3, 1 is duplicated; transit alternates 10/12 ms
+    for seq, sent, arrival in [(0, 0, 10), (1, 20, 32), (1, 20, 33), (4, 80, 90), (3, 60, 72), (5, 100, 110)]:
+        stats.add(seq, sent * ms, arrival * ms, 100)
+    result = stats.result(sent=6, direction="upload", bitrate=4800)
+    assert result["packets_received"] == 5 and result["packets_lost"] == 1
+    assert result["loss_percent"] == pytest.approx(100 / 6)
+    assert result["duplicates"] == 1 and result["out_of_order"] == 1
+    # J += (|D| - J) / 16 with |D| = 2, 2, 2, 2 ms
+    jitter = 0.0
+    for _ in range(4):
+        jitter += (2 - jitter) / 16
+    assert result["jitter_ms"] == pytest.approx(jitter)
+    assert result["bytes_transferred"] == 500 and list(result["intervals"]) == [pytest.approx(0.004)]
+
+
+@pytest.mark.parametrize("direction", ["download", "upload"])
+def test_measure_udp_loopback(server, direction):
+    from gatenet.diagnostics.bandwidth import measure_udp
+    result = measure_udp("127.0.0.1", port=server.port, duration=0.5, bitrate=800_000, datagram_size=500, direction=direction)
+    assert result["direction"] == direction
+    assert result["packets_sent"] == 100
+    assert result["packets_received"] == 100 and result["packets_lost"] == 0
+    assert result["bandwidth_mbps"] == pytest.approx(0.8, rel=0.05)
+    assert result["jitter_ms"] >= 0
+
+
+def test_udp_stats_drops_sequence_numbers_past_the_test():
+    from gatenet.diagnostics.bandwidth import _UdpStats
+    stats = _UdpStats(duration=1.0, expected=10)
+    stats.add(2**40, 0, 1, 100)
+    stats.add(10, 0, 1, 100)
+    assert stats.received == 0
+
+
+def test_udp_stats_spots_duplicates_with_fixed_memory():
+    from gatenet.diagnostics.bandwidth import _DUPLICATE_WINDOW, _UdpStats
+    stats = _UdpStats(duration=1.0, expected=2**62)
+    size = len(stats._seen)
+    for seq in [2**61, 2**61, 5, 2**61 + _DUPLICATE_WINDOW, 2**61 + _DUPLICATE_WINDOW]:
+        stats.add(seq, 0, 1, 100)
+    assert stats.received == 3 and stats.duplicates == 2
+    assert len(stats._seen) == size
+
+
+@pytest.mark.parametrize("bitrate, size, duration, interval", [
+    (800_000, 0, 1.0, 1.0),
+    (800_000, 500, 1.0, 0.0),
+    (0, 500, 1.0, 1.0),
+    (2**63, 500, 1e12, 1.0),
+    (800_000, 500, 3600.0, 1e-9),
+    (800_000, 500, float("nan"), 1.0),
+])
+def test_server_refuses_bad_udp_parameters(server, bitrate, size, duration, interval):
+    from gatenet.diagnostics import bandwidth
+    with socket.create_connection(("127.0.0.1", server.port), timeout=2) as conn:
+        conn.sendall(bandwidth._HELLO.pack(bandwidth._MAGIC, bandwidth._MODE_UDP_RECV, 0, 0, duration))
+        conn.sendall(bandwidth._UDP_PARAMS.pack(bitrate, size, 9, interval))
+        # Closed without a UDP port being offered
+        assert conn.recv(16) == b""
+    result = bandwidth.measure_udp("127.0.0.1", port=server.port, duration=0.2, bitrate=800_000, datagram_size=500, direction="upload")
+    assert result["packets_received"] == 40
+
+
+def test_measure_udp_ignores_stray_datagrams(server, monkeypatch):
+    from gatenet.diagnostics import bandwidth
+    original = bandwidth._send_datagrams
+
+    def send_with_stray(sock, *args):
+        # Another source aims numbered datagrams at the server's test port
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as stray:
+            stray.sendto(bandwidth._DATAGRAM.pack(0, 0).ljust(500, b"\0"), sock.getpeername())
+            stray.sendto(bandwidth._DATAGRAM.pack(2**40, 0).ljust(500, b"\0"), sock.getpeername())
+        return original(sock, *args)
+
+    monkeypatch.setattr(bandwidth, "_send_datagrams", send_with_stray)
+    result = bandwidth.measure_udp("127.0.0.1", port=server.port, duration=0.3, bitrate=800_000, datagram_size=500, direction="upload")
+    assert result["packets_sent"] == 60
+    assert result["packets_received"] == 60
+    assert result["duplicates"] == 0 and result["out_of_order"] == 0
+
+
+def test_send_datagrams_without_gso(monkeypatch):
+    from gatenet.diagnostics import bandwidth
+    monkeypatch.setattr(bandwidth, "_UDP_SEGMENT", None)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(receiver.getsockname())
+    try:
+        # High enough that the schedule releases datagrams in batches
+        assert bandwidth._send_datagrams(sender, 40_000_000, 100, 0.01) == 500
+        receiver.settimeout(1)
+        seqs = [bandwidth._DATAGRAM.unpack_from(receiver.recv(2048))[0] for _ in range(5)]
+        assert seqs == [0, 1, 2, 3, 4]
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def test_send_datagrams_retries_refused_sends_and_keeps_gso(monkeypatch):
+    from gatenet.diagnostics import bandwidth
+    monkeypatch.setattr(bandwidth, "_UDP_SEGMENT", 103)
+
+    class RefusingSocket:
+        """Reports one port unreachable on the first GSO send and one on a plain send."""
+
+        def __init__(self):
+            self.seqs = []
+            self.gso_calls = 0
+            self.refuse = {"sendmsg": 1, "send": 1}
+
+        def _refused(self, kind):
+            if self.refuse[kind]:
+                self.refuse[kind] -= 1
+                raise ConnectionRefusedError(111, "Connection refused")
+
+        def sendmsg(self, buffers, ancdata):
+            self._refused("sendmsg")
+            self.gso_calls += 1
+            data = bytes(buffers[0])
+            self.seqs += [bandwidth._DATAGRAM.unpack_from(data, i)[0] for i in range(0, len(data), 100)]
+
+        def send(self, data):
+            self._refused("send")
+            self.seqs.append(bandwidth._DATAGRAM.unpack_from(data)[0])
+
+    sock = RefusingSocket()
+    assert bandwidth._send_datagrams(sock, 40_000_000, 100, 0.01) == 500
+    assert sorted(sock.seqs) == list(range(500))
+    assert sock.gso_calls > 1
+
+
+def test_measure_udp_rejects_tiny_datagrams(server):
+    from gatenet.diagnostics.bandwidth import measure_udp
+    with pytest.raises(ValueError):
+        measure_udp("127.0.0.1", port=server.port, datagram_size=8)
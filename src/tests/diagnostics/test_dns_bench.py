@@ -0,0 +1,76 @@
+"""
+Tests for DNS resolver benchmarking against local stub servers.
+"""
+import socket
+
+import pytest
+
+from gatenet.diagnostics.dns_bench import benchmark_resolvers, parse_server
+
+
+def _zone(server, names):
+    for name in names:
+        server.records[(name, 1)] = [(1, 300, socket.inet_aton("192.0.2.1"))]
+        server.records[(name, 28)] = [(28, 300, socket.inet_pton(socket.AF_INET6, "2001:db8::1"))]
+    return server
+
+
+def test_parse_server():
+    assert parse_server("9.9.9.9") == ("9.9.9.9", 53)
+    assert parse_server("127.0.0.1:5300") == ("127.0.0.1", 5300)
+    assert parse_server("[::1]:5300") == ("::1", 5300)
+    assert parse_server("::1", 5300) == ("::1", 5300)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_ranks_resolvers_and_separates_cold_from_warm(make_dns_server):
+    names = [f"host{i}.bench.test" for i in range(10)]
+    fast = _zone(make_dns_server(), names)
+    slow = _zone(make_dns_server(), names)
+    slow.cold_delay = 0.05
+    servers = [f"127.0.0.1:{slow.port}", f"127.0.0.1:{fast.port}"]
+    results = await benchmark_resolvers(servers, names=names, rounds=2, timeout=1.0)
+    assert results[0]["warm"]["p50"] <= results[1]["warm"]["p50"]
+    by_server = {r["server"]: r for r in results}
+    slow_result = by_server[servers[0]]
+    assert slow_result["sent"] == slow_result["answered"] == 60
+    assert slow_result["cold"]["answered"] == 20 and slow_result["warm"]["answered"] == 40
+    assert slow_result["cold"]["p50"] >= 50
+    assert slow_result["warm"]["p50"] < 50
+    assert slow_result["cache_speedup"] > 1
+    assert slow_result["qps"] > 0
+    assert by_server[servers[1]]["cold"]["p50"] < 50
+
+
+@pytest.mark.asyncio
+async def test_benchmark_counts_timeouts_and_errors(make_dns_server):
+    server = _zone(make_dns_server(), ["ok.test"])
+    server.rcodes["broken.test"] = 2
+    server.drop = 2
+    result, = await benchmark_resolvers(
+        [f"127.0.0.1:{server.port}"], names=["ok.test", "broken.test"], types=["A"], rounds=1, concurrency=1, timeout=0.2
+    )
+    # Both cold queries are dropped; warm, one is answered and one fails
+    assert result["timeouts"] == 2 and result["cold"]["timeouts"] == 2
+    assert result["errors"] == 1 and result["answered"] == 1
+    assert result["cold"]["p50"] is None and result["warm"]["p50"] is not None
+    assert result["cache_speedup"] is None
+
+
+@pytest.mark.asyncio
+async def test_benchmark_accepts_numeric_types_and_rejects_unknown_ones_up_front(make_dns_server):
+    server = _zone(make_dns_server(), ["ok.test"])
+    result, = await benchmark_resolvers([f"127.0.0.1:{server.port}"], names=["ok.test"], types=[1, 28], rounds=1, timeout=1.0)
+    assert result["answered"] == 4 and result["errors"] == 0
+    with pytest.raises(ValueError):
+        await benchmark_resolvers([f"127.0.0.1:{server.port}"], names=["ok.test"], types=["A", "BOGUS"], rounds=1)
+    assert server.queries == 4
+
+
+@pytest.mark.asyncio
+async def test_benchmark_counts_unencodable_names_as_errors(make_dns_server):
+    server = _zone(make_dns_server(), ["ok.test"])
+    result, = await benchmark_resolvers(
+        [f"127.0.0.1:{server.port}"], names=["ok.test", "x" * 64 + ".test"], types=["A"], rounds=0, timeout=1.0
+    )
+    assert result["answered"] == 1 and result["errors"] == 1
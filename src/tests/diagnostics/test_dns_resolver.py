@@ -0,0 +1,85 @@
+"""
+Tests for the asyncio stub resolver, against a local stub DNS server.
+"""
+import asyncio
+import socket
+import struct
+
+import pytest
+
+from gatenet.diagnostics.dns import DNSError, DNSResolver, build_query, parse_response
+
+
+def _name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\x00"
+
+
+@pytest.fixture
+def zone(dns_server):
+    dns_server.records.update({
+        ("example.test", 1): [(1, 300, socket.inet_aton("192.0.2.10"))],
+        ("example.test", 28): [(28, 300, socket.inet_pton(socket.AF_INET6, "2001:db8::10"))],
+        ("example.test", 15): [(15, 60, struct.pack("!H", 10) + _name("mail.example.test"))],
+        ("example.test", 16): [(16, 60, b"\x05v=spf\x09 1 -all!!")],
+        ("_sip._udp.example.test", 33): [(33, 60, struct.pack("!HHH", 1, 5, 5060) + _name("sip.example.test"))],
+    })
+    for i in range(50):
+        dns_server.records[(f"{i}.2.0.192.in-addr.arpa", 12)] = [(12, 3600, _name(f"host{i}.example.test"))]
+    return dns_server
+
+
+def test_query_round_trip():
+    response = parse_response(build_query("Example.TEST.", "TXT", qid=4242))
+    assert response.id == 4242
+    assert response.question == ("example.test", 16)
+    assert response.answers == []
+
+
+def test_parse_rejects_compression_loop():
+    message = struct.pack("!HHHHHH", 1, 0x8180, 1, 0, 0, 0) + b"\xc0\x0c" + struct.pack("!HH", 1, 1)
+    with pytest.raises(DNSError):
+        parse_response(message)
+
+
+@pytest.mark.asyncio
+async def test_record_types(zone):
+    async with DNSResolver("127.0.0.1", port=zone.port, timeout=1.0) as resolver:
+        assert await resolver.resolve("example.test") == ["192.0.2.10"]
+        assert await resolver.resolve("example.test", "AAAA") == ["2001:db8::10"]
+        assert await resolver.resolve("example.test", "MX") == [(10, "mail.example.test")]
+        assert await resolver.resolve("example.test", "TXT") == ["v=spf 1 -all!!"]
+        assert await resolver.resolve("_sip._udp.example.test", "SRV") == [(1, 5, 5060, "sip.example.test")]
+        assert await resolver.reverse("192.0.2.7") == "host7.example.test"
+        assert await resolver.resolve("missing.test") == []
+
+
+@pytest.mark.asyncio
+async def test_pipelines_over_one_socket(zone):
+    async with DNSResolver("127.0.0.1", port=zone.port, timeout=1.0) as resolver:
+        ips = [f"192.0.2.{i}" for i in range(50)] + ["192.0.2.99"]
+        names = await resolver.reverse_many(ips)
+    assert names["192.0.2.42"] == "host42.example.test"
+    assert names["192.0.2.99"] is None
+    assert len(zone.clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_answer_falls_back_to_tcp(zone):
+    zone.truncate.add("example.test")
+    async with DNSResolver("127.0.0.1", port=zone.port, timeout=1.0) as resolver:
+        assert await resolver.resolve("example.test") == ["192.0.2.10"]
+    assert zone.tcp_queries == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_and_errors(zone):
+    zone.drop = 1
+    zone.rcodes["broken.test"] = 2
+    async with DNSResolver("127.0.0.1", port=zone.port, timeout=0.2, retries=1) as resolver:
+        assert await resolver.resolve("example.test") == ["192.0.2.10"]
+        with pytest.raises(DNSError) as excinfo:
+            await resolver.resolve("broken.test")
+        assert excinfo.value.rcode == 2
+        zone.drop = 2
+        with pytest.raises(TimeoutError):
+            await resolver.query("example.test")
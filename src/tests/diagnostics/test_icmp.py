@@ -0,0 +1,153 @@
+"""
+Tests for the in-process ICMP echo engine.
+"""
+import asyncio
+import socket
+import struct
+import sys
+
+import pytest
+
+from gatenet.diagnostics import icmp
+from gatenet.diagnostics.icmp import ICMPEngine, _checksum
+
+
+def _engine():
+    try:
+        return ICMPEngine()
+    except PermissionError:
+        pytest.skip("ICMP sockets not permitted in this environment")
+
+
+def test_checksum_of_packet_with_checksum_is_zero():
+    header = struct.pack("!BBHHH", 8, 0, 0, 0x1234, 1) + b"abc"
+    checksum = _checksum(header)
+    packet = struct.pack("!BBHHH", 8, 0, checksum, 0x1234, 1) + b"abc"
+    assert _checksum(packet) == 0
+
+
+def test_parse_strips_ip_header_and_checks_identifier():
+    engine = _engine()
+    with engine:
+        reply = struct.pack("!BBHHH", 0, 0, 0, engine.ident, 7)
+        ip_header = bytes([0x45]) + bytes(19)
+        assert engine._parse(ip_header + reply) == 7
+        assert engine._parse(reply) == 7
+        assert engine._parse(struct.pack("!BBHHH", 0, 0, 0, engine.ident ^ 1, 7)) is None
+        assert engine._parse(struct.pack("!BBHHH", 8, 0, 0, engine.ident, 7)) is None
+
+
+def test_drain_matches_replies_to_scoped_link_local_targets(monkeypatch):
+    engine = _engine()
+    with engine:
+        engine._pending[7] = ("fe80::1%lo", engine._now(), None)
+        engine._pending[8] = ("fe80::2%lo", engine._now(), None)
+        replies = [
+            (struct.pack("!BBHHH", engine._reply_type, 0, 0, engine.ident, 7), "fe80:0::1", engine._now()),
+            # Right sequence number, wrong source: not a reply to probe 8
+            (struct.pack("!BBHHH", engine._reply_type, 0, 0, engine.ident, 8), "fe80::3%lo", engine._now()),
+        ]
+        monkeypatch.setattr(engine, "_read_one", lambda: replies.pop(0) if replies else None)
+        assert [(seq, address) for seq, address, _rtt in engine.drain()] == [(7, "fe80::1%lo")]
+        assert list(engine._pending) == [8]
+
+
+def test_engine_pings_loopback():
+    with _engine() as engine:
+        rtts = engine.ping("127.0.0.1", count=3, timeout=1.0, interval=0.01)
+    assert len(rtts) == 3
+    assert all(rtt is not None and 0 <= rtt < 1000 for rtt in rtts)
+
+
+def test_engine_multiplexes_async_probes():
+    async def main(engine):
+        return await asyncio.gather(*(engine.probe(f"127.0.0.{i}", timeout=1.0) for i in range(1, 33)))
+
+    with _engine() as engine:
+        rtts = asyncio.run(main(engine))
+        assert not engine._pending
+    assert all(rtt is not None for rtt in rtts)
+
+
+def test_ping_falls_back_to_subprocess_without_icmp_sockets(monkeypatch):
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+
+    def denied(family=socket.AF_INET):
+        raise PermissionError("denied")
+
+    monkeypatch.setattr(icmp, "open_icmp_socket", denied)
+    monkeypatch.setattr(ping_mod, "_icmp_ping_subprocess", lambda host, count, timeout, system: {"fallback": True})
+    monkeypatch.setattr(ping_mod.platform, "system", lambda: "Linux")
+    assert ping_mod.ping("127.0.0.1", count=1) == {"fallback": True}
+
+
+@pytest.mark.asyncio
+async def test_ping_many_yields_every_host():
+    from gatenet.diagnostics.ping import ping_many
+    _engine().close()
+    hosts = [f"127.0.0.{i}" for i in range(1, 21)] + ["nonexistent.invalid"]
+    results = [r async for r in ping_many(hosts, count=2, interval=0.05, timeout=0.5)]
+    assert results[0]["host"] == "nonexistent.invalid" and results[0]["success"] is False
+    by_host = {r["host"]: r for r in results[1:]}
+    assert sorted(by_host) == sorted(hosts[:-1])
+    assert all(r["success"] and r["packet_loss"] == 0 and len(r["rtts"]) == 2 for r in by_host.values())
+
+
+@pytest.mark.asyncio
+async def test_ping_many_early_exit_cleans_up():
+    from gatenet.diagnostics.ping import ping_many
+    _engine().close()
+    stream = ping_many(["127.0.0.1", "10.255.255.1"], count=1, timeout=5.0)
+    first = await stream.__anext__()
+    await stream.aclose()
+    assert first["host"] == "127.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_ping_many_caps_probes_in_flight_and_survives_probe_errors(monkeypatch):
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+
+    class FakeEngine:
+        in_flight = 0
+        peak = 0
+
+        def __init__(self, family):
+            pass
+
+        async def probe(self, address, timeout):
+            FakeEngine.in_flight += 1
+            FakeEngine.peak = max(FakeEngine.peak, FakeEngine.in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                if address.endswith(".3"):
+                    raise RuntimeError("too many ICMP probes in flight")
+                return 1.5
+            finally:
+                FakeEngine.in_flight -= 1
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ping_mod, "ICMPEngine", FakeEngine)
+    monkeypatch.setattr(ping_mod, "_MAX_IN_FLIGHT", 4)
+    hosts = [f"10.9.0.{i}" for i in range(1, 11)]
+    results = await asyncio.wait_for(
+        _collect(ping_mod.ping_many(hosts, count=2, interval=0.0, timeout=1.0)), timeout=5
+    )
+    by_host = {r["host"]: r for r in results}
+    assert sorted(by_host) == sorted(hosts)
+    assert by_host["10.9.0.3"]["success"] is False
+    assert by_host["10.9.0.1"]["success"] is True and by_host["10.9.0.1"]["packet_loss"] == 0
+    assert FakeEngine.peak <= 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, -1])
+async def test_ping_many_rejects_non_positive_count(count):
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(_collect(ping_mod.ping_many(["127.0.0.1"], count=count)), timeout=2)
+
+
+async def _collect(stream):
+    return [r async for r in stream]
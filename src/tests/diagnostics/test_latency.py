@@ -0,0 +1,66 @@
+"""
+Tests for streaming latency statistics and the LatencyMonitor.
+"""
+import random
+import statistics
+
+import pytest
+
+from gatenet.core import hooks, events
+from gatenet.diagnostics.latency import HostLatency, LatencyHistogram, LatencyMonitor, _TargetMonitor
+
+
+def test_histogram_quantiles_within_precision():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(2, 0.8) for _ in range(20000)]
+    h = LatencyHistogram(precision=0.01)
+    for v in values:
+        h.record(v)
+    exact = statistics.quantiles(values, n=100)
+    for q, p in ((0.5, 49), (0.95, 94), (0.99, 98)):
+        assert h.quantile(q) == pytest.approx(exact[p], rel=0.02)
+    assert len(h) < 1500
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_target_monitor_requires_probe_and_state():
+    with pytest.raises(TypeError):
+        _TargetMonitor([], interval=1.0)
+
+
+def test_host_latency_loss_window_and_jitter():
+    stats = HostLatency(window=4)
+    for rtt in (10.0, 12.0, None, 10.0, None, None):
+        stats.record(rtt)
+    snap = stats.snapshot()
+    assert (snap["sent"], snap["received"]) == (6, 3)
+    assert snap["loss"] == pytest.approx(50.0)
+    assert snap["window_loss"] == pytest.approx(75.0)
+    assert snap["jitter"] == pytest.approx((2 / 16) + (2 - 2 / 16) / 16)
+    assert snap["rtt_min"] == 10.0 and snap["rtt_max"] == 12.0
+
+
+@pytest.mark.asyncio
+async def test_monitor_probes_and_emits_snapshots(monkeypatch):
+    import sys
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+
+    async def fake_ping_many(hosts, count=1, interval=1.0, timeout=1.0):
+        for host in hosts:
+            yield {"host": host, "rtts": [5.0] if host == "up" else []}
+
+    monkeypatch.setattr(ping_mod, "ping_many", fake_ping_many)
+    seen = []
+    listener = lambda snapshots: seen.append(snapshots)
+    hooks.on(events.LATENCY_SNAPSHOT, listener)
+    try:
+        monitor = LatencyMonitor(["up", "down"], interval=0.01)
+        await monitor.run(cycles=3)
+    finally:
+        hooks.off(events.LATENCY_SNAPSHOT, listener)
+    assert len(seen) == 3
+    snap = monitor.snapshot()
+    assert snap["up"]["received"] == 3 and snap["up"]["p50"] == pytest.approx(5.0)
+    assert snap["down"]["loss"] == 100.0
+    monitor.remove("down")
+    assert monitor.snapshot("down") is None
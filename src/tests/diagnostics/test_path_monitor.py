@@ -0,0 +1,114 @@
+"""
+Tests for traceroute path monitoring.
+"""
+import pytest
+
+from gatenet.core import hooks, events
+from gatenet.diagnostics.path_monitor import PathMonitor, PathState
+
+
+def test_path_state_tracks_runs_losses_and_changes():
+    state = PathState(history=4)
+    assert state.update({1: ("10.0.0.1", 1.0), 2: ("192.0.2.9", 5.0)}, 2, True, 100.0) is None
+    # Same path again: the history run is extended, not duplicated
+    assert state.update({1: ("10.0.0.1", 3.0), 2: ("192.0.2.9", 5.0)}, 2, True, 200.0) is None
+    assert len(state.history) == 1 and state.history[0][:2] == (100.0, 200.0)
+    assert state.rtts[0] == pytest.approx(1.0 + 0.25 * 2.0)
+    # A lost probe keeps the previous responder
+    assert state.update({2: ("192.0.2.9", 5.0)}, 2, True, 300.0) is None
+    assert state.hops == ["10.0.0.1", "192.0.2.9"]
+    change = state.update({1: ("10.0.0.2", 1.0), 2: ("10.0.9.1", 2.0), 3: ("192.0.2.9", 6.0)}, 3, True, 400.0)
+    assert change["changed"] == [1, 2, 3]
+    assert change["previous"] == ("10.0.0.1", "192.0.2.9")
+    snap = state.snapshot()
+    assert snap["changes"] == 1 and snap["last_change"] == 400.0
+    assert [h["path"] for h in snap["history"]] == [["10.0.0.1", "192.0.2.9"], ["10.0.0.2", "10.0.9.1", "192.0.2.9"]]
+
+
+def test_path_state_first_answer_from_silent_hop_is_not_a_change():
+    state = PathState()
+    state.update({1: ("10.0.0.1", 1.0), 3: ("192.0.2.9", 5.0)}, 3, True, 1.0)
+    assert state.snapshot()["hops"][1]["ip"] == "*"
+    assert state.update({2: ("10.0.1.1", 2.0)}, 3, True, 2.0) is None
+    assert state.hops == ["10.0.0.1", "10.0.1.1", "192.0.2.9"]
+    assert state.changes == 0 and len(state.history) == 1
+
+
+@pytest.mark.asyncio
+async def test_monitor_emits_path_change_and_resolves_only_new_hops(monkeypatch):
+    paths = iter([
+        {1: ("10.0.0.1", 1.0), 2: ("192.0.2.9", 4.0)},
+        {1: ("10.0.0.1", 1.0), 2: ("192.0.2.9", 4.0)},
+        {1: ("10.0.0.2", 1.0), 2: ("192.0.2.9", 4.0)},
+    ])
+    known_seen = []
+
+    def fake_trace(dest_addr, known):
+        known_seen.append(known)
+        replies = next(paths)
+        return replies, 2, True, 3
+
+    looked_up = []
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (looked_up.append(ip) or f"host-{ip}", [], [ip]))
+    seen = []
+    listener = lambda **kwargs: seen.append(kwargs)
+    hooks.on(events.PATH_CHANGE, listener)
+    monitor = PathMonitor(["192.0.2.9"], interval=0.01)
+    monkeypatch.setattr(monitor, "_trace", fake_trace)
+    try:
+        await monitor.run(cycles=3)
+    finally:
+        hooks.off(events.PATH_CHANGE, listener)
+        monitor.close()
+    # Later cycles start from the known path length
+    assert known_seen == [0, 2, 2]
+    assert len(seen) == 1
+    assert seen[0]["host"] == "192.0.2.9"
+    assert seen[0]["previous"] == ["10.0.0.1", "192.0.2.9"] and seen[0]["path"] == ["10.0.0.2", "192.0.2.9"]
+    assert seen[0]["changed"] == [1]
+    assert sorted(looked_up) == ["10.0.0.1", "10.0.0.2", "192.0.2.9"]
+    snap = monitor.snapshot("192.0.2.9")
+    assert snap["hops"][0]["hostname"] == "host-10.0.0.2"
+    assert snap["probes_sent"] == 9 and snap["cycles"] == 3
+
+
+@pytest.mark.asyncio
+async def test_monitor_reprobes_loopback_incrementally():
+    monitor = PathMonitor(["127.0.0.1"], interval=0.01, timeout=0.5)
+    try:
+        await monitor.run(cycles=3)
+    except PermissionError:
+        pytest.skip("raw sockets not permitted in this environment")
+    finally:
+        monitor.close()
+    snap = monitor.snapshot("127.0.0.1")
+    assert snap["reached"] and [h["ip"] for h in snap["hops"]] == ["127.0.0.1"]
+    # A full first pass, then only up to one hop past the destination
+    assert snap["probes_sent"] == 30 + 2 + 2
+    assert snap["changes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_monitor_shares_latency_monitor_target_set_and_cadence(monkeypatch):
+    from gatenet.diagnostics.latency import LatencyMonitor, _TargetMonitor
+
+    assert issubclass(PathMonitor, _TargetMonitor) and issubclass(LatencyMonitor, _TargetMonitor)
+    monitor = PathMonitor(["a", "b"], interval=0.01)
+    monitor.add("a")
+    monitor.remove("b")
+    assert monitor.targets == ["a"]
+    assert monitor.snapshot("b") is None
+    assert isinstance(monitor.snapshot("a"), dict)
+    cycles = []
+
+    async def probe_once():
+        cycles.append(1)
+        if len(cycles) == 2:
+            monitor.stop()
+
+    monkeypatch.setattr(monitor, "probe_once", probe_once)
+    await monitor.run(cycles=5)
+    assert len(cycles) == 2
+    monitor.close()
+    with pytest.raises(ValueError):
+        PathMonitor([], interval=0)
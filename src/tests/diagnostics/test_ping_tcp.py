@@ -0,0 +1,54 @@
+"""
+Tests for TCP ping over native asyncio connects.
+"""
+import asyncio
+import socket
+
+import pytest
+
+from gatenet.diagnostics.ping import async_ping, ping
+from gatenet.utils.net import get_free_port
+
+
+@pytest.fixture
+def listening_port():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1024)
+    try:
+        yield server.getsockname()[1]
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_async_tcp_ping_uses_port_without_threads(listening_port, monkeypatch):
+    loop = asyncio.get_running_loop()
+
+    def no_executor(*args, **kwargs):
+        raise AssertionError("TCP ping must not use the thread pool")
+
+    monkeypatch.setattr(loop, "run_in_executor", no_executor)
+    result = await async_ping("127.0.0.1", count=3, method="tcp", port=listening_port)
+    assert result["success"] is True
+    assert result["packet_loss"] == 0 and len(result["rtts"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_tcp_ping_closed_port_fails():
+    result = await async_ping("127.0.0.1", count=2, method="tcp", port=get_free_port(), timeout=0.5)
+    assert result["success"] is False
+    assert result["packet_loss"] == 100
+
+
+@pytest.mark.asyncio
+async def test_async_tcp_ping_scales_concurrently(listening_port):
+    results = await asyncio.gather(*(
+        async_ping("127.0.0.1", count=2, method="tcp", port=listening_port) for _ in range(200)
+    ))
+    assert all(r["success"] for r in results)
+
+
+def test_sync_tcp_ping_custom_port(listening_port):
+    result = ping("127.0.0.1", count=2, method="tcp", port=listening_port)
+    assert result["success"] is True and len(result["rtts"]) == 2
@@ -0,0 +1,300 @@
+"""
+Tests for the ScanEngine used by scan_ports and scan_ports_async.
+"""
+import asyncio
+import socket
+import time
+
+import pytest
+
+from gatenet.diagnostics.port_scan import ScanEngine, TokenBucket, scan_ports, scan_ports_async
+from gatenet.utils.net import get_free_port
+
+
+@pytest.fixture
+def listening_port():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", 0))
+    server.listen(128)
+    try:
+        yield server.getsockname()[1]
+    finally:
+        server.close()
+
+
+def test_scan_ports_detects_open_port(listening_port):
+    closed = get_free_port()
+    results = scan_ports("127.0.0.1", ports=[listening_port, closed], timeout=1.0)
+    assert results == [(listening_port, True), (closed, False)]
+
+
+@pytest.mark.asyncio
+async def test_scan_ports_async_preserves_order(listening_port):
+    ports = [get_free_port(), listening_port, get_free_port()]
+    results = await scan_ports_async("127.0.0.1", ports=ports, concurrency=2)
+    assert [p for p, _ in results] == ports
+    assert dict(results)[listening_port] is True
+
+
+@pytest.mark.asyncio
+async def test_engine_respects_global_and_per_host_limits(monkeypatch):
+    engine = ScanEngine(concurrency=8, per_host=3)
+    inflight = {"now": 0, "peak": 0}
+
+    async def fake_connect(family, sockaddr, port, timeout):
+        inflight["now"] += 1
+        inflight["peak"] = max(inflight["peak"], inflight["now"])
+        await asyncio.sleep(0.01)
+        inflight["now"] -= 1
+        return "closed", 1.0, None
+
+    monkeypatch.setattr(engine, "_connect", fake_connect)
+    results = await engine.scan("127.0.0.1", range(1, 40))
+    assert len(results) == 39
+    assert inflight["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_engine_unresolvable_host_reports_closed():
+    engine = ScanEngine()
+    results = await engine.scan("invalid.host.invalid", [22, 80])
+    assert results == [(22, False), (80, False)]
+
+
+@pytest.mark.asyncio
+async def test_scanners_keep_the_ipv6_scope_of_link_local_targets():
+    from gatenet.diagnostics.port_scan import SelectorScanner, _HostState
+    index, name = socket.if_nameindex()[0]
+    host = f"fe80::1%{name}"
+    engine = ScanEngine()
+    family, addr, _address = await engine._resolve(host, _HostState(1, None))
+    assert family == socket.AF_INET6 and addr[3] == index
+    assert SelectorScanner()._resolve(host)[1][3] == index
+
+
+@pytest.mark.asyncio
+async def test_engine_adaptive_timeout_shrinks_after_answer():
+    from gatenet.diagnostics.rtt import RTTEstimator
+    engine = ScanEngine(timeout=2.0, min_timeout=0.1, estimator=RTTEstimator())
+    assert engine.host_timeout("127.0.0.1") == 2.0
+    await engine.scan("127.0.0.1", [get_free_port()])
+    assert engine.host_timeout("127.0.0.1") == pytest.approx(0.1)
+
+
+def test_engine_adaptive_disabled_keeps_timeout():
+    engine = ScanEngine(timeout=2.0, adaptive=False)
+    asyncio.run(engine.scan("127.0.0.1", [get_free_port()]))
+    assert engine.host_timeout("127.0.0.1") == 2.0
+
+
+def test_engine_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        ScanEngine(concurrency=0)
+
+
+def test_token_bucket_reserve_and_refill():
+    bucket = TokenBucket(rate=100, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() > 0.0
+    time.sleep(0.02)
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+@pytest.mark.asyncio
+async def test_engine_rate_limit_spaces_connects(monkeypatch):
+    engine = ScanEngine(rate=200, burst=1, timeout=0.5)
+
+    async def fake_connect(family, sockaddr, port, timeout):
+        return "closed", 0.1, None
+
+    monkeypatch.setattr(engine, "_connect", fake_connect)
+    start = time.monotonic()
+    await engine.scan("127.0.0.1", range(1, 11))
+    assert time.monotonic() - start >= 9 / 200 * 0.9
+
+
+def test_expand_hosts_forms():
+    from gatenet.diagnostics.port_scan import _expand_hosts
+    assert list(_expand_hosts("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+    assert list(_expand_hosts("10.0.0.8-10")) == ["10.0.0.8", "10.0.0.9", "10.0.0.10"]
+    assert list(_expand_hosts("10.0.0.255-10.0.1.0")) == ["10.0.0.255", "10.0.1.0"]
+    assert list(_expand_hosts(["my-host.local", "::1"])) == ["my-host.local", "::1"]
+    with pytest.raises(ValueError):
+        list(_expand_hosts("10.0.0.9-10.0.0.1"))
+
+
+def test_expand_hosts_is_lazy():
+    from gatenet.diagnostics.port_scan import _expand_hosts
+    hosts = _expand_hosts("10.0.0.0/8")
+    assert next(hosts) == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_scan_network_streams_states(listening_port):
+    from gatenet.diagnostics.port_scan import scan_network, OPEN, CLOSED
+    closed = get_free_port()
+    results = [r async for r in scan_network("127.0.0.1/32", ports=[listening_port, closed])]
+    by_port = {port: (host, state, rtt) for host, port, state, rtt, _errno in results}
+    assert by_port[listening_port][:2] == ("127.0.0.1", OPEN)
+    assert by_port[closed][1] == CLOSED
+    assert all(rtt is not None for _, _, rtt in by_port.values())
+
+
+@pytest.mark.asyncio
+async def test_scan_network_interleaves_hosts(monkeypatch):
+    from gatenet.diagnostics.port_scan import scan_network, FILTERED
+    engine = ScanEngine(concurrency=1)
+    order = []
+
+    async def fake_connect(family, sockaddr, port, timeout):
+        order.append((sockaddr[0], port))
+        return FILTERED, None, None
+
+    monkeypatch.setattr(engine, "_connect", fake_connect)
+    results = [r async for r in scan_network("10.0.0.1-3", ports=[22, 80], engine=engine)]
+    assert len(results) == 6
+    assert order[:3] == [("10.0.0.1", 22), ("10.0.0.2", 22), ("10.0.0.3", 22)]
+
+
+@pytest.mark.asyncio
+async def test_scan_network_rejects_bad_spec():
+    from gatenet.diagnostics.port_scan import scan_network
+    with pytest.raises(ValueError):
+        async for _ in scan_network("10.0.0.0/33", ports=[22]):
+            pass
+
+
+def test_selector_scanner_states(listening_port):
+    from gatenet.diagnostics.port_scan import SelectorScanner, OPEN, CLOSED, ERROR
+    closed = get_free_port()
+    scanner = SelectorScanner(concurrency=4, timeout=1.0)
+    results = {(host, port): (state, rtt) for host, port, state, rtt, _errno in scanner.stream(
+        [("127.0.0.1", listening_port), ("127.0.0.1", closed), ("invalid.host.invalid", 80)]
+    )}
+    assert results[("127.0.0.1", listening_port)][0] == OPEN
+    assert results[("127.0.0.1", closed)][0] == CLOSED
+    assert results[("127.0.0.1", closed)][1] is not None
+    assert results[("invalid.host.invalid", 80)] == (ERROR, None)
+
+
+def test_selector_scanner_spends_no_rate_token_on_unresolvable_hosts(listening_port):
+    from gatenet.diagnostics.port_scan import SelectorScanner, OPEN, ERROR
+    scanner = SelectorScanner(rate=2, burst=1, timeout=1.0)
+    scanner._addresses["bad.lan"] = None
+    start = time.monotonic()
+    states = [state for _host, _port, state, _rtt, _errno in scanner.stream(
+        [("bad.lan", 1), ("bad.lan", 2), ("127.0.0.1", listening_port)]
+    )]
+    assert states == [ERROR, ERROR, OPEN]
+    # The one connect uses the initial burst token, so nothing waits for a refill
+    assert time.monotonic() - start < 0.4
+
+
+def test_selector_scanner_expires_silent_ports_together(monkeypatch):
+    from gatenet.diagnostics import port_scan
+
+    class SilentSelector:
+        """Never reports a completed connect, like a host that drops SYNs."""
+
+        def register(self, fileobj, events):
+            pass
+
+        def unregister(self, fileobj):
+            pass
+
+        def select(self, timeout):
+            time.sleep(timeout)
+            return []
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(port_scan.selectors, "DefaultSelector", SilentSelector)
+    start = time.monotonic()
+    results = port_scan.SelectorScanner(concurrency=50, timeout=0.2).scan("127.0.0.1", [get_free_port() for _ in range(20)])
+    assert results and all(is_open is False for _, is_open in results)
+    assert time.monotonic() - start < 1.0
+
+
+def test_selector_scanner_backs_off_when_out_of_fds(monkeypatch, listening_port):
+    import errno
+    from gatenet.diagnostics import port_scan
+    real_socket = socket.socket
+    created = {"n": 0}
+
+    def limited_socket(*args, **kwargs):
+        created["n"] += 1
+        if created["n"] == 3:
+            raise OSError(errno.EMFILE, "Too many open files")
+        return real_socket(*args, **kwargs)
+
+    monkeypatch.setattr(port_scan.socket, "socket", limited_socket)
+    scanner = port_scan.SelectorScanner(concurrency=10, timeout=1.0)
+    results = scanner.scan("127.0.0.1", [listening_port] * 6)
+    assert results == [(listening_port, True)] * 6
+
+
+def test_scan_ports_detailed_distinguishes_closed(listening_port):
+    import errno
+    from gatenet.diagnostics.port_scan import ScanResult, OPEN, CLOSED
+    closed = get_free_port()
+    results = scan_ports("127.0.0.1", ports=[listening_port, closed], detailed=True)
+    assert all(isinstance(r, ScanResult) for r in results)
+    assert results[0].state == OPEN and results[0].is_open and results[0].errno is None
+    assert results[1].state == CLOSED and results[1].errno == errno.ECONNREFUSED
+    assert results[1].rtt_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_scan_ports_async_detailed_matches_sync(listening_port):
+    closed = get_free_port()
+    ports = [listening_port, closed]
+    async_results = await scan_ports_async("127.0.0.1", ports=ports, detailed=True)
+    sync_results = scan_ports("127.0.0.1", ports=ports, detailed=True)
+    assert [(r.port, r.state, r.errno) for r in async_results] == [(r.port, r.state, r.errno) for r in sync_results]
+
+
+@pytest.mark.asyncio
+async def test_engine_timeout_reports_filtered(monkeypatch):
+    from gatenet.diagnostics.port_scan import FILTERED
+
+    async def never_connects(sock, address):
+        await asyncio.sleep(10)
+
+    engine = ScanEngine(timeout=0.05)
+    loop = asyncio.get_running_loop()
+    monkeypatch.setattr(loop, "sock_connect", never_connects)
+    result = await engine.probe("127.0.0.1", 9)
+    assert result.state == FILTERED
+    assert result.rtt_ms is None and result.errno is None
+
+
+@pytest.mark.asyncio
+async def test_check_port_swallows_unexpected_oserror(monkeypatch):
+    import errno
+    from gatenet.diagnostics.port_scan import check_port
+
+    async def unreachable(sock, address):
+        raise OSError(errno.EHOSTUNREACH, "No route to host")
+
+    loop = asyncio.get_running_loop()
+    monkeypatch.setattr(loop, "sock_connect", unreachable)
+    assert await check_port("127.0.0.1", 9) == (9, False)
+
+
+def test_selector_scanner_feeds_estimator():
+    from gatenet.diagnostics.port_scan import SelectorScanner
+    from gatenet.diagnostics.rtt import RTTEstimator
+    estimator = RTTEstimator()
+    scanner = SelectorScanner(timeout=2.0, min_timeout=0.05, estimator=estimator)
+    assert scanner.host_timeout("127.0.0.1") == 2.0
+    scanner.scan("127.0.0.1", [get_free_port()])
+    assert estimator.get("127.0.0.1")["samples"] == 1
+    assert scanner.host_timeout("127.0.0.1") == pytest.approx(0.05)
@@ -0,0 +1,112 @@
+"""
+Tests for batch reverse-DNS enrichment.
+"""
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from gatenet.diagnostics.rdns import ReverseResolver
+
+
+@pytest.fixture
+def resolver():
+    r = ReverseResolver(concurrency=16, timeout=0.3)
+    try:
+        yield r
+    finally:
+        r.close()
+
+
+def test_lookups_run_in_parallel_with_deadline(resolver, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def slow_gethostbyaddr(ip):
+        with lock:
+            calls.append(ip)
+        if ip.endswith(".99"):
+            time.sleep(2)
+        time.sleep(0.1)
+        return (f"host-{ip}", [], [ip])
+
+    monkeypatch.setattr("socket.gethostbyaddr", slow_gethostbyaddr)
+    ips = [f"192.0.2.{i}" for i in range(10)] + ["192.0.2.99"]
+    start = time.monotonic()
+    names = resolver.resolve_many(ips)
+    assert time.monotonic() - start < 1.0
+    assert names["192.0.2.3"] == "host-192.0.2.3"
+    assert names["192.0.2.99"] is None
+    # Answers and the timeout are both cached
+    assert resolver.resolve_many(ips) == names
+    assert len(calls) == len(ips)
+
+
+def test_lookups_still_queued_at_their_deadline_are_not_cached(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def gethostbyaddr(ip):
+        calls.append(ip)
+        if ip == "192.0.2.1":
+            release.wait(2)
+            raise socket.herror(1, "Unknown host")
+        return (f"host-{ip}", [], [ip])
+
+    monkeypatch.setattr("socket.gethostbyaddr", gethostbyaddr)
+    resolver = ReverseResolver(concurrency=1, timeout=0.2)
+    try:
+        # The only worker is stuck on .1, so .2 never leaves the queue before its deadline
+        assert resolver.resolve_many(["192.0.2.1", "192.0.2.2"]) == {"192.0.2.1": None, "192.0.2.2": None}
+        release.set()
+        assert resolver.resolve_many(["192.0.2.2"]) == {"192.0.2.2": "host-192.0.2.2"}
+        # .1 ran and timed out, so its failure is cached and not retried
+        assert resolver.resolve_many(["192.0.2.1"]) == {"192.0.2.1": None}
+        assert calls == ["192.0.2.1", "192.0.2.2"]
+    finally:
+        resolver.close()
+
+
+def test_failures_and_non_addresses(resolver, monkeypatch):
+    def missing(ip):
+        raise socket.herror(1, "Unknown host")
+
+    monkeypatch.setattr("socket.gethostbyaddr", missing)
+    assert resolver.resolve_many(["192.0.2.1", "*"]) == {"192.0.2.1": None, "*": None}
+    assert len(resolver) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_share_one_query(resolver, monkeypatch):
+    calls = []
+
+    def gethostbyaddr(ip):
+        calls.append(ip)
+        time.sleep(0.05)
+        return ("router.lan", [], [ip])
+
+    monkeypatch.setattr("socket.gethostbyaddr", gethostbyaddr)
+    first, second = await resolver.lookup("10.0.0.1"), await resolver.lookup_many(["10.0.0.1"] * 5)
+    assert first == "router.lan" and second == {"10.0.0.1": "router.lan"}
+    assert calls == ["10.0.0.1"]
+
+
+def test_server_backend_uses_pipelined_ptr_queries(dns_server):
+    name = b"".join(bytes([len(p)]) + p.encode() for p in ("gw", "example", "test")) + b"\x00"
+    dns_server.records[("1.2.0.192.in-addr.arpa", 12)] = [(12, 30, name)]
+    resolver = ReverseResolver(server="127.0.0.1", timeout=1.0)
+    resolver_port = dns_server.port
+    try:
+        from gatenet.diagnostics import rdns
+        original = rdns.DNSResolver
+        rdns.DNSResolver = lambda server, **kw: original(server, port=resolver_port, **kw)
+        try:
+            names = resolver.resolve_many(["192.0.2.1", "192.0.2.2"])
+        finally:
+            rdns.DNSResolver = original
+    finally:
+        resolver.close()
+    assert names == {"192.0.2.1": "gw.example.test", "192.0.2.2": None}
+    assert len(dns_server.clients) == 1
@@ -0,0 +1,140 @@
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+import gatenet.diagnostics.ping  # noqa: F401
+from gatenet.diagnostics.resolver import ResolverCache, resolver_cache
+
+
+class CountingResolver:
+    def __init__(self, address="10.1.2.3", fail=False, error=socket.EAI_NONAME, delay=0.0):
+        self.address = address
+        self.fail = fail
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, host, port, family=0, type=0, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise socket.gaierror(self.error, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (self.address, 0))]
+
+
+def test_positive_answers_are_cached(monkeypatch):
+    fake = CountingResolver()
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache()
+    assert cache.resolve("Example.COM") == (socket.AF_INET, "10.1.2.3")
+    assert cache.resolve("example.com.") == (socket.AF_INET, "10.1.2.3")
+    assert fake.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_failures_are_negatively_cached(monkeypatch):
+    fake = CountingResolver(fail=True)
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache(negative_ttl=60)
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            cache.resolve("nowhere.invalid")
+    assert fake.calls == 1
+
+
+def test_transient_failures_are_not_cached(monkeypatch):
+    fake = CountingResolver(fail=True, error=socket.EAI_AGAIN)
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache(negative_ttl=60)
+    for _ in range(3):
+        with pytest.raises(socket.gaierror) as excinfo:
+            cache.resolve("flaky.lan")
+        assert excinfo.value.errno == socket.EAI_AGAIN
+    assert fake.calls == 3
+
+
+def test_entries_expire(monkeypatch):
+    fake = CountingResolver()
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache(ttl=0)
+    cache.resolve("example.com")
+    cache.resolve("example.com")
+    assert fake.calls == 2
+
+
+def test_put_uses_record_ttl_and_size_is_bounded():
+    cache = ResolverCache(max_entries=2)
+    cache.put("a.lan", ["192.0.2.1"], ttl=30)
+    cache.put("b.lan", ["2001:db8::1"])
+    cache.put("c.lan", ["192.0.2.3"])
+    assert len(cache) == 2
+    assert cache.resolve("b.lan") == (socket.AF_INET6, "2001:db8::1")
+    cache.forget("b.lan")
+    assert len(cache) == 1
+
+
+def test_ip_literals_bypass_the_cache(monkeypatch):
+    monkeypatch.setattr("socket.getaddrinfo", CountingResolver(fail=True))
+    cache = ResolverCache()
+    assert cache.resolve("127.0.0.1") == (socket.AF_INET, "127.0.0.1")
+    with pytest.raises(socket.gaierror):
+        cache.resolve("::1", socket.AF_INET)
+    assert len(cache) == 0
+
+
+def test_link_local_answers_keep_their_scope(monkeypatch):
+    from gatenet.diagnostics.resolver import sockaddr
+    infos = [(socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fe80::1", 0, 0, 1))]
+    monkeypatch.setattr("socket.getaddrinfo", lambda *a, **k: infos)
+    cache = ResolverCache()
+    assert cache.resolve("router.lan") == (socket.AF_INET6, "fe80::1%1")
+    monkeypatch.undo()
+    assert sockaddr(socket.AF_INET6, "fe80::1%1")[3] == 1
+    assert sockaddr(socket.AF_INET, "10.0.0.1") == ("10.0.0.1", 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_lookups_share_one_query(monkeypatch):
+    fake = CountingResolver()
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache()
+    results = await asyncio.gather(*(cache.resolve_async("example.com") for _ in range(20)))
+    assert set(results) == {(socket.AF_INET, "10.1.2.3")}
+    assert fake.calls == 1
+
+
+def test_concurrent_lookups_from_different_loops(monkeypatch):
+    fake = CountingResolver(delay=0.2)
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    cache = ResolverCache()
+    results, errors = [], []
+
+    def lookup():
+        try:
+            results.append(asyncio.run(cache.resolve_async("example.com")))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=lookup) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == [(socket.AF_INET, "10.1.2.3")] * 2
+
+
+def test_ping_validation_uses_shared_cache(monkeypatch):
+    ping_module = sys.modules["gatenet.diagnostics.ping"]
+    fake = CountingResolver()
+    monkeypatch.setattr("socket.getaddrinfo", fake)
+    for _ in range(5):
+        assert ping_module._is_valid_host("printer.lan")
+    assert not ping_module._is_valid_host("-c1")
+    assert fake.calls == 1
+    assert resolver_cache.resolve("printer.lan") == (socket.AF_INET, "10.1.2.3")
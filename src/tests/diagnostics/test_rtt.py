@@ -0,0 +1,140 @@
+import socket
+import threading
+
+import pytest
+
+from gatenet.diagnostics.rtt import RTTEstimator, rtt_estimator
+
+
+def test_unknown_host_uses_default():
+    est = RTTEstimator()
+    assert est.timeout("10.0.0.1", 2.0) == 2.0
+    assert est.get("10.0.0.1") is None
+
+
+def test_first_sample_initialises_srtt_and_rttvar():
+    est = RTTEstimator(min_timeout=0.0)
+    est.observe("10.0.0.1", 0.2)
+    assert est.get("10.0.0.1") == {"srtt": 0.2, "rttvar": 0.1, "samples": 1}
+    assert est.timeout("10.0.0.1", 5.0) == pytest.approx(0.6)
+
+
+def test_updates_follow_rfc6298():
+    est = RTTEstimator(min_timeout=0.0)
+    est.observe("h", 0.1)
+    est.observe("h", 0.3)
+    state = est.get("h")
+    # RTTVAR uses the previous SRTT, then SRTT moves 1/8 towards the sample
+    assert state["rttvar"] == pytest.approx(0.75 * 0.05 + 0.25 * 0.2)
+    assert state["srtt"] == pytest.approx(0.875 * 0.1 + 0.125 * 0.3)
+
+
+def test_timeout_clamped_between_floor_and_default():
+    est = RTTEstimator(min_timeout=0.1)
+    est.observe("lan", 0.0005)
+    est.observe("wan", 1.5)
+    assert est.timeout("lan", 2.0) == 0.1
+    assert est.timeout("lan", 2.0, min_timeout=0.01) == pytest.approx(0.01)
+    assert est.timeout("wan", 2.0) == 2.0
+
+
+def test_negative_samples_ignored():
+    est = RTTEstimator()
+    est.observe("h", -1.0)
+    assert est.get("h") is None
+
+
+def test_bounded_lru():
+    est = RTTEstimator(max_hosts=2)
+    est.observe("a", 0.1)
+    est.observe("b", 0.1)
+    est.observe("a", 0.1)
+    est.observe("c", 0.1)
+    assert est.get("b") is None
+    assert est.get("a") is not None and len(est) == 2
+
+
+def test_forget():
+    est = RTTEstimator()
+    est.observe("a", 0.1)
+    est.observe("b", 0.1)
+    est.forget("a")
+    assert est.get("a") is None
+    est.forget()
+    assert len(est) == 0
+
+
+def test_thread_safe_observe():
+    est = RTTEstimator()
+    threads = [threading.Thread(target=lambda: [est.observe("h", 0.01) for _ in range(500)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert est.get("h")["samples"] == 2000
+
+
+def test_tcp_ping_uses_shared_estimator(monkeypatch):
+    import socket
+    import sys
+    # The package re-exports the ping() function under the submodule's name.
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+
+    timeouts = []
+
+    class FakeSocket:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def settimeout(self, value):
+            timeouts.append(value)
+
+        def connect(self, address):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ping_mod, "_is_valid_host", lambda host: True)
+    monkeypatch.setattr(socket, "socket", FakeSocket)
+    rtt_estimator.forget("198.51.100.7")
+    try:
+        result = ping_mod._tcp_ping_sync("198.51.100.7", 2, 3)
+        assert result["success"] is True
+        assert timeouts[0] == 3
+        assert timeouts[1] < 3
+        assert rtt_estimator.get("198.51.100.7")["samples"] == 2
+    finally:
+        rtt_estimator.forget("198.51.100.7")
+
+
+@pytest.fixture
+def listening_port():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    try:
+        yield server.getsockname()[1]
+    finally:
+        server.close()
+
+
+def test_ping_and_scanner_share_the_estimate_of_a_name(monkeypatch, listening_port):
+    import sys
+    from gatenet.diagnostics.port_scan import SelectorScanner
+    from gatenet.diagnostics.resolver import resolver_cache
+    ping_mod = sys.modules["gatenet.diagnostics.ping"]
+
+    resolver_cache.put("shared.rtt.test", ["127.0.0.1"])
+    rtt_estimator.forget("127.0.0.1")
+    try:
+        assert ping_mod._tcp_ping_sync("shared.rtt.test", 2, 3, port=listening_port)["success"] is True
+        assert rtt_estimator.get("shared.rtt.test") is None
+        assert rtt_estimator.get("127.0.0.1")["samples"] == 2
+        scanner = SelectorScanner(timeout=2.0)
+        # The name and its address see the same, already learned timeout
+        assert scanner.host_timeout("shared.rtt.test") == scanner.host_timeout("127.0.0.1") < 2.0
+        scanner.scan("shared.rtt.test", [listening_port])
+        assert rtt_estimator.get("127.0.0.1")["samples"] == 3
+    finally:
+        rtt_estimator.forget("127.0.0.1")
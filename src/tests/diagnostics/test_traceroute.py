@@ -3,9 +3,12 @@ from unittest.mock import patch
 import socket
 from gatenet.diagnostics.traceroute import traceroute
 
+def _fake_getaddrinfo(host, port, *args, **kwargs):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("1.2.3.4", 0))]
+
 def test_traceroute_resolves_host(monkeypatch):
     """Test that traceroute resolves the host and returns hops."""
-    monkeypatch.setattr("socket.gethostbyname", lambda host: "1.2.3.4")
+    monkeypatch.setattr("socket.getaddrinfo", _fake_getaddrinfo)
 
     class DummySocket:
         def __init__(self, *a, **kw):
@@ -54,13 +57,13 @@ def test_traceroute_resolves_host(monkeypatch):
 
 def test_traceroute_unresolvable_host():
     """Test that traceroute raises ValueError for unresolvable host."""
-    with patch("socket.gethostbyname", side_effect=socket.gaierror):
+    with patch("socket.getaddrinfo", side_effect=socket.gaierror):
         with pytest.raises(ValueError):
             traceroute("notarealhost.local")
 
 def test_traceroute_timeout(monkeypatch):
     """Test that traceroute handles timeouts gracefully."""
-    monkeypatch.setattr("socket.gethostbyname", lambda host: "1.2.3.4")
+    monkeypatch.setattr("socket.getaddrinfo", _fake_getaddrinfo)
 
     class TimeoutSocket:
         def __init__(self, *a, **kw):
@@ -99,4 +102,36 @@ def test_traceroute_timeout(monkeypatch):
         assert isinstance(hop, dict)
         assert hop["ip"] == "*"
         # Accept hostname as None or empty string for timeout hops
-        assert hop["hostname"] in (None, "")
\ No newline at end of file
+        assert hop["hostname"] in (None, "")
+
+def test_traceroute_near_hops_do_not_shrink_far_hop_timeouts(monkeypatch):
+    """A fast first hop must not cut the timeout for slower hops or poison the destination's RTT."""
+    import sys
+    from gatenet.diagnostics.rtt import rtt_estimator
+    tr = sys.modules["gatenet.diagnostics.traceroute"]
+    dest = "192.0.2.77"
+    rtt_estimator.forget(dest)
+    timeouts = []
+    replies = iter([("192.0.2.1", 1.0), ("192.0.2.1", 1.2), ("198.51.100.9", 400.0), (dest, 420.0)])
+
+    class DummySocket:
+        def close(self):
+            pass
+
+    def create_sockets(ttl, protocol, port, timeout):
+        timeouts.append(timeout)
+        return DummySocket(), DummySocket()
+
+    monkeypatch.setattr(tr, "_create_sockets", create_sockets)
+    monkeypatch.setattr(tr, "_send_probe", lambda *a: None)
+    monkeypatch.setattr(tr, "_receive_probe", lambda sock, start: next(replies))
+    monkeypatch.setattr(tr.reverse_resolver, "submit", lambda ip: tr.concurrent.futures.Future())
+    monkeypatch.setattr(tr, "_flush_hops", lambda *a, **kw: None)
+    try:
+        hops = traceroute(dest, timeout=2.0, print_output=False)
+        assert [hop["ip"] for hop in hops] == ["192.0.2.1", "192.0.2.1", "198.51.100.9", dest]
+        assert timeouts == [2.0] * 4
+        # Only the destination's reply was observed
+        assert rtt_estimator.get(dest)["srtt"] == pytest.approx(0.42)
+    finally:
+        rtt_estimator.forget(dest)
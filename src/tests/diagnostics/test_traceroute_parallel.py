@@ -0,0 +1,266 @@
+"""
+Tests for parallel (all TTLs at once) traceroute.
+"""
+import socket
+import struct
+import sys
+
+import pytest
+
+from gatenet.diagnostics.icmp import ICMP_DEST_UNREACHABLE, ICMP_TIME_EXCEEDED, _checksum, parse_icmp_quote
+from gatenet.diagnostics.traceroute import ProbeReply, TraceProber, _probe_ttls, traceroute
+
+# The package re-exports the function under the module's name
+tr = sys.modules["gatenet.diagnostics.traceroute"]
+
+
+def _ip_header(src, dst, proto, length):
+    return struct.pack("!BBHHHBBH4s4s", 0x45, 0, length, 0, 0, 64, proto, 0, socket.inet_aton(src), socket.inet_aton(dst))
+
+
+def _icmp_error(router, dest, kind, code, transport_header, proto=socket.IPPROTO_UDP):
+    probe = _ip_header("10.0.0.2", dest, proto, 28) + transport_header
+    return _ip_header(router, "10.0.0.2", socket.IPPROTO_ICMP, 56) + struct.pack("!BBHI", kind, code, 0, 0) + probe
+
+
+def _prober(dest="192.0.2.50", protocol="udp", paris=False):
+    try:
+        return TraceProber(dest, protocol, paris=paris)
+    except PermissionError:
+        pytest.skip("raw sockets not permitted in this environment")
+
+
+def test_parse_icmp_quote_rejects_short_and_unrelated_packets():
+    assert parse_icmp_quote(b"") is None
+    assert parse_icmp_quote(_ip_header("10.0.0.1", "10.0.0.2", 1, 28) + struct.pack("!BBHI", 8, 0, 0, 0)) is None
+    truncated = _icmp_error("10.0.0.1", "192.0.2.50", ICMP_TIME_EXCEEDED, 0, b"\x00\x01")
+    assert parse_icmp_quote(truncated) is None
+
+
+def test_prober_matches_quoted_udp_ports_to_probes():
+    prober = _prober()
+    with prober:
+        sport = prober.ident
+        quoted = struct.pack("!HHHH", sport, tr.BASE_PORT + 5, 8, 0)
+        assert prober._match(_icmp_error("10.0.0.1", "192.0.2.50", ICMP_TIME_EXCEEDED, 0, quoted)) == ((tr.BASE_PORT + 5, 0), ICMP_TIME_EXCEEDED, 0)
+        # Another traceroute's probe, or a probe to another destination
+        other = struct.pack("!HHHH", sport ^ 1, tr.BASE_PORT + 5, 8, 0)
+        assert prober._match(_icmp_error("10.0.0.1", "192.0.2.50", ICMP_TIME_EXCEEDED, 0, other)) is None
+        assert prober._match(_icmp_error("10.0.0.1", "192.0.2.51", ICMP_TIME_EXCEEDED, 0, quoted)) is None
+
+
+def test_prober_matches_quoted_echo_sequence():
+    prober = _prober(protocol="icmp")
+    with prober:
+        quoted = struct.pack("!BBHHH", 8, 0, 0, prober.ident, 9)
+        packet = _icmp_error("10.0.0.1", "192.0.2.50", ICMP_TIME_EXCEEDED, 0, quoted, proto=socket.IPPROTO_ICMP)
+        assert prober._match(packet) == ((9,), ICMP_TIME_EXCEEDED, 0)
+        reply = _ip_header("192.0.2.50", "10.0.0.2", 1, 28) + struct.pack("!BBHHH", 0, 0, 0, prober.ident, 3)
+        assert prober._match(reply) == ((3,), 0, 0)
+
+
+class FakeProber:
+    """Answers every TTL below ``dest_ttl`` from a router, the rest from the destination."""
+
+    def __init__(self, dest_ttl, silent=()):
+        self.dest_ttl = dest_ttl
+        self.silent = set(silent)
+        self.sent = []
+        self.forgotten = set()
+        self.rounds = 0
+
+    def send(self, ttl, flow=0):
+        self.sent.append(ttl)
+        return len(self.sent) - 1
+
+    def forget(self, probe):
+        self.forgotten.add(probe)
+
+    def receive(self, timeout):
+        self.rounds += 1
+        if self.rounds > 1:
+            return []
+        replies = []
+        # Deliver in reverse order, as a burst might arrive
+        for probe in reversed(range(len(self.sent))):
+            ttl = self.sent[probe]
+            if ttl in self.silent:
+                continue
+            final = ttl >= self.dest_ttl
+            address = "192.0.2.50" if final else f"10.0.0.{ttl}"
+            replies.append(ProbeReply(probe, ttl, address, float(ttl), ICMP_DEST_UNREACHABLE if final else ICMP_TIME_EXCEEDED, 3 if final else 0, final))
+        return replies
+
+
+def test_probe_ttls_sends_every_ttl_up_front_and_stops_at_destination():
+    prober = FakeProber(dest_ttl=3)
+    replies = list(_probe_ttls(prober, max_hops=6, probes=2, timeout=0.2))
+    assert prober.sent == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6]
+    assert sorted(r.ttl for r in replies if r.ttl <= 3) == [1, 1, 2, 2, 3, 3]
+    assert min(r.ttl for r in replies if r.final) == 3
+
+
+def test_parallel_traceroute_builds_hops(monkeypatch):
+    prober = FakeProber(dest_ttl=4, silent={2})
+    monkeypatch.setattr(tr, "TraceProber", lambda dest, protocol, paris=False: _Context(prober))
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (f"host-{ip}", [], [ip]))
+    hops = traceroute("192.0.2.50", max_hops=8, timeout=0.05, parallel=True, probes=3, print_output=False)
+    assert [h["hop"] for h in hops] == [1, 2, 3, 4]
+    assert [h["ip"] for h in hops] == ["10.0.0.1", "*", "10.0.0.3", "192.0.2.50"]
+    assert hops[0]["rtts"] == [1.0, 1.0, 1.0]
+    assert hops[1]["rtts"] == [None, None, None] and hops[1]["rtt_ms"] is None
+    assert hops[3]["hostname"] == "host-192.0.2.50"
+
+
+class _Context:
+    def __init__(self, prober):
+        self.prober = prober
+
+    def __enter__(self):
+        return self.prober
+
+    def __exit__(self, *exc):
+        pass
+
+
+def test_parallel_traceroute_to_loopback():
+    try:
+        hops = traceroute("127.0.0.1", max_hops=5, timeout=1.0, parallel=True, probes=3, print_output=False)
+    except PermissionError:
+        pytest.skip("raw sockets not permitted in this environment")
+    assert len(hops) == 1
+    assert hops[0]["ip"] == "127.0.0.1"
+    assert len(hops[0]["rtts"]) == 3 and all(r is not None for r in hops[0]["rtts"])
+
+
+def test_paris_udp_probes_share_ports_per_flow():
+    prober = _prober(dest="127.0.0.1", paris=True)
+    with prober:
+        keys = [prober._wire_key(2) for _ in range(3)]
+        assert {port for port, _length in keys} == {tr.BASE_PORT + 2}
+        assert len({length for _port, length in keys}) == 3
+        replies = []
+        for ttl in (1, 2, 3):
+            prober.send(ttl, flow=1)
+        while len(replies) < 3:
+            batch = prober.receive(1.0)
+            assert batch
+            replies += batch
+        assert sorted(r.ttl for r in replies) == [1, 2, 3]
+        assert {r.flow for r in replies} == {1}
+
+
+def test_paris_echo_checksum_is_constant_per_flow():
+    prober = _prober(protocol="icmp", paris=True)
+    with prober:
+        packets = [prober._echo(seq, flow=3) for seq in (1, 2, 500)]
+        assert len({p[2:4] for p in packets}) == 1
+        assert all(_checksum(p) == 0 for p in packets)
+        assert prober._echo(1, flow=4)[2:4] != packets[0][2:4]
+
+
+class BranchingProber:
+    """Even flows cross 10.0.1.1, odd flows 10.0.2.1, at TTL 2 of a 4-hop path."""
+
+    def __init__(self):
+        self.sent = {}
+        self.flows = set()
+
+    def send(self, ttl, flow=0):
+        self.flows.add(flow)
+        self.sent[len(self.sent)] = (ttl, flow)
+        return len(self.sent) - 1
+
+    def forget(self, probe):
+        self.sent.pop(probe, None)
+
+    def receive(self, timeout):
+        replies = []
+        for probe, (ttl, flow) in list(self.sent.items()):
+            address = {1: "10.0.0.1", 2: f"10.0.{flow % 2 + 1}.1", 3: "10.0.3.1"}.get(ttl, "192.0.2.50")
+            final = ttl >= 4
+            replies.append(ProbeReply(probe, ttl, address, 1.0, 3 if final else 11, 3 if final else 0, final, flow))
+            del self.sent[probe]
+        return replies
+
+
+def test_multipath_traceroute_finds_both_branches(monkeypatch):
+    prober = BranchingProber()
+    monkeypatch.setattr(tr, "TraceProber", lambda dest, protocol, paris=False: _Context(prober))
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (f"host-{ip}", [], [ip]))
+    graph = tr.multipath_traceroute("192.0.2.50", max_hops=10, timeout=0.05, print_output=False)
+    assert graph["reached"] is True
+    # Two next hops at TTL 2 need 11 answering flows to rule out a third
+    assert graph["flows"] == 11 and len(prober.flows) == 11
+    assert [len(hop["nodes"]) for hop in graph["hops"]] == [1, 2, 1, 1]
+    assert {node["ip"] for node in graph["hops"][1]["nodes"]} == {"10.0.1.1", "10.0.2.1"}
+    assert sum(node["flows"] for node in graph["hops"][1]["nodes"]) == 11
+    assert {(e["hop"], e["from"], e["to"]) for e in graph["edges"]} == {
+        (1, "10.0.0.1", "10.0.1.1"),
+        (1, "10.0.0.1", "10.0.2.1"),
+        (2, "10.0.1.1", "10.0.3.1"),
+        (2, "10.0.2.1", "10.0.3.1"),
+        (3, "10.0.3.1", "192.0.2.50"),
+    }
+    assert graph["hops"][3]["nodes"][0]["hostname"] == "host-192.0.2.50"
+
+
+def test_stop_count_matches_mda_table():
+    assert [tr._stop_count(k, 0.95) for k in range(1, 6)] == [6, 11, 16, 21, 27]
+
+
+def test_traceroute_stream_releases_hops_before_the_deadline(monkeypatch):
+    import time
+    from gatenet.diagnostics.rtt import rtt_estimator
+    from gatenet.diagnostics.traceroute import traceroute_stream
+
+    # Start from a clean estimate for the destination
+    rtt_estimator.forget("192.0.2.50")
+    prober = FakeProber(dest_ttl=4, silent={2})
+    monkeypatch.setattr(tr, "TraceProber", lambda dest, protocol, paris=False: _Context(prober))
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (f"host-{ip}", [], [ip]))
+    start = time.monotonic()
+    arrivals = []
+    for hop in traceroute_stream("192.0.2.50", max_hops=8, timeout=1.0, probes=2):
+        arrivals.append((hop["hop"], time.monotonic() - start))
+    # Answered hops (the destination once hop 3 proves it is hop 4) come at once,
+    # the silent hop only when the timeout expires
+    assert [ttl for ttl, _t in arrivals][-1] == 2
+    assert sorted(ttl for ttl, _t in arrivals) == [1, 2, 3, 4]
+    assert all(t < 0.5 for ttl, t in arrivals if ttl != 2)
+    assert dict(arrivals)[2] >= 0.9
+
+
+def test_traceroute_stream_keeps_caller_timeout_and_observes_only_destination(monkeypatch):
+    import time
+    from gatenet.diagnostics.rtt import rtt_estimator
+    from gatenet.diagnostics.traceroute import traceroute_stream
+
+    # A fast near hop from an earlier trace must not shorten the burst window
+    rtt_estimator.forget("192.0.2.50")
+    for _ in range(5):
+        rtt_estimator.observe("192.0.2.50", 0.001)
+    prober = FakeProber(dest_ttl=4, silent={2})
+    monkeypatch.setattr(tr, "TraceProber", lambda dest, protocol, paris=False: _Context(prober))
+    monkeypatch.setattr("socket.gethostbyaddr", lambda ip: (f"host-{ip}", [], [ip]))
+    try:
+        start = time.monotonic()
+        hops = list(traceroute_stream("192.0.2.50", max_hops=8, timeout=0.5, probes=2))
+        assert time.monotonic() - start >= 0.45
+        assert [hop["ip"] for hop in sorted(hops, key=lambda hop: hop["hop"])] == ["10.0.0.1", "*", "10.0.0.3", "192.0.2.50"]
+        # Routers' replies (TTL 1 and 3) were not observed; the destination's (TTL 4-8, two probes each) were
+        assert rtt_estimator.get("192.0.2.50")["samples"] == 5 + 10
+    finally:
+        rtt_estimator.forget("192.0.2.50")
+
+
+@pytest.mark.asyncio
+async def test_async_traceroute_stream_to_loopback():
+    from gatenet.diagnostics.traceroute import async_traceroute_stream
+
+    try:
+        hops = [hop async for hop in async_traceroute_stream("127.0.0.1", max_hops=5, timeout=1.0, probes=2)]
+    except PermissionError:
+        pytest.skip("raw sockets not permitted in this environment")
+    assert [hop["ip"] for hop in hops] == ["127.0.0.1"]
+    assert len(hops[0]["rtts"]) == 2
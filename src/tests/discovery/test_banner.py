@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from gatenet.diagnostics.port_scan import ScanResult, OPEN, CLOSED
+from gatenet.discovery.banner import (
+    BannerResult,
+    grab_banner,
+    grab_banners,
+    scan_and_fingerprint,
+)
+from gatenet.utils.net import get_free_port
+
+
+async def _start_server(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def _ssh_handler(reader, writer):
+    writer.write(b"SSH-2.0-OpenSSH_8.9p1 Ubuntu-3\r\n")
+    await writer.drain()
+    await reader.read()  # hold the connection until the client hangs up
+    writer.close()
+
+
+async def _http_handler(reader, writer):
+    request = await reader.read(1024)
+    if request.startswith(b"HEAD"):
+        writer.write(b"HTTP/1.0 200 OK\r\nServer: nginx/1.18.0\r\n\r\n")
+    else:
+        writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_grab_banner_server_first():
+    server, port = await _start_server(_ssh_handler)
+    async with server:
+        banner = await grab_banner("127.0.0.1", port)
+    assert banner == "SSH-2.0-OpenSSH_8.9p1 Ubuntu-3"
+
+
+@pytest.mark.asyncio
+async def test_grab_banner_with_probe():
+    server, port = await _start_server(_http_handler)
+    async with server:
+        banner = await grab_banner("127.0.0.1", port, probe=b"HEAD / HTTP/1.0\r\n\r\n")
+    assert banner.startswith("HTTP/1.0 200 OK")
+
+
+@pytest.mark.asyncio
+async def test_grab_banner_sends_generic_probe_to_silent_server():
+    server, port = await _start_server(_http_handler)
+    async with server:
+        banner = await grab_banner("127.0.0.1", port, wait=0.05)
+    assert banner.startswith("HTTP/1.1 400")
+
+
+@pytest.mark.asyncio
+async def test_grab_banner_respects_max_bytes():
+    async def chatty(reader, writer):
+        writer.write(b"x" * 4096)
+        await writer.drain()
+        await asyncio.sleep(0.2)
+        writer.close()
+
+    server, port = await _start_server(chatty)
+    async with server:
+        banner = await grab_banner("127.0.0.1", port, max_bytes=100)
+    assert len(banner) == 100
+
+
+@pytest.mark.asyncio
+async def test_grab_banner_connection_refused():
+    assert await grab_banner("127.0.0.1", get_free_port(), timeout=0.5) is None
+
+
+@pytest.mark.asyncio
+async def test_grab_banners_identifies_and_skips_closed():
+    ssh_server, ssh_port = await _start_server(_ssh_handler)
+    http_server, http_port = await _start_server(_http_handler)
+    targets = [
+        ScanResult("127.0.0.1", ssh_port, OPEN, 0.1),
+        ScanResult("127.0.0.1", 1, CLOSED, 0.1),
+        ("127.0.0.1", http_port),
+    ]
+    async with ssh_server, http_server:
+        results = [r async for r in grab_banners(targets, probes={http_port: b"HEAD / HTTP/1.0\r\n\r\n"})]
+    by_port = {r.port: r for r in results}
+    assert set(by_port) == {ssh_port, http_port}
+    assert all(isinstance(r, BannerResult) for r in results)
+    assert by_port[ssh_port].service == "OpenSSH 8.9p1"
+    assert by_port[http_port].service == "Nginx HTTP Server"
+
+
+@pytest.mark.asyncio
+async def test_grab_banners_emits_no_empty_batch():
+    from gatenet.core import hooks, events
+    batches = []
+
+    def on_batch(results, **kwargs):
+        batches.append(results)
+
+    ssh_server, ssh_port = await _start_server(_ssh_handler)
+    hooks.on(events.DISCOVERY_BATCH_DETECT, on_batch)
+    try:
+        assert [r async for r in grab_banners([ScanResult("127.0.0.1", 1, CLOSED, 0.1)])] == []
+        async with ssh_server:
+            results = [r async for r in grab_banners([("127.0.0.1", ssh_port)])]
+    finally:
+        hooks.off(events.DISCOVERY_BATCH_DETECT, on_batch)
+    assert len(results) == 1
+    # Only the batch holding the SSH banner; the sentinel alone flushes nothing
+    assert len(batches) == 1 and all(batches)
+
+
+@pytest.mark.asyncio
+async def test_grab_banners_accepts_async_iterable_and_bounds_concurrency():
+    active = {"now": 0, "peak": 0}
+
+    async def slow(reader, writer):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        writer.write(b"220 smtp ready\r\n")
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        writer.close()
+
+    server, port = await _start_server(slow)
+
+    async def targets():
+        for _ in range(12):
+            yield ("127.0.0.1", port)
+
+    async with server:
+        results = [r async for r in grab_banners(targets(), concurrency=3, batch_size=4)]
+    assert len(results) == 12
+    assert {r.service for r in results} == {"SMTP Server"}
+    assert active["peak"] <= 3
+
+
+@pytest.mark.asyncio
+async def test_scan_and_fingerprint_end_to_end():
+    server, port = await _start_server(_ssh_handler)
+    async with server:
+        results = [r async for r in scan_and_fingerprint("127.0.0.1", ports=[port, get_free_port()])]
+    assert [(r.host, r.port, r.service) for r in results] == [("127.0.0.1", port, "OpenSSH 8.9p1")]
@@ -0,0 +1,84 @@
+import pytest
+
+from gatenet.discovery import clear_detectors, get_detectors, register_detector
+from gatenet.discovery.detectors import ServiceDetector
+from gatenet.discovery.index import DetectorIndex
+from gatenet.discovery.ssh import _identify_service
+from gatenet.service_detectors import (
+    CoAPDetector,
+    IMAPDetector,
+    MQTTDetector,
+    POP3Detector,
+    SIPDetector,
+)
+
+
+BANNERS = [
+    "", "ssh-2.0-openssh_9.6p1", "ssh-1.99-cisco", "http/1.1 200 ok server: nginx",
+    "server: apache", "220 (vsftpd 3.0.5)", "220 filezilla server", "220 mail esmtp postfix",
+    "* ok imap4rev1 ready", "+ok pop3 ready", "redis_version:7.2", "mysql 8.0",
+    "telnet", "mqtt broker", "coap", "sip/2.0 200 ok", "hello world", "microsoft iis",
+]
+PORTS = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 1883, 3306, 5060, 5683, 8080, 9999]
+
+
+def _naive(detectors, port, banner):
+    for detector in detectors:
+        result = detector.detect(port, banner)
+        if result:
+            return result
+    return None
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    clear_detectors(keep_defaults=True)
+    try:
+        yield
+    finally:
+        clear_detectors(keep_defaults=True)
+
+
+def test_index_matches_naive_chain():
+    detectors = get_detectors()
+    detectors[-1:-1] = [IMAPDetector(), POP3Detector(), MQTTDetector(), CoAPDetector(), SIPDetector()]
+    index = DetectorIndex(detectors)
+    for port in PORTS:
+        for banner in BANNERS:
+            assert index.identify(port, banner) == _naive(detectors, port, banner), (port, banner)
+
+
+def test_index_skips_detectors_that_cannot_match():
+    index = DetectorIndex(get_detectors())
+    names = [type(d).__name__ for d in index.candidates(9999, "ssh-2.0-openssh_9.6")]
+    assert names == ["SSHDetector", "FallbackDetector"]
+
+
+def test_prefix_keywords_share_a_position():
+    class Short(ServiceDetector):
+        keywords = ("pop",)
+
+        def detect(self, port, banner):
+            return "Short" if "pop" in banner else None
+
+    class Long(ServiceDetector):
+        keywords = ("pop3s",)
+
+        def detect(self, port, banner):
+            return "Long" if "pop3s" in banner else None
+
+    index = DetectorIndex([Short(), Long()])
+    assert index.candidates(1, "+ok pop3s") == index.detectors
+    assert index.identify(1, "+ok pop3s") == "Short"
+
+
+def test_registry_rebuilds_index_on_change():
+    class Undeclared(ServiceDetector):
+        def detect(self, port, banner):
+            return "Custom" if banner == "magic" else None
+
+    assert _identify_service(4242, "magic") == "Unknown Service (Port 4242)"
+    register_detector(Undeclared())
+    assert _identify_service(4242, "magic") == "Custom"
+    clear_detectors(keep_defaults=False)
+    assert _identify_service(4242, "magic") == "Unknown Service (Port 4242)"
@@ -0,0 +1,47 @@
+import pytest
+
+from gatenet.core import hooks, events
+from gatenet.discovery import clear_detectors, identify_services
+from gatenet.discovery.ssh import _identify_service
+
+
+PAIRS = [
+    (22, "SSH-2.0-OpenSSH_9.6"),
+    (80, "HTTP/1.1 200 OK\r\nServer: nginx"),
+    (22, "ssh-2.0-openssh_9.6 "),
+    ("25", "220 mail ESMTP Postfix"),
+    (9999, None),
+    (443, ""),
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    clear_detectors(keep_defaults=True)
+    yield
+    clear_detectors(keep_defaults=True)
+
+
+def test_identify_services_matches_single_calls():
+    assert identify_services(PAIRS) == [_identify_service(port, banner) for port, banner in PAIRS]
+
+
+def test_identify_services_emits_one_deduplicated_event():
+    batches, singles = [], []
+    on_batch = lambda results: batches.append(results)
+    on_single = lambda port, banner, result: singles.append(result)
+    hooks.on(events.DISCOVERY_BATCH_DETECT, on_batch)
+    hooks.on(events.DISCOVERY_AFTER_DETECT, on_single)
+    try:
+        identify_services(PAIRS)
+    finally:
+        hooks.off(events.DISCOVERY_BATCH_DETECT, on_batch)
+        hooks.off(events.DISCOVERY_AFTER_DETECT, on_single)
+    assert len(batches) == 1 and not singles
+    assert len(batches[0]) == len(PAIRS) - 1
+    assert batches[0][0] == (22, "ssh-2.0-openssh_9.6", "OpenSSH 9.6")
+
+
+def test_identify_services_process_pool():
+    pairs = [(port, f"ssh-2.0-openssh_{port}.0") for port in range(1000, 1040)] * 2
+    assert identify_services(pairs, processes=2, chunksize=8) == identify_services(pairs)
@@ -77,3 +77,50 @@ def test_clear_detectors_empty_then_unknown_service():
     # With empty registry, identify should still return an Unknown string
     res = _identify_service(12345, "")
     assert res.startswith("Unknown Service (Port ")
+
+
+def test_registry_orders_by_priority():
+    class Early(DummyDetector):
+        priority = 5
+
+    register_detector(Early("Early"))
+    register_detector(DummyDetector("Late"), priority=2000)
+    detectors = get_detectors()
+    assert detectors[0].name == "Early"
+    assert detectors[-1].name == "Late"
+    assert isinstance(detectors[-2], FallbackDetector)
+
+
+def test_default_registry_includes_protocol_detectors():
+    assert _identify_service(1883, "MQTT broker ready") == "MQTT Broker"
+    assert _identify_service(5060, "SIP/2.0 200 OK") == "SIP Server"
+    assert _identify_service(9999, "+OK POP3S ready") == "POP3S Server"
+
+
+
+def test_protocol_detectors_do_not_match_inside_words():
+    priorities = [d.priority for d in get_detectors()]
+    assert priorities == sorted(priorities)
+    assert _identify_service(3306, "5.7.33 mysql gossip") == "MySQL Database"
+    assert _identify_service(8883, "mqttx client") != "MQTT Broker"
+    assert _identify_service(443, "coap gateway") == "HTTPS Server"
+
+def test_load_detector_plugins(monkeypatch):
+    import importlib.metadata
+    from gatenet.discovery import load_detector_plugins
+    from gatenet.service_detectors import ServiceDetector as CanonicalDetector, MQTTDetector
+
+    assert ServiceDetector is CanonicalDetector
+    group = "gatenet.service_detectors"
+    eps = [
+        importlib.metadata.EntryPoint("mqtt", "gatenet.service_detectors.mqtt:MQTTDetector", group),
+        importlib.metadata.EntryPoint("broken", "gatenet.no_such_module:Detector", group),
+    ]
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: eps)
+    clear_detectors(keep_defaults=False)
+    register_detector(FallbackDetector())
+    loaded = load_detector_plugins()
+    assert [type(d) for d in loaded] == [MQTTDetector]
+    assert load_detector_plugins() == []
+    assert [type(d) for d in get_detectors()] == [MQTTDetector, FallbackDetector]
+    assert _identify_service(1883, "mqtt") == "MQTT Broker"
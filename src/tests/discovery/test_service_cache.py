@@ -0,0 +1,75 @@
+import pytest
+
+from gatenet.core import hooks, events
+from gatenet.discovery import (
+    clear_detectors,
+    clear_service_cache,
+    disable_service_cache,
+    enable_service_cache,
+    register_detector,
+    service_cache_info,
+)
+from gatenet.discovery.detectors import ServiceDetector
+from gatenet.discovery.ssh import _identify_service
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    clear_detectors(keep_defaults=True)
+    clear_service_cache()
+    enable_service_cache(maxsize=2)
+    try:
+        yield
+    finally:
+        disable_service_cache()
+        clear_service_cache()
+        clear_detectors(keep_defaults=True)
+
+
+def test_cache_counts_hits_and_misses():
+    assert _identify_service(22, "SSH-2.0-OpenSSH_9.6") == "OpenSSH 9.6"
+    assert _identify_service(22, "ssh-2.0-openssh_9.6 ") == "OpenSSH 9.6"
+    assert service_cache_info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+
+def test_cache_is_bounded_lru():
+    _identify_service(21, "a")
+    _identify_service(22, "b")
+    _identify_service(21, "a")
+    _identify_service(23, "c")  # evicts (22, "b")
+    _identify_service(22, "b")
+    info = service_cache_info()
+    assert info["size"] == 2
+    assert (info["hits"], info["misses"]) == (1, 4)
+
+
+def test_cache_still_emits_hooks():
+    seen = []
+    listener = lambda port, banner, result: seen.append(result)
+    hooks.on(events.DISCOVERY_AFTER_DETECT, listener)
+    try:
+        _identify_service(22, "ssh-2.0-x")
+        _identify_service(22, "ssh-2.0-x")
+    finally:
+        hooks.off(events.DISCOVERY_AFTER_DETECT, listener)
+    assert seen == ["SSH Server", "SSH Server"]
+
+
+def test_cache_invalidated_on_register():
+    class Custom(ServiceDetector):
+        def detect(self, port, banner):
+            return "Custom" if banner == "magic" else None
+
+    assert _identify_service(4242, "magic") == "Unknown Service (Port 4242)"
+    register_detector(Custom(), append=False)
+    assert service_cache_info()["size"] == 0
+    assert _identify_service(4242, "magic") == "Custom"
+
+
+def test_disabled_cache_does_not_count():
+    disable_service_cache()
+    _identify_service(22, "ssh")
+    _identify_service(22, "ssh")
+    assert service_cache_info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 0}
+    with pytest.raises(ValueError):
+        enable_service_cache(maxsize=0)